@@ -19,6 +19,7 @@ setup(
     entry_points={
         'console_scripts': [
             'tm-editor = tmEditor.__main__:main',
+            'tm-editor-check = tmEditor.check:main',
         ],
     },
     test_suite='tests',
@@ -0,0 +1,75 @@
+"""Benchmark counting algorithm expression parser calls while loading,
+validating and saving a menu.
+
+Usage: python -m tests.benchmark_algorithm_parse <filename>
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import tmGrammar
+
+from tmEditor.core import XmlDecoder, XmlEncoder
+
+class ParserCounter:
+    """Wraps tmGrammar.Algorithm_parser counting its calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.parser = tmGrammar.Algorithm_parser
+
+    def __call__(self, expression):
+        self.calls += 1
+        return self.parser(expression)
+
+    def __enter__(self):
+        tmGrammar.Algorithm_parser = self
+        return self
+
+    def __exit__(self, *args):
+        tmGrammar.Algorithm_parser = self.parser
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filename')
+    return parser.parse_args()
+
+def measure(callback):
+    """Returns tuple of callback result, parser calls and elapsed time."""
+    with ParserCounter() as counter:
+        t0 = time.time()
+        result = callback()
+        dt = time.time() - t0
+    return result, counter.calls, dt
+
+def report(title, calls, dt, count):
+    print(f"{title:<10} {calls:>8} parser calls {calls / max(1, count):>6.2f} per algorithm {dt:>8.3f} sec")
+
+def main():
+    logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.WARNING)
+    args = parse_args()
+
+    menu, calls, dt = measure(lambda: XmlDecoder.load(args.filename))
+    count = len(menu.algorithms)
+    print(f"algorithms: {count}")
+    report("load", calls, dt, count)
+
+    _, calls, dt = measure(menu.validate)
+    report("validate", calls, dt, count)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, os.path.basename(args.filename))
+        _, calls, dt = measure(lambda: XmlEncoder.dump(menu, filename))
+        report("save", calls, dt, count)
+
+    # Assigning an expression drops the cached parse result.
+    for algorithm in menu.algorithms:
+        algorithm.expression = algorithm.expression
+    _, calls, dt = measure(menu.validate)
+    report("reassign", calls, dt, count)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark measuring the time to open a menu document, with bins pages
+created lazily (default) and with all pages created on open (like before
+lazy pages were introduced). Requires PyQt5, run with a menu using a full
+production scale set. The scale set and its size are printed along with
+the timings, record both when reporting numbers.
+
+Usage: QT_QPA_PLATFORM=offscreen python -m tests.benchmark_document_open <filename>
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+from PyQt5 import QtWidgets
+
+from tmEditor.gui.Document import Document
+
+kName = 'name'
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filename')
+    parser.add_argument('-n', type=int, default=5, help="number of repetitions")
+    return parser.parse_args()
+
+def measure(filename, eager):
+    """Returns time in seconds to open *filename*, if *eager* is True all
+    lazy pages are created.
+    """
+    t0 = time.monotonic()
+    document = Document(filename)
+    if eager:
+        for page in document._pages:
+            document.loadPage(page)
+    dt = time.monotonic() - t0
+    document.deleteLater()
+    return dt
+
+def describe(filename):
+    """Returns description of the scale set used by menu *filename*."""
+    document = Document(filename)
+    scales = document.menu().scales
+    count = sum(len(bins) for bins in scales.bins.values())
+    document.deleteLater()
+    return f"scale set {scales.scaleSet[kName]}: {len(scales.bins)} bins pages, {count} bins"
+
+def main():
+    logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.WARNING)
+    args = parse_args()
+    app = QtWidgets.QApplication(sys.argv)
+    app.setOrganizationName("benchmark")
+    print(describe(args.filename)) # warm up (menu cache)
+    results = {}
+    for eager in (True, False):
+        times = [measure(args.filename, eager) for _ in range(args.n)]
+        label = "all pages" if eager else "lazy pages"
+        results[eager] = min(times)
+        print(f"{label:<12} {min(times):>8.3f} sec (min of {args.n})")
+        app.processEvents()
+    if results[False] > 0:
+        print(f"{'speedup':<12} {results[True] / results[False]:>8.1f} x")
+
+if __name__ == '__main__':
+    main()
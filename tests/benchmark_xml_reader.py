@@ -0,0 +1,47 @@
+"""Benchmark comparing time and peak memory of the XML reader backends
+decoding a menu. Every backend is measured in a separate process.
+
+Usage: python -m tests.benchmark_xml_reader <filename>
+"""
+
+import argparse
+import json
+import logging
+import resource
+import subprocess
+import sys
+import time
+
+from tmEditor.core import XmlDecoder
+from tmEditor.core.XmlReader import Readers
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filename')
+    parser.add_argument('--backend', choices=sorted(Readers), help="measure single backend (used internally)")
+    return parser.parse_args()
+
+def measure(filename, backend):
+    """Returns dictionary of decoding time and peak resident memory."""
+    rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.monotonic()
+    menu = XmlDecoder.load(filename, backend=backend)
+    dt = time.monotonic() - t0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'algorithms': len(menu.algorithms), 'time': dt, 'peak_kib': rss, 'delta_kib': rss - rss0}
+
+def main():
+    logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.WARNING)
+    args = parse_args()
+
+    if args.backend:
+        print(json.dumps(measure(args.filename, args.backend)))
+        return
+
+    for backend in sorted(Readers):
+        command = [sys.executable, '-m', 'tests.benchmark_xml_reader', args.filename, '--backend', backend]
+        result = json.loads(subprocess.check_output(command))
+        print(f"{backend:<10} {result['algorithms']:>6} algorithms {result['time']:>8.3f} sec {result['delta_kib'] / 1024:>8.1f} MiB peak increase, {result['peak_kib'] / 1024:.1f} MiB max RSS")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+from tmEditor.check import checkFile, StatusError
+
+import subprocess
+import sys
+import unittest
+
+class CheckTests(unittest.TestCase):
+
+    def test_checkFile_missing(self):
+        result = checkFile('missing.xml')
+        self.assertEqual(result['status'], StatusError)
+        self.assertEqual(result['error_type'], 'XmlDecoderError')
+        self.assertEqual(result['stages'][0]['stage'], "check access rights")
+
+    def test_no_gui_import(self):
+        code = "import sys, tmEditor.check as c; c.checkFile('missing.xml'); sys.exit('PyQt5' in sys.modules)"
+        self.assertEqual(subprocess.call([sys.executable, '-c', code], stderr=subprocess.DEVNULL), 0)
+
+if __name__ == '__main__':
+    unittest.main()
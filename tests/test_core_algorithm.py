@@ -22,5 +22,21 @@ class CoreAlgorithmTests(unittest.TestCase):
         algorithm.expression = 'JET1 AND (TAU2 OR MU3)'
         self.assertEqual(algorithm.tokens(), ['JET1', 'TAU2', 'MU3', 'OR', 'AND'])
 
+    def test_Algorithm_parsed(self):
+        algorithm = Algorithm(0, 'L1_DoubleMu', 'comb{MU20[MU-ETA_2p1],MU10}[CHGCOR_OS] AND EXT_BPTX_plus')
+        parsed = algorithm.parsed()
+        self.assertIs(algorithm.parsed(), parsed)
+        self.assertEqual(algorithm.objects(), ['MU20', 'MU10'])
+        self.assertEqual(algorithm.cuts(), ['CHGCOR_OS', 'MU-ETA_2p1'])
+        self.assertEqual(algorithm.externals(), ['EXT_BPTX_plus'])
+        self.assertEqual(len(parsed.functions), 1)
+        self.assertEqual(parsed.functions[0].name, 'comb')
+        self.assertEqual(parsed.functions[0].objectCuts, [['MU-ETA_2p1'], []])
+        algorithm.expression = 'JET1'
+        self.assertIsNot(algorithm.parsed(), parsed)
+        self.assertEqual(algorithm.objects(), ['JET1'])
+        self.assertEqual(algorithm.cuts(), [])
+        self.assertEqual(algorithm.externals(), [])
+
 if __name__ == '__main__':
     unittest.main()
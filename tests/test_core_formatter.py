@@ -3,6 +3,7 @@ import tmGrammar
 from tmEditor.core.formatter import fHex
 from tmEditor.core.formatter import fCompress
 from tmEditor.core.formatter import fFileSize
+from tmEditor.core.formatter import fItemProgress
 from tmEditor.core.formatter import fCutValue
 from tmEditor.core.formatter import fCutData
 from tmEditor.core.formatter import fCutLabel
@@ -11,6 +12,7 @@ from tmEditor.core.formatter import fThreshold
 from tmEditor.core.formatter import fCounts
 from tmEditor.core.formatter import fComparison
 from tmEditor.core.formatter import fBxOffset
+from tmEditor.core.Queue import ItemProgress
 
 import unittest
 
@@ -30,6 +32,10 @@ class CoreFormatterTests(unittest.TestCase):
     def test_fFileSize(self):
         self.assertEqual(fFileSize(1234), '1.2KiB')
 
+    def test_fItemProgress(self):
+        self.assertEqual(fItemProgress(ItemProgress("", 120, 400, 850., .33, 0.)), '120/400 (850/s, 0.3 s remaining)')
+        self.assertEqual(fItemProgress(ItemProgress("", 0, 400, None, None, 0.)), '0/400')
+
     def test_fCutValue(self):
         self.assertEqual(fCutValue(0), '+0.000')
         self.assertEqual(fCutValue(42, 1), '+42.0')
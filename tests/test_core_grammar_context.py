@@ -0,0 +1,27 @@
+from tmEditor.core.GrammarContext import GrammarContext
+
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+
+class CoreGrammarContextTests(unittest.TestCase):
+
+    def test_instance(self):
+        self.assertIs(GrammarContext.instance(), GrammarContext.instance())
+
+    def test_tokenize(self):
+        context = GrammarContext.instance()
+        tokens = context.tokenize('JET1 AND TAU2')
+        self.assertEqual(tokens, ['JET1', 'TAU2', 'AND'])
+        context.tokenize('MU0')
+        self.assertEqual(tokens, ['JET1', 'TAU2', 'AND'])
+
+    def test_concurrent(self):
+        expressions = [f'MU{i} AND (JET{i} OR TAU{i})' for i in range(200)]
+        context = GrammarContext.instance()
+        expected = [context.tokenize(expression) for expression in expressions]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(context.tokenize, expressions))
+        self.assertEqual(results, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,287 @@
+from tmEditor.core.Algorithm import Algorithm, Cut, toObject
+from tmEditor.core.Menu import Menu
+from tmEditor.core.MenuObserver import MenuObserver
+from tmEditor.core.AlgorithmSyntaxValidator import AlgorithmSyntaxValidator, AlgorithmSyntaxError
+from tmEditor.core.TableHelper import PlainScale, PlainExtSignal
+
+import copy
+import gc
+import unittest
+import weakref
+from unittest import mock
+
+class RecordingObserver(MenuObserver):
+
+    def __init__(self):
+        self.calls = []
+
+    def itemsAboutToBeInserted(self, kind, first, last):
+        self.calls.append(('aboutToBeInserted', kind, first, last))
+
+    def itemsInserted(self, kind, first, last):
+        self.calls.append(('inserted', kind, first, last))
+
+    def itemsAboutToBeRemoved(self, kind, first, last):
+        self.calls.append(('aboutToBeRemoved', kind, first, last))
+
+    def itemsRemoved(self, kind, first, last):
+        self.calls.append(('removed', kind, first, last))
+
+    def itemsChanged(self, kind, first, last):
+        self.calls.append(('changed', kind, first, last))
+
+class CoreMenuTests(unittest.TestCase):
+
+    def setUp(self):
+        self.menu = Menu()
+        self.menu.addAlgorithm(Algorithm(0, 'L1_Mu0', 'MU0'))
+        self.menu.addAlgorithm(Algorithm(1, 'L1_Jet1', 'JET1'))
+        self.menu.addCut(Cut('MU-ETA_2p1', 'MU', 'ETA', -2.1, 2.1))
+        self.menu.addObject(toObject('MU0'))
+
+    def test_lookup(self):
+        self.assertEqual(self.menu.algorithmByName('L1_Mu0').index, 0)
+        self.assertEqual(self.menu.algorithmByIndex(1).name, 'L1_Jet1')
+        self.assertEqual(self.menu.algorithmByIndex('1').name, 'L1_Jet1')
+        self.assertEqual(self.menu.cutByName('MU-ETA_2p1').type, 'ETA')
+        self.assertEqual(self.menu.objectByName('MU0').name, 'MU0')
+        self.assertIsNone(self.menu.algorithmByName('L1_Missing'))
+        self.assertIsNone(self.menu.algorithmByIndex(42))
+        self.assertIsNone(self.menu.externalByName('EXT_Missing'))
+
+    def test_remove(self):
+        algorithm = self.menu.algorithmByName('L1_Mu0')
+        self.menu.removeAlgorithm(algorithm)
+        self.assertIsNone(self.menu.algorithmByName('L1_Mu0'))
+        self.assertIsNone(self.menu.algorithmByIndex(0))
+        self.assertEqual(len(self.menu.algorithms), 1)
+        with self.assertRaises(ValueError):
+            self.menu.removeAlgorithm(algorithm)
+        self.menu.removeCut(self.menu.cutByName('MU-ETA_2p1'))
+        self.assertIsNone(self.menu.cutByName('MU-ETA_2p1'))
+
+    def test_update(self):
+        first = self.menu.algorithmByIndex(0)
+        second = self.menu.algorithmByIndex(1)
+        first.index, second.index = 1, 0
+        first.name = 'L1_Mu0_renamed'
+        self.menu.updateAlgorithm(first)
+        self.menu.updateAlgorithm(second)
+        self.assertIs(self.menu.algorithmByIndex(1), first)
+        self.assertIs(self.menu.algorithmByIndex(0), second)
+        self.assertIs(self.menu.algorithmByName('L1_Mu0_renamed'), first)
+        self.assertIsNone(self.menu.algorithmByName('L1_Mu0'))
+
+    def test_references(self):
+        cut = self.menu.cutByName('MU-ETA_2p1')
+        mu0 = self.menu.objectByName('MU0')
+        self.assertEqual(self.menu.algorithmsByCut(cut), [])
+        self.assertEqual([a.name for a in self.menu.algorithmsByObject(mu0)], ['L1_Mu0'])
+        algorithm = Algorithm(2, 'L1_Mu0_Eta', 'MU0[MU-ETA_2p1] AND EXT_BPTX_plus')
+        self.menu.addAlgorithm(algorithm)
+        self.menu.extendReferenced(algorithm)
+        external = self.menu.externalByName('EXT_BPTX_plus')
+        self.assertEqual(self.menu.algorithmsByCut(cut), [algorithm])
+        self.assertEqual([a.name for a in self.menu.algorithmsByObject(mu0)], ['L1_Mu0', 'L1_Mu0_Eta'])
+        self.assertEqual(self.menu.algorithmsByExternal(external), [algorithm])
+        algorithm.expression = 'MU0'
+        self.menu.updateAlgorithm(algorithm)
+        self.assertEqual(self.menu.algorithmsByCut(cut), [])
+        self.assertEqual(self.menu.algorithmsByExternal(external), [])
+        self.menu.removeAlgorithm(algorithm)
+        self.assertEqual([a.name for a in self.menu.algorithmsByObject(mu0)], ['L1_Mu0'])
+
+    def test_orphans(self):
+        self.assertEqual(self.menu.orphanedCuts(), ['MU-ETA_2p1'])
+        self.assertEqual(self.menu.orphanedObjects(), [])
+        algorithm = Algorithm(2, 'L1_Mu0_Eta', 'MU0[MU-ETA_2p1] AND EXT_BPTX_plus')
+        self.menu.addAlgorithm(algorithm)
+        self.menu.extendReferenced(algorithm)
+        self.assertEqual(self.menu.orphanedCuts(), [])
+        self.assertEqual(self.menu.orphanedExternals(), [])
+        self.menu.removeAlgorithm(self.menu.algorithmByName('L1_Mu0'))
+        self.assertEqual(self.menu.orphanedObjects(), [])
+        self.menu.removeAlgorithm(algorithm)
+        self.assertEqual(self.menu.orphanedCuts(), ['MU-ETA_2p1'])
+        self.assertEqual(self.menu.orphanedObjects(), ['MU0'])
+        self.assertEqual(self.menu.orphanedExternals(), ['EXT_BPTX_plus'])
+
+    def test_validate_incremental(self):
+        self.menu.menu.name = 'L1Menu_Test'
+        self.menu.addObject(toObject('JET1'))
+        with mock.patch.object(AlgorithmSyntaxValidator, 'validate') as validate:
+            self.menu.validate()
+            self.assertEqual(validate.call_count, 2)
+            self.menu.validate(incremental=True)
+            self.assertEqual(validate.call_count, 2)
+            algorithm = self.menu.algorithmByName('L1_Mu0')
+            algorithm.expression = 'MU0[MU-ETA_2p1]'
+            self.menu.updateAlgorithm(algorithm)
+            self.menu.validate(incremental=True)
+            self.assertEqual(validate.call_count, 3)
+            self.menu.updateCut(self.menu.cutByName('MU-ETA_2p1'))
+            self.menu.validate(incremental=True)
+            self.assertEqual(validate.call_count, 4)
+            self.menu.scales = self.menu.scales
+            self.menu.validate(incremental=True)
+            self.assertEqual(validate.call_count, 6)
+            self.menu.extSignals = PlainExtSignal(extSignalSet={'name': 'ExtSignals_Test'}, extSignals=[])
+            self.menu.validate(incremental=True)
+            self.assertEqual(validate.call_count, 8)
+            self.menu.validate()
+            self.assertEqual(validate.call_count, 10)
+
+    def test_validate_parallel(self):
+        self.menu.menu.name = 'L1Menu_Test'
+        self.menu.addObject(toObject('JET1'))
+        self.menu.scales = PlainScale(
+            scaleSet={'name': 'Scales_Test'},
+            scales=[
+                {'object': 'MU', 'type': 'ET', 'minimum': '0', 'maximum': '10', 'step': '0.5'},
+                {'object': 'JET', 'type': 'ET', 'minimum': '0', 'maximum': '10', 'step': '0.5'},
+            ],
+            bins={
+                'MU-ET': [{'minimum': str(i * .5), 'maximum': str((i + 1) * .5)} for i in range(20)],
+                'JET-ET': [{'minimum': str(i * .5), 'maximum': str((i + 1) * .5)} for i in range(20)],
+            }
+        )
+        self.menu.extSignals = PlainExtSignal(extSignalSet={'name': 'ExtSignals_Test'}, extSignals=[])
+        self.menu.validate(parallel=True, processes=2)
+        for index in range(2, 8):
+            algorithm = Algorithm(index, f'L1_Mu{index}', f'MU{index}')
+            self.menu.addAlgorithm(algorithm)
+            self.menu.extendReferenced(algorithm)
+        algorithm = Algorithm(9, 'L1_Mu8', 'MU8')
+        self.menu.addAlgorithm(algorithm)
+        self.menu.extendReferenced(algorithm)
+        self.menu.validate(incremental=True, parallel=True, processes=2)
+        errors = []
+        for algorithm in (self.menu.algorithmByIndex(3), self.menu.algorithmByIndex(5)):
+            algorithm.expression = 'MU42'
+            self.menu.updateAlgorithm(algorithm)
+        for parallel in (False, True):
+            with self.assertRaises(AlgorithmSyntaxError) as context:
+                self.menu.validate(parallel=parallel, processes=2)
+            errors.append((str(context.exception), context.exception.token))
+        self.assertEqual(errors[0], errors[1])
+        self.assertEqual(errors[0][1], 'MU42')
+
+    def test_copy(self):
+        menu = copy.deepcopy(self.menu)
+        self.assertIsNot(menu.algorithmByName('L1_Mu0'), self.menu.algorithmByName('L1_Mu0'))
+        self.assertIs(menu.algorithmByName('L1_Mu0'), menu.algorithms[0])
+        self.assertEqual(menu.algorithmsByObject(menu.objectByName('MU0')), [menu.algorithms[0]])
+
+    def test_digest(self):
+        digest = self.menu.digest()
+        self.assertEqual(self.menu.digest(), digest)
+        # Independent of item order and formatting of expressions.
+        menu = copy.deepcopy(self.menu)
+        menu.algorithms.reverse()
+        menu.algorithmByName('L1_Mu0').expression = ' MU0 '
+        self.assertEqual(menu.digest(), digest)
+        # Independent of menu UUID.
+        menu.menu.uuid_menu = '12345678-0000-0000-0000-000000000000'
+        self.assertEqual(menu.digest(), digest)
+        # Changes of items in place are detected.
+        algorithm = self.menu.algorithmByName('L1_Jet1')
+        algorithm.expression = 'JET2'
+        self.assertNotEqual(self.menu.digest(), digest)
+        algorithm.expression = 'JET1'
+        self.assertEqual(self.menu.digest(), digest)
+        self.menu.cutByName('MU-ETA_2p1').minimum = -2.0
+        self.assertNotEqual(self.menu.digest(), digest)
+        self.menu.cutByName('MU-ETA_2p1').minimum = -2.1
+        self.menu.removeObject(self.menu.objectByName('MU0'))
+        self.assertNotEqual(self.menu.digest(), digest)
+    def test_observer(self):
+        observer = RecordingObserver()
+        self.menu.addObserver(observer)
+        self.menu.addAlgorithm(Algorithm(2, 'L1_Mu1', 'MU1'))
+        algorithm = self.menu.algorithmByName('L1_Jet1')
+        algorithm.name = 'L1_Jet1_renamed'
+        self.menu.updateAlgorithm(algorithm)
+        self.menu.removeAlgorithm(self.menu.algorithmByName('L1_Mu0'))
+        self.menu.removeCut(self.menu.cutByName('MU-ETA_2p1'))
+        self.assertEqual(observer.calls, [
+            ('aboutToBeInserted', 'algorithms', 2, 2),
+            ('inserted', 'algorithms', 2, 2),
+            ('changed', 'algorithms', 1, 1),
+            ('aboutToBeRemoved', 'algorithms', 0, 0),
+            ('removed', 'algorithms', 0, 0),
+            ('aboutToBeRemoved', 'cuts', 0, 0),
+            ('removed', 'cuts', 0, 0),
+        ])
+        self.menu.removeObserver(observer)
+        self.menu.addCut(Cut('MU-ETA_2p1', 'MU', 'ETA', -2.1, 2.1))
+        self.assertEqual(len(observer.calls), 7)
+        # Observers are referenced weakly.
+        self.menu.addObserver(observer)
+        reference = weakref.ref(observer)
+        del observer
+        gc.collect()
+        self.assertIsNone(reference())
+    def test_add_bulk(self):
+        observer = RecordingObserver()
+        self.menu.addObserver(observer)
+        algorithms = [Algorithm(index, f'L1_Mu{index}', f'MU{index}') for index in range(2, 5)]
+        self.menu.addAlgorithms(algorithms)
+        self.menu.addCuts([])
+        self.assertEqual(self.menu.algorithms[2:], algorithms)
+        self.assertIs(self.menu.algorithmByIndex(4), algorithms[-1])
+        self.assertEqual(observer.calls, [
+            ('aboutToBeInserted', 'algorithms', 2, 4),
+            ('inserted', 'algorithms', 2, 4),
+        ])
+
+    def test_remove_bulk(self):
+        for index, name in enumerate(('L1_Mu1', 'L1_Mu2', 'L1_Jet2'), 2):
+            self.menu.addAlgorithm(Algorithm(index, name, name[3:].upper()))
+        self.menu.addObject(toObject('MU1'))
+        observer = RecordingObserver()
+        self.menu.addObserver(observer)
+        removed = [self.menu.algorithmByName(name) for name in ('L1_Jet2', 'L1_Mu0', 'L1_Jet1')]
+        self.menu.removeAlgorithms(removed)
+        self.assertEqual([a.name for a in self.menu.algorithms], ['L1_Mu1', 'L1_Mu2'])
+        self.assertIsNone(self.menu.algorithmByName('L1_Mu0'))
+        self.assertIsNone(self.menu.algorithmByIndex(4))
+        self.assertIs(self.menu.algorithmByIndex(3), self.menu.algorithms[1])
+        # One notification per range of adjacent rows, last range first.
+        self.assertEqual(observer.calls, [
+            ('aboutToBeRemoved', 'algorithms', 4, 4),
+            ('removed', 'algorithms', 4, 4),
+            ('aboutToBeRemoved', 'algorithms', 0, 1),
+            ('removed', 'algorithms', 0, 1),
+        ])
+        with self.assertRaises(ValueError):
+            self.menu.removeAlgorithms([self.menu.algorithms[0], removed[0]])
+        self.assertEqual(len(self.menu.algorithms), 2)
+        self.assertEqual(self.menu.removeOrphanedObjects(), ['MU0'])
+        self.assertEqual([o.name for o in self.menu.objects], ['MU1'])
+
+    def test_remove_duplicate(self):
+        duplicate = Algorithm(2, 'L1_Mu0', 'MU0')
+        self.menu.addAlgorithm(duplicate)
+        self.menu.removeAlgorithm(self.menu.algorithmByName('L1_Mu0'))
+        self.assertIs(self.menu.algorithmByName('L1_Mu0'), duplicate)
+
+    def test_move(self):
+        first = self.menu.algorithmByIndex(0)
+        second = self.menu.algorithmByIndex(1)
+        observer = RecordingObserver()
+        self.menu.addObserver(observer)
+        moved = self.menu.moveAlgorithms({0: 1, 1: 5})
+        self.assertEqual(moved, [first, second])
+        self.assertIs(self.menu.algorithmByIndex(1), first)
+        self.assertIs(self.menu.algorithmByIndex(5), second)
+        self.assertIsNone(self.menu.algorithmByIndex(0))
+        self.assertEqual(observer.calls, [('changed', 'algorithms', 0, 1)])
+        self.menu.addAlgorithm(Algorithm(0, 'L1_Mu1', 'MU1'))
+        with self.assertRaises(ValueError):
+            self.menu.moveAlgorithms({1: 0})
+        with self.assertRaises(ValueError):
+            self.menu.moveAlgorithms({42: 0})
+        self.assertIs(self.menu.algorithmByIndex(1), first)
+
+if __name__ == '__main__':
+    unittest.main()
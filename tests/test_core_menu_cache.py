@@ -0,0 +1,85 @@
+from tmEditor.core.Menu import Menu
+from tmEditor.core.Algorithm import Algorithm, Cut, toObject
+from tmEditor.core.MenuCache import MenuCache
+from tmEditor.core.TableHelper import PlainScale, PlainExtSignal
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+def createMenu():
+    menu = Menu()
+    menu.menu.name = 'L1Menu_Test'
+    menu.addAlgorithm(Algorithm(0, 'L1_Mu0', 'MU0'))
+    menu.addCut(Cut('MU-ETA_2p1', 'MU', 'ETA', -2.1, 2.1))
+    menu.addObject(toObject('MU0'))
+    menu.scales = PlainScale(
+        scaleSet={'name': 'Scales_Test'},
+        scales=[{'object': 'MU', 'type': 'ET', 'minimum': '0', 'maximum': '10', 'step': '0.5'}],
+        bins={'MU-ET': [{'minimum': str(i * .5), 'maximum': str((i + 1) * .5)} for i in range(20)]}
+    )
+    menu.extSignals = PlainExtSignal(extSignalSet={'name': 'ExtSignals_Test'}, extSignals=[])
+    return menu
+
+class CoreMenuCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache = MenuCache(self.tempdir.name)
+        self.filename = os.path.join(self.tempdir.name, 'menu.xml')
+        with open(self.filename, 'w') as fp:
+            fp.write('<menu/>')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_key(self):
+        key = self.cache.key(self.filename)
+        self.assertEqual(key, self.cache.key(self.filename))
+        with open(self.filename, 'a') as fp:
+            fp.write(' ')
+        self.assertNotEqual(key, self.cache.key(self.filename))
+
+    def test_store_load(self):
+        key = self.cache.key(self.filename)
+        self.assertIsNone(self.cache.load(key))
+        self.cache.store(key, createMenu(), ['migration'])
+        entry = self.cache.load(key)
+        self.assertEqual(entry.migrations, ['migration'])
+        self.assertEqual(entry.menu.menu.name, 'L1Menu_Test')
+        self.assertEqual(entry.menu.algorithmByName('L1_Mu0').expression, 'MU0')
+        self.assertEqual(entry.menu.algorithmsByObject(entry.menu.objectByName('MU0'))[0].name, 'L1_Mu0')
+        self.assertIsNotNone(entry.menu.cutByName('MU-ETA_2p1'))
+        self.assertEqual(entry.menu.scales.scaleSet['name'], 'Scales_Test')
+        self.assertEqual(len(entry.menu.scales.bins['MU-ET']), 20)
+        self.assertEqual(entry.menu.scaleIndex.meta('MU', 'ET')['step'], '0.5')
+
+    def test_broken(self):
+        with open(self.cache.path('broken'), 'wb') as fp:
+            fp.write(b'garbage')
+        self.assertIsNone(self.cache.load('broken'))
+        self.assertFalse(os.path.exists(self.cache.path('broken')))
+
+    def test_evict(self):
+        menu = createMenu()
+        self.cache.store('a', menu, [])
+        self.cache.store('b', menu, [])
+        size = self.cache.size()
+        # Mark `a' as least recently used.
+        os.utime(self.cache.path('a'), (0, 0))
+        self.cache.maxSize = size - 1
+        self.cache.evict()
+        self.assertIsNone(self.cache.load('a'))
+        self.assertIsNotNone(self.cache.load('b'))
+        self.cache.clear()
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_default(self):
+        with mock.patch.dict(os.environ, {'TM_EDITOR_NO_CACHE': '1'}):
+            self.assertIsNone(MenuCache.default())
+        with mock.patch.dict(os.environ, {'TM_EDITOR_NO_CACHE': '', 'XDG_CACHE_HOME': self.tempdir.name}):
+            self.assertEqual(MenuCache.default().directory, os.path.join(self.tempdir.name, 'tm-editor', 'menus'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+from tmEditor.core.Queue import Queue, QueueCancelledError
+
+import threading
+import unittest
+
+class CoreQueueTests(unittest.TestCase):
+
+    def test_exec(self):
+        calls = []
+        queue = Queue()
+        queue.add_callback(lambda: calls.append(1), "first")
+        queue.add_callback(lambda: calls.append(2), "second")
+        queue.exec_()
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(queue.message(), "second")
+        self.assertEqual(queue.progress(), 100.)
+
+    def test_cancel(self):
+        calls = []
+        queue = Queue()
+        queue.add_callback(lambda: queue.cancel(), "first")
+        queue.add_callback(lambda: calls.append(2), "second")
+        with self.assertRaises(QueueCancelledError):
+            queue.exec_()
+        self.assertTrue(queue.isCancelled())
+        self.assertEqual(calls, [])
+
+    def test_cancel_thread(self):
+        started = threading.Event()
+        resume = threading.Event()
+        calls = []
+        def wait():
+            started.set()
+            resume.wait(5)
+        queue = Queue()
+        queue.add_callback(wait, "waiting")
+        queue.add_callback(lambda: calls.append(2), "second")
+        errors = []
+        def run():
+            try:
+                queue.exec_()
+            except QueueCancelledError as e:
+                errors.append(e)
+        thread = threading.Thread(target=run)
+        thread.start()
+        started.wait(5)
+        queue.cancel()
+        resume.set()
+        thread.join(5)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(calls, [])
+
+    def test_cancel_finished(self):
+        queue = Queue()
+        queue.add_callback(lambda: None, "first")
+        queue.exec_()
+        queue.cancel()
+        self.assertEqual(list(queue), [])
+
+    def test_track(self):
+        reports = []
+        queue = Queue()
+        def process():
+            for item in queue.track(range(3)):
+                pass
+        queue.add_callback(lambda: None, "loading")
+        queue.add_callback(process, "processing")
+        queue.add_progress_handler(reports.append)
+        queue.exec_()
+        self.assertEqual(reports[0].message, "processing")
+        self.assertEqual((reports[0].count, reports[0].total), (0, 3))
+        self.assertEqual((reports[-1].count, reports[-1].total), (3, 3))
+        self.assertEqual(reports[-1].remaining, 0.)
+        self.assertEqual(reports[-1].progress, 100.)
+        self.assertEqual([(item.message, item.count) for item in queue.statistics()], [("loading", None), ("processing", 3)])
+
+if __name__ == '__main__':
+    unittest.main()
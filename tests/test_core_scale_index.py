@@ -0,0 +1,43 @@
+from tmEditor.core.ScaleIndex import ScaleIndex
+
+import types
+import unittest
+
+def createScales():
+    scales = [
+        {'object': 'MU', 'type': 'ET', 'minimum': '0', 'maximum': '255.5', 'step': '0.5'},
+        {'object': 'MU', 'type': 'ETA', 'minimum': '-2.45', 'maximum': '2.45', 'step': '0.0870'},
+    ]
+    bins = {
+        'MU-ET': [{'number': str(i), 'minimum': str(i * .5), 'maximum': str((i + 1) * .5)} for i in range(512)],
+        'MU-ETA': [{'number': '0', 'minimum': '-2.45', 'maximum': '0'}, {'number': '1', 'minimum': '0', 'maximum': '2.45'}],
+    }
+    return types.SimpleNamespace(scales=scales, bins=bins)
+
+class CoreScaleIndexTests(unittest.TestCase):
+
+    def test_lookup(self):
+        index = ScaleIndex(createScales())
+        self.assertEqual(index.meta('MU', 'ET')['step'], '0.5')
+        self.assertIsNone(index.meta('JET', 'ET'))
+        self.assertEqual(len(index.bins('MU', 'ET')), 512)
+        self.assertIs(index.binsByName('MU-ETA'), index.bins('MU', 'ETA'))
+        self.assertIsNone(index.bins('JET', 'ET'))
+        self.assertEqual(index.edges('MU', 'ETA'), [-2.45, 0., 2.45])
+
+    def test_hasEdge(self):
+        index = ScaleIndex(createScales())
+        self.assertTrue(index.hasEdge('MU', 'ET', 0.))
+        self.assertTrue(index.hasEdge('MU', 'ET', 10.5))
+        self.assertTrue(index.hasEdge('MU', 'ET', 256.))
+        self.assertFalse(index.hasEdge('MU', 'ET', 10.25))
+        self.assertFalse(index.hasEdge('MU', 'ET', 300.))
+        self.assertFalse(index.hasEdge('JET', 'ET', 10.))
+
+    def test_empty(self):
+        index = ScaleIndex(None)
+        self.assertIsNone(index.meta('MU', 'ET'))
+        self.assertFalse(index.hasEdge('MU', 'ET', 0.))
+
+if __name__ == '__main__':
+    unittest.main()
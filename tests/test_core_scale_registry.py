@@ -0,0 +1,82 @@
+from tmEditor.core.Menu import Menu
+from tmEditor.core.ScaleRegistry import ScaleRegistry, scaleRegistry
+from tmEditor.core.ScaleIndex import ScaleIndex
+from tmEditor.core.TableHelper import PlainScale, PlainExtSignal, plainScale, tableScale, tableExtSignal
+
+import gc
+import unittest
+
+def createScales(name='Scales_Test', maximum='10'):
+    scales = [{'object': 'MU', 'type': 'ET', 'minimum': '0', 'maximum': maximum, 'step': '0.5', 'n_bits': '5', 'comment': ''}]
+    bins = {'MU-ET': [{'number': str(i), 'minimum': str(i * .5), 'maximum': str((i + 1) * .5)} for i in range(20)]}
+    return PlainScale(scaleSet={'name': name, 'comment': ''}, scales=scales, bins=bins)
+
+class User:
+    pass
+
+class CoreScaleRegistryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = ScaleRegistry()
+
+    def test_scale(self):
+        scale = self.registry.scale(tableScale(createScales()))
+        self.assertIs(self.registry.scale(tableScale(createScales())), scale)
+        self.assertIs(self.registry.plainScale(createScales()), scale)
+        self.assertIsNot(self.registry.scale(tableScale(createScales(maximum='20'))), scale)
+        self.assertIsNot(self.registry.scale(tableScale(createScales(name='Scales_Other'))), scale)
+        self.assertEqual(len(self.registry), 3)
+        self.assertEqual(plainScale(scale), createScales())
+        self.assertIsNone(self.registry.scale(None))
+
+    def test_ext_signal(self):
+        plain = PlainExtSignal({'name': 'ExtSignals_Test'}, [{'name': 'ZDC', 'system': 'MISC', 'cable': '1', 'channel': '0'}])
+        extSignal = self.registry.extSignal(tableExtSignal(plain))
+        self.assertIs(self.registry.plainExtSignal(plain), extSignal)
+
+    def test_derived(self):
+        scale = self.registry.scale(tableScale(createScales()))
+        index = self.registry.derived(scale, ScaleIndex, lambda: ScaleIndex(scale))
+        self.assertIs(self.registry.derived(scale, ScaleIndex, lambda: ScaleIndex(scale)), index)
+        self.assertTrue(self.registry.isRegistered(scale))
+        # Derived data of unregistered sets is not shared.
+        other = tableScale(createScales())
+        self.assertFalse(self.registry.isRegistered(other))
+        self.assertIsNot(self.registry.derived(other, ScaleIndex, lambda: ScaleIndex(other)), self.registry.derived(other, ScaleIndex, lambda: ScaleIndex(other)))
+        self.registry.clear()
+        self.assertEqual(len(self.registry), 0)
+        self.assertFalse(self.registry.isRegistered(scale))
+    def test_release(self):
+        scale = self.registry.scale(tableScale(createScales()))
+        first, second = User(), User()
+        self.registry.attach(first, scale)
+        self.registry.attach(second, scale)
+        self.registry.release(first)
+        self.assertTrue(self.registry.isRegistered(scale))
+        self.registry.detach(second, scale)
+        self.assertFalse(self.registry.isRegistered(scale))
+        self.assertEqual(len(self.registry), 0)
+        # Users are referenced weakly.
+        scale = self.registry.scale(tableScale(createScales()))
+        self.registry.attach(first, scale)
+        del first
+        gc.collect()
+        self.assertFalse(self.registry.isRegistered(scale))
+
+    def test_menu(self):
+        menu = Menu()
+        menu.scales = scaleRegistry.scale(tableScale(createScales(name='Scales_Release')))
+        scales = menu.scales
+        menu.scales = scales
+        self.assertTrue(scaleRegistry.isRegistered(scales))
+        other = Menu()
+        other.scales = scaleRegistry.scale(tableScale(createScales(name='Scales_Release')))
+        self.assertIs(other.scales, scales)
+        scaleRegistry.release(other)
+        self.assertTrue(scaleRegistry.isRegistered(scales))
+        del menu
+        gc.collect()
+        self.assertFalse(scaleRegistry.isRegistered(scales))
+
+if __name__ == '__main__':
+    unittest.main()
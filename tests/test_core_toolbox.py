@@ -0,0 +1,47 @@
+from tmEditor.core.toolbox import CutSpecificationPool, CutSpecification
+
+import unittest
+
+class CoreToolboxTests(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = CutSpecificationPool(
+            CutSpecification('MU-ETA', 'MU', 'ETA', count=2),
+            CutSpecification('MU-QLTY', 'MU', 'QLTY'),
+            CutSpecification('JET-ETA', 'JET', 'ETA', count=2, enabled=False),
+            CutSpecification('DETA', 'dist', 'DETA', range_unit='rad'),
+        )
+
+    def test_query(self):
+        def names(specs): return [spec.name for spec in specs]
+        self.assertEqual(names(self.pool.query(object='MU')), ['MU-ETA', 'MU-QLTY'])
+        self.assertEqual(names(self.pool.query(type='ETA')), ['MU-ETA', 'JET-ETA'])
+        self.assertEqual(names(self.pool.query(type='ETA', object='JET')), ['JET-ETA'])
+        self.assertEqual(names(self.pool.query(enabled=True, object='JET', type='ETA')), [])
+        self.assertEqual(names(self.pool.query(enabled=True)), ['MU-ETA', 'MU-QLTY', 'DETA'])
+        self.assertEqual(names(self.pool.query(range_unit='rad')), ['DETA'])
+        self.assertEqual(names(self.pool.query(functions=[])), ['MU-ETA', 'MU-QLTY', 'JET-ETA', 'DETA'])
+        self.assertEqual(self.pool.query(object='TAU'), ())
+        self.assertEqual(self.pool.query(missing='TAU'), ())
+
+    def test_query_cached(self):
+        self.assertIs(self.pool.query(object='MU'), self.pool.query(object='MU'))
+        self.assertIs(self.pool.query(enabled=True), self.pool.query(enabled=True))
+        self.assertIsInstance(self.pool.query(object='MU'), tuple)
+
+    def test_query_cache_size(self):
+        size = CutSpecificationPool.QueryCacheSize
+        first = self.pool.query(count=2)
+        for value in range(size - 1):
+            self.pool.query(range_unit=value)
+        # Recently used results are kept, least recently used are dropped.
+        self.assertIs(self.pool.query(count=2), first)
+        self.pool.query(range_unit=size)
+        self.assertIs(self.pool.query(count=2), first)
+        for value in range(size):
+            self.pool.query(range_precision=value)
+        self.assertIsNot(self.pool.query(count=2), first)
+        self.assertEqual(self.pool.query(count=2), first)
+
+if __name__ == '__main__':
+    unittest.main()
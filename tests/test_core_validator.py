@@ -0,0 +1,44 @@
+import tmGrammar
+
+from tmEditor.core.Algorithm import Cut
+from tmEditor.core.Menu import Menu
+from tmEditor.core.AlgorithmSyntaxValidator import AlgorithmSyntaxValidator, AlgorithmSyntaxError
+from tmEditor.core.AlgorithmSyntaxValidator import OperatorNode, ObjectNode, ExternalNode, FunctionNode
+
+import unittest
+
+class CoreValidatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.menu = Menu()
+        self.menu.addCut(Cut('MU-ETA_2p1', 'MU', 'ETA', -2.1, 2.1))
+        self.validator = AlgorithmSyntaxValidator(self.menu)
+
+    def test_parse(self):
+        nodes = self.validator.parse('comb{MU20[MU-ETA_2p1],MU10}[CHGCOR_OS] AND EXT_BPTX_plus')
+        function, external, operator = nodes
+        self.assertIsInstance(function, FunctionNode)
+        self.assertIsInstance(external, ExternalNode)
+        self.assertIsInstance(operator, OperatorNode)
+        self.assertEqual(function.name, 'comb')
+        self.assertEqual([object.object.name for object in function.objects], ['MU20', 'MU10'])
+        self.assertEqual([object.threshold for object in function.objects], [20., 10.])
+        self.assertEqual([cut.name for cut in function.cuts], ['CHGCOR_OS'])
+        self.assertIsNone(function.cuts[0].cut)
+        cut = function.objects[0].cuts[0]
+        self.assertEqual(cut.name, 'MU-ETA_2p1')
+        self.assertIs(cut.cut, self.menu.cutByName('MU-ETA_2p1'))
+        self.assertEqual(external.external.name, 'EXT_BPTX_plus')
+
+    def test_parse_object(self):
+        node, = self.validator.parse('MU0[MU-ETA_2p1]')
+        self.assertIsInstance(node, ObjectNode)
+        self.assertEqual(node.object.type, tmGrammar.MU)
+        self.assertEqual([cut.name for cut in node.cuts], ['MU-ETA_2p1'])
+
+    def test_parse_empty(self):
+        with self.assertRaises(AlgorithmSyntaxError):
+            self.validator.parse(' ')
+
+if __name__ == '__main__':
+    unittest.main()
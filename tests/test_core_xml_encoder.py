@@ -0,0 +1,94 @@
+from tmEditor.core.Algorithm import Algorithm, Cut, toObject, toExternal
+from tmEditor.core.Menu import Menu
+from tmEditor.core.TableHelper import PlainScale, PlainExtSignal, tableScale, tableExtSignal
+from tmEditor.core.XmlEncoder import XmlEncoderQueue, XmlEncoderError, RowCache
+
+import os
+import tempfile
+import unittest
+
+def createMenu():
+    menu = Menu()
+    menu.menu.name = 'L1Menu_Test'
+    menu.addAlgorithm(Algorithm(0, 'L1_SingleMu8', 'MU8'))
+    menu.addAlgorithm(Algorithm(1, 'L1_DoubleMu8_6', 'comb{MU8,MU6}[CHGCOR_OS]'))
+    menu.addAlgorithm(Algorithm(2, 'L1_Mu6_Zdc', 'MU6 AND EXT_ZDC'))
+    menu.addCut(Cut('CHGCOR_OS', '', 'CHGCOR', 0, 0, 'os'))
+    for name in ('MU8', 'MU6'):
+        menu.addObject(toObject(name))
+    menu.addExternal(toExternal('EXT_ZDC'))
+    menu.scales = tableScale(PlainScale({'name': 'Scales_Test'}, [], {}))
+    menu.extSignals = tableExtSignal(PlainExtSignal({'name': 'ExtSignals_Test'}, []))
+    return menu
+
+class CoreXmlEncoderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tempdir.name, 'L1Menu_Test.xml')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_requirements(self):
+        queue = XmlEncoderQueue(createMenu(), self.filename)
+        queue.exec_()
+        objects = queue.tables.menu.objects
+        self.assertEqual([row['name'] for row in objects['L1_SingleMu8']], ['MU8'])
+        self.assertEqual([row['name'] for row in objects['L1_DoubleMu8_6']], ['MU8', 'MU6'])
+        self.assertEqual([row['name'] for row in objects['L1_Mu6_Zdc']], ['MU6'])
+        self.assertEqual(dict(objects['L1_SingleMu8'][0]), dict(objects['L1_DoubleMu8_6'][0]))
+        self.assertEqual([row['name'] for row in queue.tables.menu.cuts['L1_DoubleMu8_6']], ['CHGCOR_OS'])
+        self.assertEqual([row['name'] for row in queue.tables.menu.cuts['L1_SingleMu8']], [])
+        self.assertEqual([row['name'] for row in queue.tables.menu.externals['L1_Mu6_Zdc']], ['EXT_ZDC'])
+        self.assertEqual([row['name'] for row in queue.tables.menu.externals['L1_SingleMu8']], [])
+        self.assertTrue(os.path.isfile(self.filename))
+
+    def test_missing_requirement(self):
+        menu = createMenu()
+        menu.removeObject(menu.objectByName('MU6'))
+        queue = XmlEncoderQueue(menu, self.filename)
+        with self.assertRaises(XmlEncoderError):
+            queue.exec_()
+
+    def test_row_cache(self):
+        cache = RowCache()
+        created = []
+        def create(value):
+            created.append(value)
+            return {'name': value}
+        cache.begin()
+        row = cache.row('cut', ('A',), lambda: create('A'))
+        self.assertIs(cache.row('cut', ('A',), lambda: create('A')), row)
+        cache.row('cut', ('B',), lambda: create('B'))
+        cache.commit()
+        self.assertEqual(created, ['A', 'B'])
+        self.assertEqual(len(cache), 2)
+        # Reused by next save, changed content is created again.
+        cache.begin()
+        self.assertIs(cache.row('cut', ('A',), lambda: create('A')), row)
+        cache.row('cut', ('C',), lambda: create('C'))
+        cache.commit()
+        self.assertEqual(created, ['A', 'B', 'C'])
+        # Unused rows are dropped.
+        cache.begin()
+        cache.row('cut', ('A',), lambda: create('A'))
+        cache.commit()
+        self.assertEqual(len(cache), 1)
+
+    def test_incremental_save(self):
+        menu = createMenu()
+        cache = RowCache()
+        XmlEncoderQueue(menu, self.filename, cache).exec_()
+        self.assertEqual(len(cache), 7)
+        algorithm = menu.algorithmByName('L1_SingleMu8')
+        algorithm.expression = 'MU6'
+        menu.updateAlgorithm(algorithm)
+        queue = XmlEncoderQueue(menu, self.filename, cache)
+        queue.exec_()
+        self.assertEqual([row['expression'] for row in queue.tables.menu.algorithms], ['MU6', 'comb{MU8,MU6}[CHGCOR_OS]', 'MU6 AND EXT_ZDC'])
+        self.assertEqual([row['name'] for row in queue.tables.menu.objects['L1_SingleMu8']], ['MU6'])
+        self.assertEqual(len(cache), 7)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+from tmEditor.core.Algorithm import Algorithm, Cut, toObject, toExternal
+from tmEditor.core.Menu import Menu
+from tmEditor.core.TableHelper import PlainScale, PlainExtSignal, tableScale, tableExtSignal
+from tmEditor.core.XmlDecoder import XmlDecoderQueue
+from tmEditor.core.XmlEncoder import XmlEncoderQueue
+from tmEditor.core.XmlReader import StreamReader
+
+import os
+import tempfile
+import unittest
+
+def createScales():
+    scales = []
+    bins = {}
+    for object in ('MU', 'JET'):
+        scales.append({'object': object, 'type': 'ET', 'minimum': '0', 'maximum': '10', 'step': '0.5', 'n_bits': '5', 'comment': ''})
+        bins[f'{object}-ET'] = [{'number': str(i), 'minimum': str(i * .5), 'maximum': str((i + 1) * .5)} for i in range(20)]
+    return PlainScale(scaleSet={'name': 'Scales_Test', 'comment': ''}, scales=scales, bins=bins)
+
+def createExtSignals():
+    extSignals = [{'name': 'ZDC', 'system': 'MISC', 'cable': '1', 'channel': '0', 'description': '', 'label': ''}]
+    return PlainExtSignal(extSignalSet={'name': 'ExtSignals_Test', 'comment': ''}, extSignals=extSignals)
+
+def createMenu():
+    menu = Menu()
+    menu.menu.name = 'L1Menu_Test'
+    menu.menu.comment = 'reader parity'
+    menu.addAlgorithm(Algorithm(0, 'L1_SingleMu8', 'MU8', 'single muon', ['muon']))
+    menu.addAlgorithm(Algorithm(1, 'L1_DoubleMu8_6', 'comb{MU8,MU6}[CHGCOR_LS]'))
+    menu.addAlgorithm(Algorithm(2, 'L1_Jet8_Zdc', 'JET8 AND EXT_ZDC'))
+    # Outdated cut data, migrated on load.
+    menu.addCut(Cut('CHGCOR_LS', '', 'CHGCOR', 0, 0, '0'))
+    for name in ('MU8', 'MU6', 'JET8'):
+        menu.addObject(toObject(name))
+    menu.addExternal(toExternal('EXT_ZDC'))
+    menu.scales = tableScale(createScales())
+    menu.extSignals = tableExtSignal(createExtSignals())
+    return menu
+
+def snapshot(queue):
+    """Returns comparable representation of a decoded menu."""
+    menu = queue.menu
+    def attributes(item):
+        return {key: value for key, value in item.__dict__.items() if not key.startswith('_')}
+    def items(items):
+        return [repr(attributes(item)) for item in items]
+    return {
+        'menu': (menu.menu.name, menu.menu.comment, menu.menu.uuid_menu, menu.menu.grammar_version),
+        'algorithms': [attributes(algorithm) for algorithm in menu.algorithms],
+        'cuts': items(menu.cuts),
+        'objects': items(menu.objects),
+        'externals': items(menu.externals),
+        'scaleSet': dict(menu.scales.scaleSet),
+        'scales': [dict(row) for row in menu.scales.scales],
+        'bins': {name: [dict(row) for row in menu.scales.bins[name]] for name in menu.scales.bins.keys()},
+        'extSignalSet': dict(menu.extSignals.extSignalSet),
+        'extSignals': [dict(row) for row in menu.extSignals.extSignals],
+        'migrations': [(migration.param, migration.before, migration.after) for migration in queue.applied_mirgrations],
+    }
+
+class CoreXmlReaderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tempdir.name, 'L1Menu_Test.xml')
+        XmlEncoderQueue(createMenu(), self.filename).exec_()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def decode(self, backend):
+        queue = XmlDecoderQueue(self.filename, backend=backend)
+        queue.exec_()
+        return queue
+
+    def test_parity(self):
+        expected = snapshot(self.decode('tmtable'))
+        result = snapshot(self.decode('stream'))
+        for key in expected:
+            self.assertEqual(result[key], expected[key], key)
+        self.assertEqual(result['migrations'], [('data', '0', 'ls')])
+
+    def test_stream_reader(self):
+        reader = StreamReader()
+        self.assertEqual(reader.load(self.filename), "")
+        self.assertEqual(reader.info['name'], 'L1Menu_Test')
+        self.assertEqual([algorithm.name for algorithm in reader.algorithms()], ['L1_SingleMu8', 'L1_DoubleMu8_6', 'L1_Jet8_Zdc'])
+        self.assertEqual([cut.name for cut in reader.cuts()], ['CHGCOR_LS'])
+        self.assertEqual([obj.name for obj in reader.objects()], ['MU8', 'MU6', 'JET8', 'MU8'])
+        self.assertEqual(len(reader.scale.bins['MU-ET']), 20)
+
+    def test_stream_reader_invalid(self):
+        with open(self.filename, 'w') as fp:
+            fp.write('<menu><name>')
+        self.assertNotEqual(StreamReader().load(self.filename), "")
+        with self.assertRaises(ValueError):
+            XmlDecoderQueue(self.filename, backend='missing')
+
+if __name__ == '__main__':
+    unittest.main()
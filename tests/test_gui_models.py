@@ -0,0 +1,37 @@
+try:
+    from PyQt5 import QtCore
+except ImportError:
+    QtCore = None
+
+import unittest
+
+class FreshItems:
+    """Sequence returning a new object on every access, like tmTable vectors."""
+
+    def __init__(self, count):
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return {'name': f'item{index}'}
+
+@unittest.skipIf(QtCore is None, "requires PyQt5")
+class GuiModelsTests(unittest.TestCase):
+
+    def test_display_cache_bounded(self):
+        from tmEditor.gui.models.AbstractTableModel import AbstractTableModel
+        model = AbstractTableModel(FreshItems(10))
+        model.addColumnSpec("Name", lambda item: item['name'])
+        for _ in range(3):
+            for row in range(model.rowCount(QtCore.QModelIndex())):
+                model.displayData(row, 0)
+                model.sortKeyData(row, 0)
+        self.assertEqual(model.displayData(3, 0), 'item3')
+        self.assertEqual(len(model._AbstractTableModel__display), 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+"""Headless menu check, decodes, migrates and validates XML menu files
+without starting the GUI (PyQt5 is never imported).
+
+Prints one JSON line per file, containing the result and timing of every
+decoder stage.
+
+    $ tm-editor-check L1Menu_Sample.xml ...
+    {"filename": "L1Menu_Sample.xml", "status": "ok", ...}
+
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from . import __version__
+
+__all__ = ['checkFile', 'main']
+
+StatusOk = 'ok'
+StatusError = 'error'
+
+def parse_args():
+    """Command line argument parser."""
+    parser = argparse.ArgumentParser(
+        description="Decode, migrate and validate trigger menu XML files."
+    )
+    parser.add_argument(
+        'filenames',
+        metavar='<file>',
+        nargs='+',
+        help="trigger menu XML file",
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        metavar='<n>',
+        type=int,
+        default=None,
+        help="number of worker processes (default is number of CPUs)",
+    )
+    parser.add_argument(
+        '--normalize',
+        metavar='<dir>',
+        help="write migrated and normalized menus to directory",
+    )
+    parser.add_argument(
+        '--no-cache',
+        dest='cache',
+        action='store_false',
+        help="do not use the menu cache",
+    )
+    parser.add_argument(
+        '--progress',
+        action='store_true',
+        help="report per item progress of decoder stages to stderr",
+    )
+    parser.add_argument(
+        '-v',
+        '--verbose',
+        action='count',
+        help="increase output verbosity",
+    )
+    parser.add_argument(
+        '-V',
+        '--version',
+        action='version',
+        version=f"%(prog)s {__version__}",
+        help="show the application's version",
+    )
+    return parser.parse_args()
+
+def formatMigration(migration):
+    """Returns dictionary describing an applied migration."""
+    return {
+        'subject': migration.subject.name,
+        'param': migration.param,
+        'before': format(migration.before),
+        'after': format(migration.after),
+    }
+
+def runQueue(queue, stages):
+    """Execute *queue* appending stage message, wall-clock time and item
+    throughput to *stages*, also for stages finished before a failure.
+    """
+    try:
+        queue.exec_()
+    finally:
+        for statistics in queue.statistics():
+            stage = {'stage': statistics.message, 'time': round(statistics.time, 6)}
+            if statistics.count is not None:
+                stage['items'] = statistics.count
+                if statistics.time > 0:
+                    stage['rate'] = round(statistics.count / statistics.time, 1)
+            stages.append(stage)
+
+def progressHandler(filename):
+    """Returns progress handler printing per item progress of *filename* to
+    stderr.
+    """
+    from .core.formatter import fItemProgress
+    def handler(report):
+        sys.stderr.write(f"{filename}: {report.message}: {fItemProgress(report)}\n")
+        sys.stderr.flush()
+    return handler
+
+def checkFile(filename, normalize=None, progress=False, cache=False):
+    """Decode, migrate and validate menu *filename*, optionally write the
+    normalized menu to directory *normalize*. If *progress* is True per item
+    progress is printed to stderr. If *cache* is True the default menu cache
+    is used. Returns result dictionary.
+    """
+    from .core.XmlDecoder import XmlDecoderQueue
+    from .core.MenuCache import MenuCache
+    from .core import XmlEncoder
+
+    result = {
+        'filename': filename,
+        'status': StatusOk,
+        'stages': [],
+    }
+    t0 = time.monotonic()
+    try:
+        queue = XmlDecoderQueue(filename, MenuCache.default() if cache else None)
+        if progress:
+            queue.add_progress_handler(progressHandler(filename))
+        runQueue(queue, result['stages'])
+        menu = queue.menu
+        result['menu'] = menu.menu.name
+        result['uuid_menu'] = menu.menu.uuid_menu
+        result['grammar_version'] = menu.menu.grammar_version
+        result['algorithms'] = len(menu.algorithms)
+        result['cuts'] = len(menu.cuts)
+        result['digest'] = menu.digest()
+        result['migrations'] = [formatMigration(migration) for migration in queue.applied_mirgrations]
+        result['cached'] = queue.cached
+        if normalize:
+            target = os.path.join(normalize, os.path.basename(filename))
+            queue = XmlEncoder.XmlEncoderQueue(menu, target)
+            if progress:
+                queue.add_progress_handler(progressHandler(target))
+            runQueue(queue, result['stages'])
+            result['normalized'] = target
+    except Exception as e:
+        logging.debug("%s: %s", filename, e)
+        result['status'] = StatusError
+        result['error'] = format(e)
+        result['error_type'] = type(e).__name__
+    result['time'] = round(time.monotonic() - t0, 6)
+    return result
+
+def main():
+    """Main check routine, returns non zero if any file failed."""
+    args = parse_args()
+
+    # Setup console logging (stderr), stdout is reserved for results.
+    loggingLevel = logging.DEBUG if args.verbose else logging.WARNING
+    logging.basicConfig(format='%(levelname)s: %(message)s', level=loggingLevel)
+
+    if args.normalize and not os.path.isdir(args.normalize):
+        logging.error("no such directory `%s'", args.normalize)
+        return 2
+
+    failed = 0
+    normalize = [args.normalize] * len(args.filenames)
+    progress = [args.progress] * len(args.filenames)
+    cache = [args.cache] * len(args.filenames)
+    with ProcessPoolExecutor(args.jobs) as executor:
+        for result in executor.map(checkFile, args.filenames, normalize, progress, cache):
+            if result['status'] != StatusOk:
+                failed += 1
+            print(json.dumps(result), flush=True)
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,11 +3,14 @@
 import re, math
 import logging
 
+from collections import namedtuple
+
 import tmGrammar
 
 from .types import ObjectTypes, SignalTypes, ExternalObjectTypes, FunctionCutTypes
 from .Settings import MaxAlgorithms
 from .AlgorithmHelper import decode_threshold, encode_threshold
+from .GrammarContext import GrammarContext
 
 __all__ = ['Algorithm', ]
 
@@ -71,6 +74,10 @@ def toObject(token):
     o = tmGrammar.Object_Item()
     if not tmGrammar.Object_parser(token, o):
         raise ValueError(token)
+    return fromObjectItem(o)
+
+def fromObjectItem(o):
+    """Returns an object's dict from an already parsed object item."""
     return Object(
         name=o.getObjectName(),
         threshold=o.threshold,
@@ -89,6 +96,27 @@ def toExternal(token):
         bx_offset=int(bx_offset)
     )
 
+FunctionItem = namedtuple('FunctionItem', 'token, name, objects, cuts, objectCuts')
+"""Parsed function token, *objects* is a list of Object instances, *cuts* a
+list of function cut names and *objectCuts* a list of cut name lists, one for
+every object.
+"""
+
+def toFunctionItem(token):
+    """Returns a function item parsing the function token only once."""
+    f = tmGrammar.Function_Item()
+    if not tmGrammar.Function_parser(token, f):
+        raise ValueError(token)
+    name = token.split('{')[0].strip() # fetch function name, eg "dist{...}[...]"
+    objects = []
+    for object_token in tmGrammar.Function_getObjects(f):
+        if isObject(object_token):
+            objects.append(toObject(object_token))
+    cuts = list(tmGrammar.Function_getCuts(f))
+    # Note: returns strings containting list of cuts.
+    objectCuts = [names.split(',') if names else [] for names in tmGrammar.Function_getObjectCuts(f)]
+    return FunctionItem(token, name, objects, cuts, objectCuts)
+
 def functionObjects(token):
     """Returns list of object dicts assigned to a function."""
     objects = []
@@ -168,6 +196,44 @@ def calculateTwoBodyPtRange():
     maximum = math.sqrt(pt1**2 + pt2**2 + 2*pt1*pt2*(math.cos(dPhi)**2 + math.sin(dPhi)**2))
     return (minimum, maximum)
 
+# ------------------------------------------------------------------------------
+#  Parsed expression container class.
+# ------------------------------------------------------------------------------
+
+class ParsedExpression:
+    """Parsed representation of an algorithm expression, holding the RPN tokens,
+    the ordered names of referenced objects, externals and cuts and the parsed
+    function items.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tuple(tokens)
+        self.functions = []
+        objects = {}
+        externals = {}
+        cuts = {}
+        for token in self.tokens:
+            if isObject(token):
+                object = toObject(token) # Cast to object required to fetch complete name.
+                objects.setdefault(object.name)
+                for cut in objectCuts(token):
+                    cuts.setdefault(cut)
+            elif isExternal(token):
+                externals.setdefault(toExternal(token).name)
+            elif isFunction(token):
+                function = toFunctionItem(token)
+                self.functions.append(function)
+                for object in function.objects:
+                    objects.setdefault(object.name)
+                for cut in function.cuts:
+                    cuts.setdefault(cut)
+                for objcuts in function.objectCuts:
+                    for cut in objcuts:
+                        cuts.setdefault(cut)
+        self.objects = tuple(objects)
+        self.externals = tuple(externals)
+        self.cuts = tuple(cuts)
+
 # ------------------------------------------------------------------------------
 #  Algorithm's container class.
 # ------------------------------------------------------------------------------
@@ -184,6 +250,15 @@ class Algorithm:
         self.labels = labels or []
         self.modified = False
 
+    @property
+    def expression(self):
+        return self.__expression
+
+    @expression.setter
+    def expression(self, expression):
+        self.__expression = expression
+        self.__parsed = None # drop cached parse result
+
     def __eq__(self, item):
         """Distinquish algorithms."""
         return (self.index, self.name, self.expression) == (item.index, item.name, item.expression)
@@ -192,54 +267,31 @@ class Algorithm:
         """Custom sorting by index, name and expression."""
         return (self.index, self.name, self.expression) < (item.index, item.name, item.expression)
 
+    def parsed(self):
+        """Returns parsed representation of the algorithm expression. The
+        expression is parsed only once, the result is cached until a new
+        expression is assigned.
+        """
+        if self.__parsed is None:
+            with GrammarContext.instance() as context:
+                self.__parsed = ParsedExpression(context.tokenize(self.expression))
+        return self.__parsed
+
     def tokens(self):
         """Returns list of RPN tokens of algorithm expression. Note that paranthesis is not included in RPN."""
-        tmGrammar.Algorithm_Logic.clear()
-        if not tmGrammar.Algorithm_parser(self.expression):
-            raise ValueError("Failed to parse algorithm expression")
-        return list(tmGrammar.Algorithm_Logic.getTokens())
+        return list(self.parsed().tokens)
 
     def objects(self):
         """Returns list of object names used in the algorithm's expression."""
-        objects = set()
-        for token in self.tokens():
-            if isObject(token):
-                object = toObject(token) # Cast to object required to fetch complete name.
-                if not object.name in objects:
-                    objects.add(object.name)
-            if isFunction(token):
-                for object in functionObjects(token):
-                    if not object.name in objects:
-                        objects.add(object.name)
-        return list(objects)
+        return list(self.parsed().objects)
 
     def externals(self):
         """Returns list of external names used in the algorithm's expression."""
-        externals = set()
-        for token in self.tokens():
-            if isExternal(token):
-                external = toExternal(token)
-                if not external.name in externals:
-                    externals.add(external.name)
-        return list(externals)
+        return list(self.parsed().externals)
 
     def cuts(self):
         """Returns list of cut names used in the algorithm's expression."""
-        cuts = set()
-        for token in self.tokens():
-            if isObject(token):
-                for cut in objectCuts(token):
-                    if not cut in cuts:
-                        cuts.add(cut)
-            if isFunction(token):
-                for cut in functionCuts(token):
-                    if not cut in cuts:
-                        cuts.add(cut)
-                for objcuts in functionObjectsCuts(token):
-                    for cut in objcuts:
-                        if not cut in cuts:
-                            cuts.add(cut)
-        return list(cuts)
+        return list(self.parsed().cuts)
 
     def validate(self):
         """Optional argument validate is a function to validate the algorithm expression."""
@@ -8,13 +8,15 @@ Usage example
 
 """
 
+from collections import namedtuple
+
 import tmGrammar
 
 from .Settings import CutSpecs
 from .types import SignalTypes, ObjectScaleMap, FunctionTypes
 from .Algorithm import isOperator, isObject, isExternal, isFunction
-from .Algorithm import toObject, toExternal
-from .Algorithm import functionObjects, functionCuts, functionObjectsCuts, objectCuts
+from .Algorithm import fromObjectItem, toExternal
+from .GrammarContext import GrammarContext
 
 __all__ = ['AlgorithmSyntaxValidator', 'AlgorithmSyntaxError']
 
@@ -29,6 +31,29 @@ kObject = 'object'
 kStep = 'step'
 kType = 'type'
 
+# -----------------------------------------------------------------------------
+#  Intermediate representation
+# -----------------------------------------------------------------------------
+
+OperatorNode = namedtuple('OperatorNode', 'token')
+"""Logical operator."""
+
+ObjectNode = namedtuple('ObjectNode', 'token, object, threshold, cuts')
+"""Object requirement, *object* is an Object instance, *threshold* its decoded
+threshold and *cuts* a list of assigned CutNode items.
+"""
+
+ExternalNode = namedtuple('ExternalNode', 'token, external')
+"""External signal, *external* is an External instance."""
+
+FunctionNode = namedtuple('FunctionNode', 'token, name, objects, cuts')
+"""Function, *objects* is a list of ObjectNode items and *cuts* a list of
+CutNode items assigned to the function.
+"""
+
+CutNode = namedtuple('CutNode', 'name, cut')
+"""Cut reference, *cut* is the menu's Cut instance or None if not defined."""
+
 # -----------------------------------------------------------------------------
 #  Base classes
 # -----------------------------------------------------------------------------
@@ -41,9 +66,9 @@ class SyntaxValidator:
         self.rules = []
 
     def validate(self, expression):
-        tokens = self.tokenize(expression)
+        nodes = self.parse(expression)
         for rule in self.rules:
-            rule.validate(tokens)
+            rule.validate(nodes)
 
     def addRule(self, cls):
         """Add a syntx rule class. Creates and tores an instance of the class."""
@@ -51,16 +76,21 @@ class SyntaxValidator:
 
     def tokenize(self, expression):
         """Parses algorithm expression and returns list of RPN tokens."""
-        # Make sure to clear static algorithm logic.
-        tmGrammar.Algorithm_Logic.clear()
         # Check for empty expression
         if not expression.strip():
             message = "Empty expression"
             raise AlgorithmSyntaxError(message)
-        if not tmGrammar.Algorithm_parser(expression):
+        try:
+            return GrammarContext.instance().tokenize(expression)
+        except ValueError:
             message = f"Invalid expression `{expression}'"
             raise AlgorithmSyntaxError(message)
-        return tmGrammar.Algorithm_Logic.getTokens()
+
+    def parse(self, expression):
+        """Returns intermediate representation passed to the rules, to be
+        overloaded by inheriting classes. Default are the RPN tokens.
+        """
+        return self.tokenize(expression)
 
 class SyntaxRule:
     """Base class to be inherited by custom syntax rule classes."""
@@ -68,28 +98,7 @@ class SyntaxRule:
     def __init__(self, validator):
         self.validator = validator
 
-    def toObjectItem(self, token):
-        item = tmGrammar.Object_Item()
-        if not tmGrammar.Object_parser(token, item):
-            message = f"Invalid object statement `{item.message}`"
-            raise AlgorithmSyntaxError(message, token)
-        return item
-
-    def toFunctionItem(self, token):
-        item = tmGrammar.Function_Item()
-        if not tmGrammar.Function_parser(token, item):
-            message = f"Invalid function statement `{item.message}`"
-            raise AlgorithmSyntaxError(message, token)
-        return item
-
-    def toCutItem(self, token):
-        item = tmGrammar.Cut_Item()
-        if not tmGrammar.Cut_parser(token, item):
-            message = f"Invalid cut statement `{item.message}` at object {token}"
-            raise AlgorithmSyntaxError(message, token)
-        return item
-
-    def validate(self, tokens):
+    def validate(self, nodes):
         raise NotImplementedError()
 
 # -----------------------------------------------------------------------------
@@ -102,8 +111,14 @@ class AlgorithmSyntaxError(Exception):
         super().__init__(message)
         self.token = token
 
+    def __reduce__(self):
+        """Keep token when pickled, eg. by worker processes."""
+        return (self.__class__, (str(self), self.token))
+
 class AlgorithmSyntaxValidator(SyntaxValidator):
-    """Algorithm syntax validator class."""
+    """Algorithm syntax validator class. Every token is parsed only once into
+    a list of nodes (see ObjectNode, FunctionNode etc.) shared by all rules.
+    """
 
     def __init__(self, menu):
         super().__init__(menu)
@@ -118,58 +133,105 @@ class AlgorithmSyntaxValidator(SyntaxValidator):
         self.addRule(TransverseMass)
         self.addRule(TwoBodyPtNrObjects)
 
+    def parse(self, expression):
+        """Returns list of nodes, one for every RPN token."""
+        with GrammarContext.instance():
+            return [self.toNode(token) for token in self.tokenize(expression)]
+
+    def toNode(self, token):
+        if isOperator(token):
+            return OperatorNode(token)
+        if isObject(token):
+            item = self.toObjectItem(token)
+            for cut in item.cuts:
+                self.toCutItem(cut)
+            return self.toObjectNode(token, item, item.cuts)
+        if isFunction(token):
+            return self.toFunctionNode(token)
+        if isExternal(token):
+            return ExternalNode(token, toExternal(token))
+        message = f"Invalid expression `{token}`"
+        raise AlgorithmSyntaxError(message, token)
+
+    def toObjectNode(self, token, item, cuts):
+        object = fromObjectItem(item)
+        return ObjectNode(token, object, object.decodeThreshold(), self.toCutNodes(cuts))
+
+    def toFunctionNode(self, token):
+        item = self.toFunctionItem(token)
+        for cut in item.cuts:
+            self.toCutItem(cut)
+        name = token.split('{')[0].strip() # fetch function name, eg "dist{...}[...]"
+        objects = []
+        # Note: object cuts are returned as strings containting list of cuts.
+        objectCuts = tmGrammar.Function_getObjectCuts(item)
+        for i, objectToken in enumerate(tmGrammar.Function_getObjects(item)):
+            if isObject(objectToken):
+                names = objectCuts[i].split(',') if objectCuts[i] else []
+                objects.append(self.toObjectNode(objectToken, self.toObjectItem(objectToken), names))
+        cuts = self.toCutNodes(tmGrammar.Function_getCuts(item))
+        return FunctionNode(token, name, objects, cuts)
+
+    def toCutNodes(self, names):
+        cutByName = self.menu.cutByName
+        return [CutNode(name, cutByName(name)) for name in names]
+
+    def toObjectItem(self, token):
+        item = tmGrammar.Object_Item()
+        if not tmGrammar.Object_parser(token, item):
+            message = f"Invalid object statement `{item.message}`"
+            raise AlgorithmSyntaxError(message, token)
+        return item
+
+    def toFunctionItem(self, token):
+        item = tmGrammar.Function_Item()
+        if not tmGrammar.Function_parser(token, item):
+            message = f"Invalid function statement `{item.message}`"
+            raise AlgorithmSyntaxError(message, token)
+        return item
+
+    def toCutItem(self, token):
+        item = tmGrammar.Cut_Item()
+        if not tmGrammar.Cut_parser(token, item):
+            message = f"Invalid cut statement `{item.message}` at object {token}"
+            raise AlgorithmSyntaxError(message, token)
+        return item
+
 class BasicSyntax(SyntaxRule):
     """Validates basic algorithm syntax."""
-    def validate(self, tokens):
+    def validate(self, nodes):
         menu = self.validator.menu
         ext_signal_names = [item[kName] for item in menu.extSignals.extSignals]
-        for token in tokens:
-            # Validate operators
-            if isOperator(token):
-                pass
-            # Validate object
-            elif isObject(token):
-                o = self.toObjectItem(token)
-                for cut in o.cuts:
-                    self.toCutItem(cut)
-            # Validate function
-            elif isFunction(token):
-                f = self.toFunctionItem(token)
-                for cut in f.cuts:
-                    self.toCutItem(cut)
+        for node in nodes:
             # Validate externals
-            elif isExternal(token):
-                external = toExternal(token)
-                if external.signal_name not in ext_signal_names:
-                    message = f"Invalid external signal `{token}`"
-                    raise AlgorithmSyntaxError(message, token)
-            else:
-                message = f"Invalid expression `{token}`"
-                raise AlgorithmSyntaxError(message, token)
+            if isinstance(node, ExternalNode):
+                if node.external.signal_name not in ext_signal_names:
+                    message = f"Invalid external signal `{node.token}`"
+                    raise AlgorithmSyntaxError(message, node.token)
 
 class ObjectThresholds(SyntaxRule):
     """Validates object thresholds/counts."""
 
-    def validate(self, tokens):
+    def validate(self, nodes):
         # TODO... better to use floating point representation and compare by string?!
-        for token in tokens:
+        for node in nodes:
             # Validate object
-            if isObject(token):
-                object = toObject(token)
-                if object.type not in SignalTypes:
-                    self.validateThreshold(token, object)
+            if isinstance(node, ObjectNode):
+                if node.object.type not in SignalTypes:
+                    self.validateThreshold(node.token, node)
             # Validate function
-            if isFunction(token):
-                for object in functionObjects(token):
-                    self.validateThreshold(token, object)
+            if isinstance(node, FunctionNode):
+                for object in node.objects:
+                    self.validateThreshold(node.token, object)
 
-    def validateThreshold(self, token, object):
+    def validateThreshold(self, token, node):
         menu = self.validator.menu
+        object = node.object
         scale = menu.scaleMeta(object, ObjectScaleMap[object.type])
         if not scale:
             message = "No such object type `{0}` in scale set `{1}`.".format(object.type, menu.scales.scaleSet[kName])
             raise AlgorithmSyntaxError(message, token)
-        threshold = object.decodeThreshold()
+        threshold = node.threshold
         minimum = float(scale[kMinimum])
         maximum = float(scale[kMaximum])
         step = float(scale[kStep])
@@ -178,90 +240,79 @@ class ObjectThresholds(SyntaxRule):
             message = f"Object threshold exceeding scale limits ({minimum:.1f}..{maximum:.1f}) near `{token}`"
             raise AlgorithmSyntaxError(message, token)
         # Check step
-        bins = menu.scaleBins(object, ObjectScaleMap[object.type])
-        if not list(filter(lambda bin: float(bin[kMinimum]) == threshold or float(bin[kMaximum]) == threshold, bins)):
+        if not menu.scaleIndex.hasEdge(object.type, ObjectScaleMap[object.type], threshold):
             message = f"Invalid threshold `{object.threshold}` at object `{token}`"
             raise AlgorithmSyntaxError(message, token)
 
 class CombBxOffset(SyntaxRule):
     """Validates that all objects of a combination function use the same BX offset."""
 
-    def validate(self, tokens):
-        for token in tokens:
-            if not isFunction(token):
+    def validate(self, nodes):
+        for node in nodes:
+            if not isinstance(node, FunctionNode):
                 continue
-            name = token.split('{')[0].strip() # fetch function name, eg "dist{...}[...]"
+            name = node.name
             if not name in (tmGrammar.comb, tmGrammar.comb_orm):
                 continue
-            f = tmGrammar.Function_Item()
-            if not tmGrammar.Function_parser(token, f):
-                raise AlgorithmSyntaxError(f.message)
-            objects = functionObjects(token)
+            objects = [object.object for object in node.objects]
             sameBxRange = len(objects)
             if name == tmGrammar.comb_orm:
                 sameBxRange -= 1 # exclude last object
             for i in range(sameBxRange):
                 if int(objects[i].bx_offset) != int(objects[0].bx_offset):
                     message = f"All object requirements of function {name}{{...}} must be of same bunch crossing offset.\n" \
-                              f"Invalid expression near `{token}`" # TODO differentiate!
-                    raise AlgorithmSyntaxError(message, token)
+                              f"Invalid expression near `{node.token}`" # TODO differentiate!
+                    raise AlgorithmSyntaxError(message, node.token)
 
 class ChargeCorrelation(SyntaxRule):
     """Validates that all objects of a function are of type muon if applying a CHGCOR cut."""
 
-    def validate(self, tokens):
-        for token in tokens:
-            if not isFunction(token):
+    def validate(self, nodes):
+        for node in nodes:
+            if not isinstance(node, FunctionNode):
                 continue
-            f = tmGrammar.Function_Item()
-            if not tmGrammar.Function_parser(token, f):
-                raise AlgorithmSyntaxError(f.message)
             # Test for applied CHGCOR cuts
-            if not list(filter(lambda name: name.startswith(tmGrammar.CHGCOR), functionCuts(token))):
+            if not list(filter(lambda cut: cut.name.startswith(tmGrammar.CHGCOR), node.cuts)):
                 continue
-            objects = functionObjects(token)
-            for i in range(len(objects)):
-                if objects[i].type != tmGrammar.MU:
-                    name = token.split('{')[0] # TODO: get function name
+            for object in node.objects:
+                if object.object.type != tmGrammar.MU:
+                    name = node.name
                     message = f"All object requirements of function {name}{{...}} must be of type `{tmGrammar.MU}` when applying a `{tmGrammar.CHGCOR}` cut.\n" \
-                              f"Invalid expression near `{token}`"
-                    raise AlgorithmSyntaxError(message, token)
+                              f"Invalid expression near `{node.token}`"
+                    raise AlgorithmSyntaxError(message, node.token)
 
 class DistNrObjects(SyntaxRule):
     """Limit number of objects for distance function."""
 
-    def validate(self, tokens):
-        for token in tokens:
-            if not isFunction(token):
+    def validate(self, nodes):
+        for node in nodes:
+            if not isinstance(node, FunctionNode):
                 continue
-            name = token.split('{')[0].strip() # fetch function name, eg "dist{...}[...]"
+            name = node.name
             if not name in (tmGrammar.dist, tmGrammar.dist_orm):
                 continue
-            f = tmGrammar.Function_Item()
-            if not tmGrammar.Function_parser(token, f):
-                raise AlgorithmSyntaxError(f.message)
-            objects = functionObjects(token)
-            if name == tmGrammar.dist and len(objects) != 2:
+            if name == tmGrammar.dist and len(node.objects) != 2:
                 message = f"Function {name}{{...}} requires excactly two object requirements.\n" \
-                          f"Invalid expression near `{token}`"
+                          f"Invalid expression near `{node.token}`"
                 raise AlgorithmSyntaxError(message)
 
 class DistDeltaRange(SyntaxRule):
     """Validates that delta-eta/phi cut ranges does not exceed assigned objects limits."""
 
-    def validate(self, tokens):
+    def validate(self, nodes):
         menu = self.validator.menu
-        for token in tokens:
-            if not isFunction(token):
+        for node in nodes:
+            if not isinstance(node, FunctionNode):
                 continue
-            name = token.split('{')[0].strip() # fetch function name, eg "dist{...}[...]"
-            if not name in (tmGrammar.dist, tmGrammar.dist_orm):
+            if not node.name in (tmGrammar.dist, tmGrammar.dist_orm):
                 continue
-            for name in functionCuts(token):
-                cut = menu.cutByName(name)
+            for name, cut in node.cuts:
+                if not cut:
+                    continue
                 if cut.type == tmGrammar.DETA:
-                    for object in functionObjects(token):
-                        scale = list(filter(lambda scale: scale[kObject] == object.type and scale[kType] == tmGrammar.ETA, menu.scales.scales))[0]
+                    for object in node.objects:
+                        object = object.object
+                        scale = menu.scaleIndex.meta(object.type, tmGrammar.ETA)
                         minimum = 0
                         maximum = abs(float(scale[kMinimum])) + float(scale[kMaximum])
                         if not minimum <= float(cut.minimum) <= maximum:
@@ -271,8 +322,9 @@ class DistDeltaRange(SyntaxRule):
                             message = f"Cut `{name}` maximum limit of {cut.maximum} exceed valid object DETA range of {maximum}"
                             raise AlgorithmSyntaxError(message)
                 if cut.type == tmGrammar.DPHI:
-                    for object in functionObjects(token):
-                        scale = list(filter(lambda scale: scale[kObject] == object.type and scale[kType] == tmGrammar.PHI, menu.scales.scales))[0]
+                    for object in node.objects:
+                        object = object.object
+                        scale = menu.scaleIndex.meta(object.type, tmGrammar.PHI)
                         minimum = 0
                         maximum = float(format(float(scale[kMaximum]), '.3f'))
                         if not minimum <= float(cut.minimum) <= maximum:
@@ -287,27 +339,24 @@ class DistDeltaRange(SyntaxRule):
 class CutCount(SyntaxRule):
     """Limit number of cuts allowed to be assigned at once."""
 
-    def validate(self, tokens):
-        for token in tokens:
+    def validate(self, nodes):
+        for node in nodes:
             # Objects
-            if isObject(token):
-                counts = self.countCuts(objectCuts(token))
-                self.checkCutCount(token, counts)
+            if isinstance(node, ObjectNode):
+                counts = self.countCuts(node.cuts)
+                self.checkCutCount(node.token, counts)
             # Functions
-            if isFunction(token):
-                obj_cuts = functionObjectsCuts(token)
-                for i, obj_token in enumerate(functionObjects(token)):
-                    counts = self.countCuts(obj_cuts[i])
-                    self.checkCutCount(token, counts)
-                counts = self.countCuts(functionCuts(token))
-                self.checkCutCount(token, counts)
-
-    def countCuts(self, names):
+            if isinstance(node, FunctionNode):
+                for object in node.objects:
+                    counts = self.countCuts(object.cuts)
+                    self.checkCutCount(node.token, counts)
+                counts = self.countCuts(node.cuts)
+                self.checkCutCount(node.token, counts)
+
+    def countCuts(self, cuts):
         """Returns dictionary with key of cut object/type pair and occurence as value."""
-        menu = self.validator.menu
         counts = {}
-        for name in names:
-            cut = menu.cutByName(name)
+        for name, cut in cuts:
             if cut:
                 key = (cut.object, cut.type)
                 if not key in counts:
@@ -329,57 +378,50 @@ class CutCount(SyntaxRule):
 class TransverseMass(SyntaxRule):
     """Validates transverse mass object requirements At least one non eta object is required."""
 
-    def validate(self, tokens):
-        for token in tokens:
-            if not isFunction(token):
+    def validate(self, nodes):
+        for node in nodes:
+            if not isinstance(node, FunctionNode):
                 continue
-            name = token.split('{')[0].strip() # fetch function name, eg "dist{...}[...]"
-            if not name == tmGrammar.mass_trv:
+            if not node.name == tmGrammar.mass_trv:
                 continue
-            objects = functionObjects(token)
             nonEtaCount = 0
-            for obj in objects:
-                if obj.type in (tmGrammar.ETM, tmGrammar.ETMHF, tmGrammar.HTM):
+            for obj in node.objects:
+                if obj.object.type in (tmGrammar.ETM, tmGrammar.ETMHF, tmGrammar.HTM):
                     nonEtaCount += 1
             if nonEtaCount < 1:
                 message = f"Transverse mass functions require at least one object requirement without an eta component (ETM, ETMHF, HTM).\n" \
-                          f"Invalid expression near `{token}`"
-                raise AlgorithmSyntaxError(message, token)
+                          f"Invalid expression near `{node.token}`"
+                raise AlgorithmSyntaxError(message, node.token)
 
 class InvarientMass3(SyntaxRule):
     """Validates invariant mass of three objects requirements."""
 
-    def validate(self, tokens):
-        for token in tokens:
-            if not isFunction(token):
+    def validate(self, nodes):
+        for node in nodes:
+            if not isinstance(node, FunctionNode):
                 continue
-            name = token.split('{')[0].strip() # fetch function name, eg "dist{...}[...]"
-            if not name == tmGrammar.mass_inv_3:
+            if not node.name == tmGrammar.mass_inv_3:
                 continue
-            objects = functionObjects(token)
-            types = {object.type for object in objects}
+            types = {object.object.type for object in node.objects}
             if len(types) != 1:
                 message = f"Invarient mass for three objects functions require only muons or only calorimeter objects.\n" \
-                          f"Invalid expression near `{token}`"
-                raise AlgorithmSyntaxError(message, token)
+                          f"Invalid expression near `{node.token}`"
+                raise AlgorithmSyntaxError(message, node.token)
 
 class TwoBodyPtNrObjects(SyntaxRule):
     """Validates number of objects in combination with two body Pt cuts."""
 
-    def validate(self, tokens):
-        menu = self.validator.menu
-        for token in tokens:
-            if not isFunction(token):
+    def validate(self, nodes):
+        for node in nodes:
+            if not isinstance(node, FunctionNode):
                 continue
-            name = token.split('{')[0].strip() # fetch function name, eg "dist{...}[...]"
+            name = node.name
             requiredObjects = (2, 2)
             if name in (tmGrammar.comb_orm, tmGrammar.dist_orm, tmGrammar.mass_inv_orm):
                 requiredObjects = (2, 3) # for overlap removal add the reference
-            objects = functionObjects(token)
-            for cutname in functionCuts(token):
-                cut = menu.cutByName(cutname)
-                if cut.type == tmGrammar.TBPT:
-                    if not requiredObjects[0] <= len(objects) <= requiredObjects[1]:
+            for cutname, cut in node.cuts:
+                if cut and cut.type == tmGrammar.TBPT:
+                    if not requiredObjects[0] <= len(node.objects) <= requiredObjects[1]:
                         message = f"Two body Pt cut requires exactly two base object requirements to be applied on.\n" \
-                                  f"Invalid expression in function `{name}` with cut `{cutname}` near `{token}`"
-                        raise AlgorithmSyntaxError(message, token)
+                                  f"Invalid expression in function `{name}` with cut `{cutname}` near `{node.token}`"
+                        raise AlgorithmSyntaxError(message, node.token)
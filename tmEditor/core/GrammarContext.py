@@ -0,0 +1,70 @@
+"""Grammar parser context.
+
+The algorithm parser of tmGrammar stores its result in the process global
+`Algorithm_Logic`, which makes parsing not thread safe. All algorithm
+expressions must be parsed using this context, serializing access to the
+parser and returning independent token lists.
+
+Usage example
+-------------
+
+>>> tokens = GrammarContext.instance().tokenize(expression)
+
+Use the context as lock for calling other grammar functions exclusively.
+
+>>> with GrammarContext.instance():
+...     tmGrammar.Algorithm_parser(expression)
+
+"""
+
+import os
+import threading
+
+import tmGrammar
+
+__all__ = ['GrammarContext', ]
+
+# -----------------------------------------------------------------------------
+#  Grammar context class
+# -----------------------------------------------------------------------------
+
+class GrammarContext:
+    """Serializes access to the algorithm parser, use `instance()` to get the
+    context of the current process.
+    """
+
+    __instances = {}
+    __instancesLock = threading.Lock()
+
+    def __init__(self):
+        self.__lock = threading.RLock()
+
+    @classmethod
+    def instance(cls):
+        """Returns context of the current process. Worker processes get their
+        own instance (and lock), as the parser state is process local.
+        """
+        pid = os.getpid()
+        context = cls.__instances.get(pid)
+        if context is None:
+            with cls.__instancesLock:
+                context = cls.__instances.setdefault(pid, cls())
+        return context
+
+    def __enter__(self):
+        self.__lock.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__lock.release()
+
+    def tokenize(self, expression):
+        """Parses algorithm *expression* and returns list of RPN tokens.
+        Raises a ValueError if parsing fails.
+        """
+        with self:
+            # Make sure to clear static algorithm logic.
+            tmGrammar.Algorithm_Logic.clear()
+            if not tmGrammar.Algorithm_parser(expression):
+                raise ValueError(f"Failed to parse algorithm expression `{expression}'")
+            return list(tmGrammar.Algorithm_Logic.getTokens())
@@ -1,14 +1,22 @@
 """Menu container."""
 
+import contextlib
+import functools
+import itertools
 import logging
 import uuid
 import re
+import weakref
 
 from distutils.version import StrictVersion
 
 from .Settings import MaxAlgorithms
 from .AlgorithmSyntaxValidator import AlgorithmSyntaxValidator
 from .Algorithm import toObject, toExternal
+from .ScaleIndex import ScaleIndex
+from .ScaleRegistry import scaleRegistry
+from .ParallelValidator import ParallelValidator
+from .MenuDigest import MenuDigest
 
 __all__ = ['Menu', 'GrammarVersion']
 
@@ -16,11 +24,106 @@ GrammarVersion = StrictVersion('0.8')
 """Supported grammar version."""
 
 # ------------------------------------------------------------------------------
-#  Keys
+#  Item index class
 # ------------------------------------------------------------------------------
 
-kObject = 'object'
-kType = 'type'
+class ItemIndex:
+    """Dictionary index of menu items, providing constant time lookups by a key
+    returned by *keyfunc*. Keeps track of the key every item was indexed with,
+    so in place modified items can be re-indexed.
+    """
+
+    def __init__(self, keyfunc):
+        self.keyfunc = keyfunc
+        self.items = {}
+        self.keys = {} # item id -> indexed key
+        self.counts = {} # key -> number of indexed items
+
+    def get(self, key):
+        return self.items.get(key)
+
+    def __addKey(self, item, key):
+        self.keys[id(item)] = key
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def add(self, item):
+        """Add *item*, the first added item wins on duplicate keys."""
+        key = self.keyfunc(item)
+        self.items.setdefault(key, item)
+        self.__addKey(item, key)
+
+    def remove(self, item, items):
+        """Remove *item*, falls back to another item of *items* with same key.
+        Only duplicate keys require a scan of *items*.
+        """
+        key = self.keys.pop(id(item), None)
+        if key is None:
+            return
+        count = self.counts.pop(key) - 1
+        if count:
+            self.counts[key] = count
+        if self.items.get(key) is item:
+            del self.items[key]
+            if count:
+                for other in items:
+                    if other is not item and self.keys.get(id(other)) == key:
+                        self.items[key] = other
+                        break
+
+    def update(self, item, items):
+        """Re-index *item* after its key changed."""
+        self.remove(item, items)
+        key = self.keyfunc(item)
+        self.items[key] = item
+        self.__addKey(item, key)
+
+# ------------------------------------------------------------------------------
+#  Reference index class
+# ------------------------------------------------------------------------------
+
+class ReferenceIndex:
+    """Reverse index mapping names referenced by algorithms (cuts, objects or
+    external signals) returned by *namesfunc* to the referencing algorithms.
+    Keeps track of the names every algorithm was registered with, so in place
+    modified algorithms can be re-registered without parsing the previous
+    expression.
+    """
+
+    def __init__(self, namesfunc):
+        self.namesfunc = namesfunc
+        self.items = {} # name -> {algorithm id: algorithm}
+        self.names = {} # algorithm id -> registered names
+
+    def get(self, name):
+        """Returns list of algorithms referencing *name* sorted by index."""
+        algorithms = self.items.get(name, {}).values()
+        return sorted(algorithms, key=lambda algorithm: int(algorithm.index))
+
+    def count(self, name):
+        """Returns number of algorithms referencing *name*."""
+        return len(self.items.get(name, ()))
+
+    def add(self, algorithm):
+        try:
+            names = tuple(set(self.namesfunc(algorithm)))
+        except ValueError:
+            logging.warning("unable to index references of algorithm: %s", algorithm.name)
+            names = ()
+        for name in names:
+            self.items.setdefault(name, {})[id(algorithm)] = algorithm
+        self.names[id(algorithm)] = names
+
+    def remove(self, algorithm):
+        for name in self.names.pop(id(algorithm), ()):
+            algorithms = self.items[name]
+            del algorithms[id(algorithm)]
+            if not algorithms:
+                del self.items[name]
+
+    def update(self, algorithm):
+        """Re-register *algorithm* after its expression changed."""
+        self.remove(algorithm)
+        self.add(algorithm)
 
 # ------------------------------------------------------------------------------
 #  Menu container class
@@ -31,7 +134,14 @@ class Menu:
     menu files and adding and removing contents.
     """
 
+    StateAttributes = ('menu', 'algorithms', 'cuts', 'objects', 'externals', 'scales', 'extSignals')
+    """Attributes to be copied or pickled, all others are rebuilt."""
+
     def __init__(self):
+        self.__serial = itertools.count(1)
+        self.__observers = weakref.WeakSet()
+        self.__scales = None
+        self.__extSignals = None
         self.menu = MenuInfo()
         self.algorithms = []
         self.cuts = []
@@ -39,24 +149,318 @@ class Menu:
         self.externals = []
         self.scales = None
         self.extSignals = None
+        self.__reindex()
+
+    def __getstate__(self):
+        """Indexes are keyed by item identity, rebuild them on copy or unpickle."""
+        return {key: getattr(self, key) for key in self.StateAttributes}
+
+    def __setstate__(self, state):
+        self.__serial = itertools.count(1)
+        self.__observers = weakref.WeakSet()
+        self.__scales = None
+        self.__extSignals = None
+        for key, value in state.items():
+            setattr(self, key, value)
+        self.__reindex()
+
+    @property
+    def scales(self):
+        return self.__scales
+
+    @scales.setter
+    def scales(self, scales):
+        if scales is not self.__scales:
+            scaleRegistry.attach(self, scales)
+            scaleRegistry.detach(self, self.__scales)
+        self.__scales = scales
+        # Shared by all menus assigned the same registered scale set.
+        self.__scaleIndex = scaleRegistry.derived(scales, ScaleIndex, lambda: ScaleIndex(scales))
+        self.__scalesVersion = next(self.__serial)
+
+    @property
+    def extSignals(self):
+        return self.__extSignals
+
+    @extSignals.setter
+    def extSignals(self, extSignals):
+        if extSignals is not self.__extSignals:
+            scaleRegistry.attach(self, extSignals)
+            scaleRegistry.detach(self, self.__extSignals)
+        self.__extSignals = extSignals
+        self.__extSignalsVersion = next(self.__serial)
+
+    @property
+    def scaleIndex(self):
+        """Lookup index of assigned scale set, see class ScaleIndex."""
+        return self.__scaleIndex
+
+    def __reindex(self):
+        """Rebuild all lookup indexes from scratch."""
+        self.__versions = {} # item id -> version
+        self.__validated = {} # algorithm id -> validation key
+        self.__digest = MenuDigest()
+        self.__algorithmsByName = ItemIndex(lambda item: item.name)
+        self.__algorithmsByIndex = ItemIndex(lambda item: int(item.index))
+        self.__cutsByName = ItemIndex(lambda item: item.name)
+        self.__objectsByName = ItemIndex(lambda item: item.name)
+        self.__externalsByName = ItemIndex(lambda item: item.name)
+        self.__cutReferences = ReferenceIndex(lambda algorithm: algorithm.cuts())
+        self.__objectReferences = ReferenceIndex(lambda algorithm: algorithm.objects())
+        self.__externalReferences = ReferenceIndex(lambda algorithm: algorithm.externals())
+        for algorithm in self.algorithms:
+            self.__indexAlgorithm(algorithm)
+        for cut in self.cuts:
+            self.__cutsByName.add(cut)
+            self.__touch(cut)
+        for object in self.objects:
+            self.__objectsByName.add(object)
+            self.__touch(object)
+        for external in self.externals:
+            self.__externalsByName.add(external)
+            self.__touch(external)
+
+    def __touch(self, item):
+        """Assign a new version to *item*, invalidating validation results."""
+        self.__versions[id(item)] = next(self.__serial)
+
+    def __version(self, item):
+        return self.__versions.get(id(item)) if item is not None else None
+
+    def __indexAlgorithm(self, algorithm):
+        self.__touch(algorithm)
+        self.__algorithmsByName.add(algorithm)
+        self.__algorithmsByIndex.add(algorithm)
+        self.__cutReferences.add(algorithm)
+        self.__objectReferences.add(algorithm)
+        self.__externalReferences.add(algorithm)
+
+    def addObserver(self, observer):
+        """Register *observer* (see MenuObserver) to be notified about item
+        changes, the menu keeps only a weak reference.
+        """
+        self.__observers.add(observer)
+
+    def removeObserver(self, observer):
+        self.__observers.discard(observer)
+
+    def __notify(self, method, kind, first, last):
+        for observer in list(self.__observers):
+            getattr(observer, method)(kind, first, last)
+
+    @contextlib.contextmanager
+    def __inserting(self, kind, count=1):
+        """Notify observers about appending *count* items to list *kind*."""
+        first = len(getattr(self, kind))
+        last = first + count - 1
+        self.__notify('itemsAboutToBeInserted', kind, first, last)
+        yield
+        self.__notify('itemsInserted', kind, first, last)
+
+    @contextlib.contextmanager
+    def __removing(self, kind, first, last):
+        """Notify observers about removing items *first* to *last* from list *kind*."""
+        self.__notify('itemsAboutToBeRemoved', kind, first, last)
+        yield
+        self.__notify('itemsRemoved', kind, first, last)
+
+    def __changed(self, kind, item):
+        """Notify observers about in place modified *item* of list *kind*."""
+        if self.__observers:
+            position = self.__position(getattr(self, kind), item)
+            self.__notify('itemsChanged', kind, position, position)
+
+    @staticmethod
+    def __position(items, item):
+        """Returns position of *item* by identity in list *items*."""
+        for position, other in enumerate(items):
+            if other is item:
+                return position
+        raise ValueError(f"no such item in menu: {item}")
+
+    @staticmethod
+    def __ranges(positions):
+        """Returns list of (first, last) ranges of sorted *positions*."""
+        ranges = []
+        for position in positions:
+            if ranges and ranges[-1][1] == position - 1:
+                ranges[-1][1] = position
+            else:
+                ranges.append([position, position])
+        return ranges
+
+    def __removeItems(self, kind, items, forget):
+        """Remove *items* by identity from list *kind* in a single pass,
+        calling *forget(item, remaining)* to drop every item from the indexes.
+        Observers are notified once per range of adjacent rows.
+        """
+        values = getattr(self, kind)
+        ids = {id(item) for item in items}
+        positions = [position for position, other in enumerate(values) if id(other) in ids]
+        if len(positions) != len(ids):
+            found = {id(values[position]) for position in positions}
+            missing = [item for item in items if id(item) not in found]
+            raise ValueError(f"no such item in menu: {missing[0]}")
+        remaining = [other for other in values if id(other) not in ids]
+        for position in positions:
+            item = values[position]
+            forget(item, remaining)
+            self.__versions.pop(id(item), None)
+        for first, last in reversed(self.__ranges(positions)):
+            with self.__removing(kind, first, last):
+                del values[first:last + 1]
+
+    def __addItems(self, kind, items, index):
+        """Append list of *items* to list *kind*, calling *index(item)* to
+        index every item. Observers are notified once for all rows.
+        """
+        if not items:
+            return
+        values = getattr(self, kind)
+        with self.__inserting(kind, len(items)):
+            for item in items:
+                values.append(item)
+                index(item)
+
+    def __indexItem(self, index, item):
+        index.add(item)
+        self.__touch(item)
 
     def addObject(self, object):
         """Creates a new object by specifing its paramters and adds it to the menu. Provided for convenience."""
-        self.objects.append(object)
+        self.addObjects([object])
 
     def addCut(self, cut):
         """Creates a new cut by specifing its paramters and adds it to the menu. Provided for convenience."""
-        self.cuts.append(cut)
+        self.addCuts([cut])
 
     def addExternal(self, external):
         """Creates a new external signal by specifing its paramters and adds it to the menu. Provided for convenience."""
-        self.externals.append(external)
+        self.addExternals([external])
 
     def addAlgorithm(self, algorithm):
         """Creates a new algorithm by specifing its paramters and adds it to the menu. Provided for convenience.
         **Note:** related objects must be added separately to the menu.
         """
-        self.algorithms.append(algorithm)
+        self.addAlgorithms([algorithm])
+
+    def addObjects(self, objects):
+        """Adds list of object requirements to the menu."""
+        self.__addItems('objects', list(objects), functools.partial(self.__indexItem, self.__objectsByName))
+
+    def addCuts(self, cuts):
+        """Adds list of cuts to the menu."""
+        self.__addItems('cuts', list(cuts), functools.partial(self.__indexItem, self.__cutsByName))
+
+    def addExternals(self, externals):
+        """Adds list of external signal requirements to the menu."""
+        self.__addItems('externals', list(externals), functools.partial(self.__indexItem, self.__externalsByName))
+
+    def addAlgorithms(self, algorithms):
+        """Adds list of algorithms to the menu.
+        **Note:** related objects must be added separately to the menu.
+        """
+        self.__addItems('algorithms', list(algorithms), self.__indexAlgorithm)
+
+    def removeObject(self, object):
+        """Removes object requirement from the menu."""
+        self.removeObjects([object])
+
+    def removeCut(self, cut):
+        """Removes cut from the menu."""
+        self.removeCuts([cut])
+
+    def removeExternal(self, external):
+        """Removes external signal requirement from the menu."""
+        self.removeExternals([external])
+
+    def removeAlgorithm(self, algorithm):
+        """Removes algorithm from the menu.
+        **Note:** orphaned objects must be removed separately from the menu.
+        """
+        self.removeAlgorithms([algorithm])
+
+    def removeObjects(self, objects):
+        """Removes list of object requirements from the menu."""
+        self.__removeItems('objects', objects, self.__objectsByName.remove)
+
+    def removeCuts(self, cuts):
+        """Removes list of cuts from the menu."""
+        self.__removeItems('cuts', cuts, self.__cutsByName.remove)
+
+    def removeExternals(self, externals):
+        """Removes list of external signal requirements from the menu."""
+        self.__removeItems('externals', externals, self.__externalsByName.remove)
+
+    def removeAlgorithms(self, algorithms):
+        """Removes list of algorithms from the menu.
+        **Note:** orphaned objects must be removed separately from the menu,
+        see removeOrphanedObjects().
+        """
+        def forget(algorithm, remaining):
+            self.__algorithmsByName.remove(algorithm, remaining)
+            self.__algorithmsByIndex.remove(algorithm, remaining)
+            self.__cutReferences.remove(algorithm)
+            self.__objectReferences.remove(algorithm)
+            self.__externalReferences.remove(algorithm)
+            self.__validated.pop(id(algorithm), None)
+        self.__removeItems('algorithms', algorithms, forget)
+
+    def removeOrphanedObjects(self):
+        """Removes all object requirements not referenced by any algorithm,
+        returns list of removed object names.
+        """
+        names = self.orphanedObjects()
+        self.removeObjects([self.objectByName(name) for name in names])
+        return names
+
+    def moveAlgorithms(self, mapping):
+        """Assigns new indices to algorithms, *mapping* is a dictionary of
+        current index to new index. Indices may be swapped, but must not be
+        used by algorithms not moved. Returns list of moved algorithms.
+        """
+        moves = []
+        for index, newIndex in mapping.items():
+            algorithm = self.algorithmByIndex(index)
+            if algorithm is None:
+                raise ValueError(f"no such algorithm index in menu: {index}")
+            moves.append((algorithm, int(newIndex)))
+        targets = [newIndex for _, newIndex in moves]
+        if len(set(targets)) != len(targets):
+            raise ValueError("duplicate algorithm indices in mapping")
+        moved = {id(algorithm) for algorithm, _ in moves}
+        for newIndex in targets:
+            other = self.algorithmByIndex(newIndex)
+            if other is not None and id(other) not in moved:
+                raise ValueError(f"algorithm index already used: {newIndex}")
+        for algorithm, _ in moves:
+            self.__algorithmsByIndex.remove(algorithm, self.algorithms)
+        for algorithm, newIndex in moves:
+            algorithm.index = newIndex
+            self.__algorithmsByIndex.add(algorithm)
+            self.__touch(algorithm)
+        if moves and self.__observers:
+            positions = [position for position, other in enumerate(self.algorithms) if id(other) in moved]
+            self.__notify('itemsChanged', 'algorithms', positions[0], positions[-1])
+        return [algorithm for algorithm, _ in moves]
+
+    def updateAlgorithm(self, algorithm):
+        """Updates indexes after *algorithm* was modified in place, eg. renamed,
+        moved to a different index or its expression changed.
+        """
+        self.__algorithmsByName.update(algorithm, self.algorithms)
+        self.__algorithmsByIndex.update(algorithm, self.algorithms)
+        self.__cutReferences.update(algorithm)
+        self.__objectReferences.update(algorithm)
+        self.__externalReferences.update(algorithm)
+        self.__touch(algorithm)
+        self.__changed('algorithms', algorithm)
+
+    def updateCut(self, cut):
+        """Updates indexes after *cut* was modified in place, eg. renamed."""
+        self.__cutsByName.update(cut, self.cuts)
+        self.__touch(cut)
+        self.__changed('cuts', cut)
 
     def extendReferenced(self, algorithm):
         """Adds missing objects and external signals referenced by the
@@ -65,78 +469,127 @@ class Menu:
         # Add new objects to list.
         for item in algorithm.objects():
             if not self.objectByName(item):
-                self.objects.append(toObject(item))
+                self.addObject(toObject(item))
         # Add new external to list.
         for item in algorithm.externals():
             if not self.externalByName(item):
-                self.externals.append(toExternal(item))
+                self.addExternal(toExternal(item))
 
     def algorithmByName(self, name):
         """Returns algorithm item by its *name* or None if no such algorithm exists."""
-        return (list(filter(lambda item: item.name == name, self.algorithms)) or [None])[0]
+        return self.__algorithmsByName.get(name)
 
     def algorithmByIndex(self, index):
         """Returns algorithm item by its *index* or None if no such algorithm exists."""
-        return (list(filter(lambda item: int(item.index) == int(index), self.algorithms)) or [None])[0]
+        return self.__algorithmsByIndex.get(int(index))
+
+    def algorithmsByCut(self, cut):
+        """Returns list of algorithms using *cut*."""
+        return self.__cutReferences.get(cut.name)
 
     def algorithmsByObject(self, object):
         """Returns list of algorithms containing *object*."""
-        return list(filter(lambda algorithm: object.name in algorithm.objects(), self.algorithms))
+        return self.__objectReferences.get(object.name)
 
     def algorithmsByExternal(self, external):
         """Returns list of algorithms containing *external* signal."""
-        return list(filter(lambda algorithm: external.basename in algorithm.externals(), self.algorithms))
+        return self.__externalReferences.get(external.basename)
 
     def objectByName(self, name):
         """Returns object requirement item by its *name* or None if no such object requirement exists."""
-        return (list(filter(lambda item: item.name == name, self.objects)) or [None])[0]
+        return self.__objectsByName.get(name)
 
     def cutByName(self, name):
         """Returns cut item by its *name* or None if no such cut exists."""
-        return (list(filter(lambda item: item.name == name, self.cuts)) or [None])[0]
+        return self.__cutsByName.get(name)
 
     def externalByName(self, name):
         """Returns external signal item by its *name* or None if no such external signal exists."""
-        return (list(filter(lambda item: item.name == name, self.externals)) or [None])[0]
+        return self.__externalsByName.get(name)
 
     def scaleMeta(self, object, scaleType):
         """Returns scale information for *object* by *scaleType*."""
-        return (list(filter(lambda item: item[kObject] == object.type and item[kType] == scaleType, self.scales.scales)) or [None])[0]
+        return self.__scaleIndex.meta(object.type, scaleType)
 
     def scaleBins(self, object, scaleType):
         """Returns bins for *object* by *scaleType*."""
-        key = f'{object.type}-{scaleType}'
-        return self.scales.bins[key] if key in self.scales.bins else None
+        return self.__scaleIndex.bins(object.type, scaleType)
 
     def orphanedObjects(self):
         """Returns list of orphaned object names not referenced by any algorithm."""
-        tags = [object.name for object in self.objects]
-        for algorithm in self.algorithms:
-            for name in algorithm.objects():
-                if name in tags:
-                    tags.remove(name)
-        return tags
+        count = self.__objectReferences.count
+        return [object.name for object in self.objects if not count(object.name)]
 
     def orphanedExternals(self):
         """Returns list of orphaned externals names not referenced by any algorithm."""
-        tags = [external.name for external in self.externals]
-        for algorithm in self.algorithms:
-            for name in algorithm.objects():
-                if name in tags:
-                    tags.remove(name)
-        return tags
+        count = self.__externalReferences.count
+        return [external.name for external in self.externals if not count(external.name)]
 
     def orphanedCuts(self):
         """Returns list of orphaned cut names not referenced by any algorithm."""
-        tags = [cut.name for cut in self.cuts]
-        for algorithm in self.algorithms:
-            for name in algorithm.cuts():
-                if name in tags:
-                    tags.remove(name)
-        return tags
+        count = self.__cutReferences.count
+        return [cut.name for cut in self.cuts if not count(cut.name)]
 
-    def validate(self):
-        """Consistecy check, raises exception in fail."""
+    def __validationKey(self, algorithm):
+        """Returns key identifying the state *algorithm* was validated with,
+        changes whenever the algorithm, one of its referenced items or the
+        scales are modified. Returns None if the expression can not be parsed.
+        """
+        try:
+            algorithm.parsed()
+        except ValueError:
+            return None
+        return (
+            self.__version(algorithm),
+            algorithm.index,
+            algorithm.name,
+            algorithm.expression,
+            self.__scalesVersion,
+            self.__extSignalsVersion,
+            tuple(self.__version(self.cutByName(name)) for name in algorithm.cuts()),
+            tuple(self.__version(self.objectByName(name)) for name in algorithm.objects()),
+            tuple(self.__version(self.externalByName(name)) for name in algorithm.externals()),
+        )
+
+    def digest(self):
+        """Returns canonical hex digest of the menu contents, only items
+        changed since the last call are hashed again (see MenuDigest).
+        """
+        return self.__digest.hexdigest(self)
+
+    def createValidator(self):
+        """Returns algorithm syntax validator for this menu."""
+        return AlgorithmSyntaxValidator(self)
+
+    def validateAlgorithm(self, algorithm, validator=None):
+        """Consistency check of a single *algorithm* and its referenced cuts,
+        objects and externals, raises exception in fail.
+        """
+        if validator is None:
+            validator = self.createValidator()
+
+        algorithm.validate() # check params
+        validator.validate(algorithm.expression) # validate expression
+
+        for cut in algorithm.cuts():
+            self.cutByName(cut).validate()
+
+        for object in algorithm.objects():
+            self.objectByName(object).validate()
+
+        for external in algorithm.externals():
+            self.externalByName(external).validate()
+
+    def validate(self, incremental=False, parallel=False, processes=None, progress=None):
+        """Consistecy check, raises exception in fail. If *incremental* is True
+        only algorithms modified since the last successful validation (or
+        referencing modified cuts, objects, externals or scales) are checked.
+        If *parallel* is True algorithms are validated using a pool of
+        *processes* worker processes (default is number of CPUs), on fail the
+        exception of the algorithm with lowest index is raised. Optional
+        callable *progress* is called with count and total of validated
+        algorithms.
+        """
         self.menu.validate()
 
         count = len(self.algorithms)
@@ -146,24 +599,29 @@ class Menu:
             logging.error(message)
             raise ValueError(message)
 
-        validate = AlgorithmSyntaxValidator(self).validate
-        cutByName = self.cutByName
-        objectByName = self.objectByName
-        externalByName = self.externalByName
+        if not incremental:
+            self.__validated.clear()
 
+        pending = []
         for algorithm in self.algorithms:
-
-            algorithm.validate() # check params
-            validate(algorithm.expression) # validate expression
-
-            for cut in algorithm.cuts():
-                cutByName(cut).validate()
-
-            for object in algorithm.objects():
-                objectByName(object).validate()
-
-            for external in algorithm.externals():
-                externalByName(external).validate()
+            key = self.__validationKey(algorithm)
+            if key is not None and self.__validated.get(id(algorithm)) == key:
+                continue
+            pending.append((algorithm, key))
+
+        if parallel:
+            ParallelValidator(self, processes).validate([algorithm for algorithm, key in pending], progress)
+            for algorithm, key in pending:
+                if key is not None:
+                    self.__validated[id(algorithm)] = key
+        else:
+            validator = self.createValidator()
+            for count, (algorithm, key) in enumerate(pending, 1):
+                self.validateAlgorithm(algorithm, validator)
+                if key is not None:
+                    self.__validated[id(algorithm)] = key
+                if progress:
+                    progress(count, len(pending))
 
 # ------------------------------------------------------------------------------
 #  Menu information container class.
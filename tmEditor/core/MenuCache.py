@@ -0,0 +1,200 @@
+"""On disk cache of decoded menus.
+
+Decoded and validated menus are stored as pickle files, keyed by a hash of
+the XML file contents and the editor and grammar versions. Loading a cached
+menu skips reading the XML file, migrations and validation. The cache size is
+bounded, least recently used entries are removed first.
+
+Set environment variable TM_EDITOR_NO_CACHE to disable the default cache.
+
+Usage example
+-------------
+
+>>> cache = MenuCache.default()
+>>> key = cache.key(filename)
+>>> entry = cache.load(key)
+>>> if entry is None:
+...     cache.store(key, menu, migrations)
+
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+from collections import namedtuple
+
+import tmGrammar
+import tmTable
+
+from tmEditor import __version__
+
+from .Menu import Menu, GrammarVersion
+from .TableHelper import plainScale, plainExtSignal
+from .ScaleRegistry import scaleRegistry
+
+__all__ = ['MenuCache', 'CacheEntry', ]
+
+CacheFormat = 1
+"""Version of the cache file format, increment on incompatible changes."""
+
+DefaultMaxSize = 256 * 1024 ** 2
+"""Default maximum cache size in bytes."""
+
+DisableEnvironment = 'TM_EDITOR_NO_CACHE'
+"""Environment variable disabling the default cache."""
+
+CacheSuffix = '.pickle'
+
+CacheEntry = namedtuple('CacheEntry', 'menu, migrations')
+"""Cached menu and list of migrations applied when decoding the menu."""
+
+# -----------------------------------------------------------------------------
+#  Menu cache class
+# -----------------------------------------------------------------------------
+
+class MenuCache:
+    """Size bounded cache of decoded menus located in *directory*."""
+
+    def __init__(self, directory, maxSize=DefaultMaxSize):
+        self.directory = directory
+        self.maxSize = maxSize
+
+    @classmethod
+    def defaultDirectory(cls):
+        """Returns user cache directory, eg. `~/.cache/tm-editor/menus'."""
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'tm-editor', 'menus')
+
+    @classmethod
+    def default(cls):
+        """Returns cache using the user cache directory, or None if disabled
+        by environment variable TM_EDITOR_NO_CACHE.
+        """
+        if os.environ.get(DisableEnvironment):
+            return None
+        return cls(cls.defaultDirectory())
+
+    def key(self, filename):
+        """Returns cache key of menu XML file *filename*."""
+        digest = hashlib.sha256()
+        versions = (
+            CacheFormat,
+            __version__,
+            GrammarVersion,
+            getattr(tmGrammar, '__version__', ''),
+            getattr(tmTable, '__version__', ''),
+        )
+        digest.update(repr(versions).encode())
+        with open(filename, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(1024 ** 2), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}{CacheSuffix}')
+
+    def load(self, key):
+        """Returns CacheEntry for *key* or None if not cached."""
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as fp:
+                data = pickle.load(fp)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning("removing broken menu cache entry `%s': %s", path, e)
+            self.remove(key)
+            return None
+        # Mark as recently used.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        menu = Menu()
+        menu.menu = data['menu']
+        for algorithm in data['algorithms']:
+            menu.addAlgorithm(algorithm)
+        for cut in data['cuts']:
+            menu.addCut(cut)
+        for object in data['objects']:
+            menu.addObject(object)
+        for external in data['externals']:
+            menu.addExternal(external)
+        menu.scales = scaleRegistry.plainScale(data['scales'])
+        menu.extSignals = scaleRegistry.plainExtSignal(data['extSignals'])
+        logging.debug("loaded menu from cache `%s'", path)
+        return CacheEntry(menu, data['migrations'])
+
+    def store(self, key, menu, migrations):
+        """Store validated *menu* and list of applied *migrations* for *key*."""
+        data = {
+            'menu': menu.menu,
+            'algorithms': menu.algorithms,
+            'cuts': menu.cuts,
+            'objects': menu.objects,
+            'externals': menu.externals,
+            'scales': plainScale(menu.scales),
+            'extSignals': plainExtSignal(menu.extSignals),
+            'migrations': migrations,
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to temporary file first, readers never see partial entries.
+        fd, filename = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                pickle.dump(data, fp, pickle.HIGHEST_PROTOCOL)
+            os.replace(filename, self.path(key))
+        except BaseException:
+            self.unlink(filename)
+            raise
+        logging.debug("stored menu in cache `%s'", self.path(key))
+        self.evict()
+
+    def remove(self, key):
+        self.unlink(self.path(key))
+
+    def entries(self):
+        """Returns list of cache file paths and sizes, least recently used
+        first.
+        """
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CacheSuffix):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue # removed by another process
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return [(path, size) for mtime, path, size in sorted(entries)]
+
+    def size(self):
+        """Returns total size of cache entries in bytes."""
+        return sum(size for path, size in self.entries())
+
+    def evict(self):
+        """Remove least recently used entries exceeding the maximum size."""
+        entries = self.entries()
+        total = sum(size for path, size in entries)
+        for path, size in entries:
+            if total <= self.maxSize:
+                break
+            logging.debug("evicting menu cache entry `%s'", path)
+            self.unlink(path)
+            total -= size
+
+    @staticmethod
+    def unlink(path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Remove all cache entries."""
+        for path, size in self.entries():
+            self.unlink(path)
@@ -0,0 +1,122 @@
+"""Canonical menu digest.
+
+Content addressed hash of the menu contents written to an XML file: menu
+name and comment, grammar version, algorithms with compressed expressions,
+cuts, object requirements, external signals and the names of the assigned
+scale and external signal sets. The digest does not depend on the order of
+the items nor on the menu UUID, which is regenerated on every save.
+
+Digests of the items are cached and computed again only for items whose
+content changed since the last call.
+
+Usage example
+-------------
+
+>>> digest = MenuDigest()
+>>> digest.hexdigest(menu)
+'3f1c...'
+
+"""
+
+import hashlib
+import os
+
+from .AlgorithmFormatter import AlgorithmFormatter
+
+__all__ = ['MenuDigest', 'fileStamp', ]
+
+kName = 'name'
+
+# -----------------------------------------------------------------------------
+#  Content functions
+# -----------------------------------------------------------------------------
+
+def algorithmContent(algorithm):
+    return algorithm.index, algorithm.name, algorithm.expression, algorithm.comment, tuple(algorithm.labels)
+
+def cutContent(cut):
+    return cut.name, cut.object, cut.type, cut.minimum, cut.maximum, cut.data, cut.comment
+
+def objectContent(object):
+    return object.name, object.type, object.threshold, object.comparison_operator, object.bx_offset
+
+def externalContent(external):
+    return external.name, external.bx_offset
+
+# -----------------------------------------------------------------------------
+#  Canonical representations, as written to the XML file
+# -----------------------------------------------------------------------------
+
+def canonicalAlgorithm(algorithm):
+    index, name, expression, comment, labels = algorithmContent(algorithm)
+    return 'algorithm', int(index), name, AlgorithmFormatter.compress(expression), comment, labels
+
+def canonicalCut(cut):
+    name, object, type, minimum, maximum, data, comment = cutContent(cut)
+    if data:
+        minimum, maximum = 0., 0.
+    else:
+        minimum, maximum, data = float(minimum), float(maximum), ""
+    return 'cut', name, object, type, minimum, maximum, data, comment
+
+def canonicalObject(object):
+    name, type, threshold, comparison_operator, bx_offset = objectContent(object)
+    return 'object', name, type, float(object.decodeThreshold()), comparison_operator, int(bx_offset)
+
+def canonicalExternal(external):
+    name, bx_offset = externalContent(external)
+    return 'external', name, int(bx_offset)
+
+# -----------------------------------------------------------------------------
+#  Menu digest class
+# -----------------------------------------------------------------------------
+
+class MenuDigest:
+    """Computes canonical digests of a menu, caching the digests of its items."""
+
+    def __init__(self):
+        self.__items = {} # item id -> (content, digest)
+
+    def hexdigest(self, menu):
+        """Returns canonical SHA-256 hex digest of *menu*."""
+        items = {}
+        def digests(entries, contentfunc, canonicalfunc):
+            result = []
+            for item in entries:
+                content = contentfunc(item)
+                cached = self.__items.get(id(item))
+                if cached is None or cached[0] != content:
+                    cached = content, hashlib.sha256(repr(canonicalfunc(item)).encode()).hexdigest()
+                items[id(item)] = cached
+                result.append(cached[1])
+            return sorted(result)
+        header = (
+            menu.menu.name,
+            menu.menu.comment,
+            format(menu.menu.grammar_version),
+            menu.scales.scaleSet[kName] if menu.scales else "",
+            menu.extSignals.extSignalSet[kName] if menu.extSignals else "",
+        )
+        digest = hashlib.sha256(repr(header).encode())
+        for entries, contentfunc, canonicalfunc in (
+            (menu.algorithms, algorithmContent, canonicalAlgorithm),
+            (menu.cuts, cutContent, canonicalCut),
+            (menu.objects, objectContent, canonicalObject),
+            (menu.externals, externalContent, canonicalExternal),
+        ):
+            for item in digests(entries, contentfunc, canonicalfunc):
+                digest.update(item.encode())
+            digest.update(b'\n') # separate item types
+        # Drop digests of removed items.
+        self.__items = items
+        return digest.hexdigest()
+
+def fileStamp(filename):
+    """Returns modification time and size of *filename*, or None if the file
+    does not exist.
+    """
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
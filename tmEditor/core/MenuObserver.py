@@ -0,0 +1,46 @@
+"""Menu observer.
+
+Observers registered with `Menu.addObserver()` are notified about every
+insertion, removal and in place modification of menu items. Item lists are
+identified by their menu attribute name (*kind*, eg. 'algorithms'), rows
+*first* to *last* (inclusive) refer to positions in that list, like the
+signals of a Qt item model.
+
+Usage example
+-------------
+
+>>> class Printer(MenuObserver):
+...     def itemsInserted(self, kind, first, last):
+...         print(kind, first, last)
+>>> printer = Printer()
+>>> menu.addObserver(printer) # menu keeps a weak reference only
+
+"""
+
+__all__ = ['MenuObserver', ]
+
+# -----------------------------------------------------------------------------
+#  Menu observer class
+# -----------------------------------------------------------------------------
+
+class MenuObserver:
+    """Base class of menu observers, all notifications are ignored by
+    default.
+    """
+
+    def itemsAboutToBeInserted(self, kind, first, last):
+        """Called before items are inserted at rows *first* to *last*."""
+
+    def itemsInserted(self, kind, first, last):
+        """Called after items were inserted at rows *first* to *last*."""
+
+    def itemsAboutToBeRemoved(self, kind, first, last):
+        """Called before items at rows *first* to *last* are removed."""
+
+    def itemsRemoved(self, kind, first, last):
+        """Called after items at rows *first* to *last* were removed."""
+
+    def itemsChanged(self, kind, first, last):
+        """Called after items at rows *first* to *last* were modified in
+        place.
+        """
@@ -0,0 +1,114 @@
+"""Parallel menu validation using a process pool.
+
+The scale and external signal tables, cuts, objects and externals of a menu
+are shipped only once to every worker process, algorithms are validated in
+chunks.
+
+Usage example
+-------------
+
+>>> validator = ParallelValidator(menu, processes=4)
+>>> validator.validate(menu.algorithms)
+
+"""
+
+import logging
+import math
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+from .Algorithm import Algorithm
+from .TableHelper import plainScale, plainExtSignal
+
+__all__ = ['ParallelValidator', ]
+
+ChunksPerProcess = 4
+"""Number of chunks assigned to every worker process."""
+
+# -----------------------------------------------------------------------------
+#  Worker process
+# -----------------------------------------------------------------------------
+
+_workerMenu = None
+"""Menu of the worker process, containing all but the algorithms."""
+
+def _initWorker(menuInfo, scales, extSignals, cuts, objects, externals):
+    """Initialize worker process menu."""
+    global _workerMenu
+    from .Menu import Menu
+    menu = Menu()
+    menu.menu = menuInfo
+    menu.scales = scales
+    menu.extSignals = extSignals
+    for cut in cuts:
+        menu.addCut(cut)
+    for object in objects:
+        menu.addObject(object)
+    for external in externals:
+        menu.addExternal(external)
+    _workerMenu = menu
+
+def _validateChunk(chunk):
+    """Validate chunk of algorithm parameter tuples, returns list of
+    exceptions (or None on success) in order of chunk.
+    """
+    validator = _workerMenu.createValidator()
+    results = []
+    for index, name, expression in chunk:
+        algorithm = Algorithm(index, name, expression)
+        try:
+            _workerMenu.validateAlgorithm(algorithm, validator)
+        except Exception as e:
+            results.append(e)
+        else:
+            results.append(None)
+    return results
+
+# -----------------------------------------------------------------------------
+#  Parallel validator class
+# -----------------------------------------------------------------------------
+
+class ParallelValidator:
+    """Validates algorithms of *menu* using a pool of worker processes,
+    *processes* defaults to the number of CPUs.
+    """
+
+    def __init__(self, menu, processes=None):
+        self.menu = menu
+        self.processes = processes
+
+    def initargs(self):
+        """Returns worker initializer arguments, only picklable plain tables."""
+        menu = self.menu
+        return (
+            menu.menu,
+            plainScale(menu.scales),
+            plainExtSignal(menu.extSignals),
+            list(menu.cuts),
+            list(menu.objects),
+            list(menu.externals),
+        )
+
+    def validate(self, algorithms, progress=None):
+        """Validates *algorithms*, raises the exception of the algorithm with
+        the lowest index on fail. Optional callable *progress* is called with
+        count and total of validated algorithms.
+        """
+        algorithms = sorted(algorithms, key=lambda algorithm: int(algorithm.index))
+        if not algorithms:
+            return
+        processes = self.processes or os.cpu_count() or 1
+        chunkSize = math.ceil(len(algorithms) / (processes * ChunksPerProcess))
+        with ProcessPoolExecutor(processes, initializer=_initWorker, initargs=self.initargs()) as executor:
+            chunks = []
+            for i in range(0, len(algorithms), chunkSize):
+                chunk = algorithms[i:i + chunkSize]
+                chunks.append([(algorithm.index, algorithm.name, algorithm.expression) for algorithm in chunk])
+            logging.debug("validating %s algorithms in %s chunks", len(algorithms), len(chunks))
+            errors = (error for results in executor.map(_validateChunk, chunks) for error in results)
+            for count, (algorithm, error) in enumerate(zip(algorithms, errors), 1):
+                if error is not None:
+                    raise error
+                if progress:
+                    progress(count, len(algorithms))
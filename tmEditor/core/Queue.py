@@ -16,13 +16,79 @@ Executing th callback queue.
 loading data ... 0 %
 processing data ... 33 %
 saving data ... 66 %
+
+Wall-clock execution times of all finished callbacks.
+
+>>> q.timings()
+[('loading data', 0.012), ...]
+
+A queue can be canceled from another thread, execution aborts before the
+next callback raising a QueueCancelledError.
+
+>>> q.cancel()
+
+Stages can report per item progress using `track()` or `advance()`, reports
+are passed to all progress handlers (called from the thread executing the
+stage).
+
+>>> def handler(report):
+...     print(report.message, report.count, report.total, report.remaining)
+>>> q.add_progress_handler(handler)
+>>> def process():
+...     for item in q.track(items):
+...         pass
+"""
+
+import functools
+import logging
+import threading
+import time
+
+from collections import namedtuple
+
+ReportInterval = 0.1
+"""Minimum interval in seconds between two per item progress reports of a stage."""
+
+ItemProgress = namedtuple('ItemProgress', 'message,count,total,rate,remaining,progress')
+"""Per item progress of a running stage, *rate* in items per second and
+estimated *remaining* time in seconds (None if unknown). Attribute
+*progress* is the overall progress of the queue in percent.
+"""
+
+StageStatistics = namedtuple('StageStatistics', 'message,time,count')
+"""Wall-clock time in seconds and number of processed items (None if not
+reported) of a finished stage.
 """
 
+class QueueCancelledError(Exception):
+    """Raised on iterating a canceled queue."""
+
 class Callback:
 
     def __init__(self, callback, message=None):
         self.callback = callback
         self.message = message or ""
+        self.time = None
+        self.started = None
+        self.reported = None
+        self.count = None
+        self.total = None
+
+    def __call__(self):
+        t0 = self.started = time.monotonic()
+        try:
+            return self.callback()
+        finally:
+            self.time = time.monotonic() - t0
+            logging.debug("finished %s in %.3f sec", self.message, self.time)
+
+    def fraction(self):
+        """Returns fraction of processed items."""
+        if self.time is not None:
+            return 1.
+        if self.total:
+            return min(1., self.count / self.total)
+        return 0.
 
 class Queue:
 
@@ -30,6 +96,9 @@ class Queue:
         self.__callbacks = []
         self.__ptr = 0
         self.__message = ""
+        self.__cancelled = threading.Event()
+        self.__handlers = []
+        self.__current = None
 
     def add_callback(self, callback, message=None):
         self.__callbacks.append(Callback(callback, message))
@@ -40,6 +109,60 @@ class Queue:
     def message(self):
         return self.__message
 
+    def timings(self):
+        """Returns list of message and wall-clock time in seconds of every
+        finished callback, in order of the queue.
+        """
+        return [(item.message, item.time) for item in self.__callbacks if item.time is not None]
+
+    def statistics(self):
+        """Returns list of StageStatistics of every finished callback, in
+        order of the queue.
+        """
+        return [StageStatistics(item.message, item.time, item.count) for item in self.__callbacks if item.time is not None]
+
+    def add_progress_handler(self, handler):
+        """Add *handler* called with ItemProgress on per item progress."""
+        self.__handlers.append(handler)
+
+    def advance(self, count, total):
+        """Report *count* of *total* items processed by the running stage,
+        reports are limited to one per `ReportInterval`.
+        """
+        callback = self.__current
+        if callback is None:
+            return
+        callback.count = count
+        callback.total = total
+        now = time.monotonic()
+        if count < total and callback.reported is not None and now - callback.reported < ReportInterval:
+            return
+        callback.reported = now
+        elapsed = now - callback.started
+        rate = count / elapsed if count and elapsed > 0 else None
+        remaining = (total - count) / rate if rate else None
+        progress = 100. * sum(item.fraction() for item in self.__callbacks) / len(self.__callbacks)
+        report = ItemProgress(callback.message, count, total, rate, remaining, progress)
+        for handler in self.__handlers:
+            handler(report)
+
+    def track(self, items):
+        """Iterate over sequence *items*, reporting per item progress of the
+        running stage.
+        """
+        total = len(items)
+        self.advance(0, total)
+        for count, item in enumerate(items, 1):
+            yield item
+            self.advance(count, total)
+
+    def cancel(self):
+        """Request to abort execution before the next callback, thread safe."""
+        self.__cancelled.set()
+
+    def isCancelled(self):
+        return self.__cancelled.is_set()
+
     def __iter__(self):
         return self
 
@@ -47,10 +170,12 @@ class Queue:
         """Python3 version."""
         if self.__ptr >= len(self.__callbacks):
             raise StopIteration()
+        if self.__cancelled.is_set():
+            raise QueueCancelledError(f"Canceled before {self.__callbacks[self.__ptr].message}")
         callback = self.__callbacks[self.__ptr]
         self.__message = callback.message
         self.__ptr += 1
-        return callback.callback
+        return functools.partial(self.__execute, callback)
 
     def next(self):
         """Python2 fallback."""
@@ -59,3 +184,13 @@ class Queue:
     def exec_(self):
         for callback in self:
             callback()
+
+    def __execute(self, callback):
+        """Execute *callback*, assigning it as running stage for reporting
+        progress.
+        """
+        self.__current = callback
+        try:
+            return callback()
+        finally:
+            self.__current = None
@@ -0,0 +1,76 @@
+"""Scale set index.
+
+Usage example
+-------------
+
+>>> index = ScaleIndex(menu.scales)
+>>> index.meta('MU', 'ET')
+>>> index.hasEdge('MU', 'ET', 10.0)
+
+"""
+
+import bisect
+
+__all__ = ['ScaleIndex', ]
+
+# -----------------------------------------------------------------------------
+#  Keys
+# -----------------------------------------------------------------------------
+
+kMinimum = 'minimum'
+kMaximum = 'maximum'
+kObject = 'object'
+kType = 'type'
+
+# -----------------------------------------------------------------------------
+#  Scale index class
+# -----------------------------------------------------------------------------
+
+class ScaleIndex:
+    """Lookup index for a scale set, mapping (object type, scale type) to the
+    scale meta information, its bins and the sorted float bin edges.
+    """
+
+    def __init__(self, scales):
+        self.__meta = {}
+        self.__bins = {}
+        self.__edges = {}
+        if scales is None:
+            return
+        for scale in scales.scales:
+            # First scale of a type wins, like a linear search.
+            self.__meta.setdefault((scale[kObject], scale[kType]), scale)
+        for name, bins in scales.bins.items():
+            self.__bins[name] = bins
+            edges = set()
+            for bin in bins:
+                edges.add(float(bin[kMinimum]))
+                edges.add(float(bin[kMaximum]))
+            self.__edges[name] = sorted(edges)
+
+    @staticmethod
+    def binsName(objectType, scaleType):
+        """Returns name of bins table, eg. `MU-ETA'."""
+        return f'{objectType}-{scaleType}'
+
+    def meta(self, objectType, scaleType):
+        """Returns scale meta information or None if no such scale exists."""
+        return self.__meta.get((objectType, scaleType))
+
+    def bins(self, objectType, scaleType):
+        """Returns list of bins or None if no such scale exists."""
+        return self.__bins.get(self.binsName(objectType, scaleType))
+
+    def binsByName(self, name):
+        """Returns list of bins by table *name* or None if no such scale exists."""
+        return self.__bins.get(name)
+
+    def edges(self, objectType, scaleType):
+        """Returns sorted list of float bin edges (bin minimum and maximum values)."""
+        return self.__edges.get(self.binsName(objectType, scaleType), [])
+
+    def hasEdge(self, objectType, scaleType, value):
+        """Returns True if *value* equals the minimum or maximum of any bin."""
+        edges = self.edges(objectType, scaleType)
+        position = bisect.bisect_left(edges, value)
+        return position < len(edges) and edges[position] == value
@@ -0,0 +1,171 @@
+"""Process wide registry of scale and external signal sets.
+
+Most menus opened in a session use the same scale and external signal sets.
+The registry keeps one shared instance per set name and content, menus
+decoded later are assigned the already registered instance and data derived
+from a set (eg. the scale index) is computed only once. Registered sets are
+shared by all menus and must be treated as read-only.
+
+Users of a set (menus) are attached to it and referenced weakly, a set and
+its derived data are dropped from the registry as soon as its last user was
+released or garbage collected.
+
+Usage example
+-------------
+
+>>> menu.scales = scaleRegistry.scale(scales) # attaches menu
+>>> index = scaleRegistry.derived(menu.scales, ScaleIndex, lambda: ScaleIndex(menu.scales))
+>>> scaleRegistry.release(menu)
+
+"""
+
+import hashlib
+import logging
+import threading
+import weakref
+
+from .TableHelper import plainScale, plainExtSignal, tableScale, tableExtSignal
+
+__all__ = ['ScaleRegistry', 'scaleRegistry', ]
+
+kName = 'name'
+
+# -----------------------------------------------------------------------------
+#  Scale registry class
+# -----------------------------------------------------------------------------
+
+class ScaleRegistry:
+    """Registry of shared scale and external signal sets keyed by set name
+    and content digest. Registered sets are kept while they have users.
+    """
+
+    def __init__(self):
+        self.__lock = threading.RLock()
+        self.__sets = {} # (kind, name, digest) -> instance
+        self.__keys = {} # instance id -> (kind, name, digest)
+        self.__derived = {} # instance id -> {key: value}
+        self.__users = {} # (kind, name, digest) -> {user id}
+        self.__finalizers = {} # user id -> weakref.finalize
+
+    @staticmethod
+    def digest(plain):
+        """Returns content digest of a plain set."""
+        return hashlib.sha256(repr(plain).encode()).hexdigest()
+
+    def __register(self, kind, plain, factory):
+        """Returns registered set of *kind* with content *plain*, calls
+        *factory* to create the set if not registered.
+        """
+        key = kind, plain[0].get(kName, ""), self.digest(plain)
+        with self.__lock:
+            shared = self.__sets.get(key)
+            if shared is None:
+                logging.debug("registering %s set: %s", kind, key[1])
+                shared = self.__sets[key] = factory()
+                self.__keys[id(shared)] = key
+                self.__derived[id(shared)] = {}
+            return shared
+
+    def scale(self, scale):
+        """Returns shared instance of tmTable.Scale *scale*, registering
+        *scale* if no set of same name and content exists.
+        """
+        if scale is None:
+            return None
+        return self.__register('scale', plainScale(scale), lambda: scale)
+
+    def extSignal(self, extSignal):
+        """Returns shared instance of tmTable.ExtSignal *extSignal*,
+        registering *extSignal* if no set of same name and content exists.
+        """
+        if extSignal is None:
+            return None
+        return self.__register('ext_signal', plainExtSignal(extSignal), lambda: extSignal)
+
+    def plainScale(self, plain):
+        """Returns shared tmTable.Scale with content of PlainScale *plain*,
+        the table is only created if not registered.
+        """
+        return self.__register('scale', plain, lambda: tableScale(plain))
+
+    def plainExtSignal(self, plain):
+        """Returns shared tmTable.ExtSignal with content of PlainExtSignal
+        *plain*, the table is only created if not registered.
+        """
+        return self.__register('ext_signal', plain, lambda: tableExtSignal(plain))
+
+    def attach(self, user, instance):
+        """Keep registered set *instance* while used by *user* (eg. a menu),
+        *user* is referenced weakly. Unregistered sets are ignored.
+        """
+        with self.__lock:
+            key = self.__keys.get(id(instance))
+            if key is None:
+                return
+            self.__users.setdefault(key, set()).add(id(user))
+            if id(user) not in self.__finalizers:
+                self.__finalizers[id(user)] = weakref.finalize(user, self.__release, id(user))
+
+    def detach(self, user, instance):
+        """Remove *user* of set *instance*, dropping the set if unused."""
+        with self.__lock:
+            key = self.__keys.get(id(instance))
+            if key is not None:
+                self.__detach(key, id(user))
+
+    def release(self, user):
+        """Remove *user* from all sets it is attached to."""
+        with self.__lock:
+            finalizer = self.__finalizers.get(id(user))
+        if finalizer is not None:
+            finalizer()
+
+    def __release(self, userId):
+        with self.__lock:
+            self.__finalizers.pop(userId, None)
+            for key in [key for key, users in self.__users.items() if userId in users]:
+                self.__detach(key, userId)
+
+    def __detach(self, key, userId):
+        users = self.__users.get(key, set())
+        users.discard(userId)
+        if not users:
+            logging.debug("releasing %s set: %s", key[0], key[1])
+            self.__users.pop(key, None)
+            instance = self.__sets.pop(key)
+            del self.__keys[id(instance)]
+            del self.__derived[id(instance)]
+
+    def isRegistered(self, instance):
+        with self.__lock:
+            return id(instance) in self.__derived
+
+    def derived(self, instance, key, factory):
+        """Returns data derived from set *instance* by *key*, created by
+        calling *factory* only once for registered sets.
+        """
+        with self.__lock:
+            derived = self.__derived.get(id(instance))
+            if derived is None:
+                return factory() # not shared
+            if key not in derived:
+                derived[key] = factory()
+            return derived[key]
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__sets)
+
+    def clear(self):
+        """Remove all registered sets, assigned instances are not affected."""
+        with self.__lock:
+            for finalizer in self.__finalizers.values():
+                finalizer.detach()
+            self.__sets.clear()
+            self.__keys.clear()
+            self.__derived.clear()
+            self.__users.clear()
+            self.__finalizers.clear()
+
+scaleRegistry = ScaleRegistry()
+"""Process wide scale registry."""
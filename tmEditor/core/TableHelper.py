@@ -1,7 +1,63 @@
 """Helper class for tmTable module."""
 
+from collections import namedtuple
+
 import tmTable
 
+__all__ = ['TableHelper', 'PlainScale', 'PlainExtSignal', 'plainScale', 'plainExtSignal', 'tableScale', 'tableExtSignal']
+
+PlainScale = namedtuple('PlainScale', 'scaleSet, scales, bins')
+"""Picklable copy of a tmTable.Scale using plain dictionaries and lists."""
+
+PlainExtSignal = namedtuple('PlainExtSignal', 'extSignalSet, extSignals')
+"""Picklable copy of a tmTable.ExtSignal using plain dictionaries and lists."""
+
+def plainScale(scale):
+    """Returns picklable copy of tmTable.Scale *scale*, to be used where
+    tables are passed to other processes or written to disk.
+    """
+    return PlainScale(
+        scaleSet=dict(scale.scaleSet),
+        scales=[dict(row) for row in scale.scales],
+        bins={name: [dict(row) for row in scale.bins[name]] for name in scale.bins.keys()}
+    )
+
+def plainExtSignal(extSignal):
+    """Returns picklable copy of tmTable.ExtSignal *extSignal*."""
+    return PlainExtSignal(
+        extSignalSet=dict(extSignal.extSignalSet),
+        extSignals=[dict(row) for row in extSignal.extSignals]
+    )
+
+def tableRow(row):
+    """Returns tmTable.Row from dictionary *row*."""
+    result = tmTable.Row()
+    for key, value in row.items():
+        result[key] = value
+    return result
+
+def tableScale(plain):
+    """Returns tmTable.Scale from PlainScale *plain*, inverse of `plainScale`."""
+    scale = tmTable.Scale()
+    for key, value in plain.scaleSet.items():
+        scale.scaleSet[key] = value
+    for row in plain.scales:
+        scale.scales.append(tableRow(row))
+    for name, bins in plain.bins.items():
+        scale.bins[name] = tuple(tableRow(row) for row in bins)
+    return scale
+
+def tableExtSignal(plain):
+    """Returns tmTable.ExtSignal from PlainExtSignal *plain*, inverse of
+    `plainExtSignal`.
+    """
+    extSignal = tmTable.ExtSignal()
+    for key, value in plain.extSignalSet.items():
+        extSignal.extSignalSet[key] = value
+    for row in plain.extSignals:
+        extSignal.extSignals.append(tableRow(row))
+    return extSignal
+
 class TableHelper:
     def __init__(self):
         self.reset()
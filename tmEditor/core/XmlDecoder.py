@@ -1,5 +1,6 @@
 """XML decoder."""
 
+import functools
 import logging
 import os
 import re
@@ -10,12 +11,12 @@ from collections import namedtuple
 import tmGrammar
 
 from tmEditor.core import Menu
-from tmEditor.core import Algorithm
 from tmEditor.core import types
 
-from .toolbox import safe_str, decode_labels
+from .toolbox import safe_str
 from .Queue import Queue
-from .TableHelper import TableHelper
+from .XmlReader import Readers, DefaultReader
+from .ScaleRegistry import scaleRegistry
 
 # -----------------------------------------------------------------------------
 #  Keys
@@ -93,6 +94,20 @@ def mirgrate_mass_function(algorithm):
         return MirgrationResult(algorithm, 'expression', tmGrammar.mass, tmGrammar.mass_inv)
     return None
 
+# -----------------------------------------------------------------------------
+#  Decorators
+# -----------------------------------------------------------------------------
+
+def skipCached(method):
+    """Skip decoder stage if the menu was loaded from cache."""
+    @functools.wraps(method)
+    def skipCached_(self):
+        if self.cached:
+            logging.debug("skipping %s, menu loaded from cache", method.__name__)
+            return None
+        return method(self)
+    return skipCached_
+
 # -----------------------------------------------------------------------------
 #  Decoder classes
 # -----------------------------------------------------------------------------
@@ -103,13 +118,25 @@ class XmlDecoderError(Exception):
         super().__init__(message)
 
 class XmlDecoderQueue(Queue):
+    """Decoder queue, optional *cache* (MenuCache) is used to skip decoding
+    and validation of previously loaded menus. The XML file is read using
+    reader *backend* (see XmlReader.Readers).
+    """
 
-    def __init__(self, filename):
+    def __init__(self, filename, cache=None, backend=DefaultReader):
         super().__init__()
+        if backend not in Readers:
+            raise ValueError(f"Invalid XML reader backend `{backend}'")
         self.filename = os.path.abspath(filename)
+        self.backend = backend
+        self.reader = None
         self.applied_mirgrations = []
         self.menu = None
+        self.cache = cache
+        self.cache_key = None
+        self.cached = False
         self.add_callback(self.run_prepare, "check access rights")
+        self.add_callback(self.run_load_cache, "reading menu cache")
         self.add_callback(self.run_load_xml, "loading XML file")
         self.add_callback(self.run_version_check, "checking versions")
         self.add_callback(self.run_process_info, "loading menu information")
@@ -120,6 +147,7 @@ class XmlDecoderQueue(Queue):
         self.add_callback(self.run_process_scales, "loading scales")
         self.add_callback(self.run_process_ext_signals, "loading external signals")
         self.add_callback(self.run_verify_menu, "verifying menu integrity")
+        self.add_callback(self.run_store_cache, "writing menu cache")
 
     def run_prepare(self):
         logging.debug("checking file access rights...")
@@ -128,23 +156,40 @@ class XmlDecoderQueue(Queue):
             logging.error(message)
             raise XmlDecoderError(message)
 
+    def run_load_cache(self):
+        if self.cache is None:
+            return
+        try:
+            self.cache_key = self.cache.key(self.filename)
+            entry = self.cache.load(self.cache_key)
+        except OSError as e:
+            logging.warning("failed to read menu cache: %s", e)
+            return
+        if entry is not None:
+            logging.info("loaded menu `%s' from cache", self.filename)
+            self.menu = entry.menu
+            self.applied_mirgrations = entry.migrations
+            self.cached = True
+
+    @skipCached
     def run_load_xml(self):
-        logging.debug("Reading XML file from `%s'", self.filename)
-        self.tables = TableHelper()
-        warnings = self.tables.load(self.filename)
+        logging.debug("Reading XML file from `%s' (%s)", self.filename, self.backend)
+        self.reader = Readers[self.backend]()
+        warnings = self.reader.load(self.filename)
 
         if warnings:
             message = "Failed to read XML menu `{0}'\n{1}".format(self.filename, warnings)
             logging.error(message)
             raise XmlDecoderError(message)
 
+    @skipCached
     def run_version_check(self):
         """Verify menu grammar version."""
-        if kGrammarVersion not in self.tables.menu.menu.keys():
+        if kGrammarVersion not in self.reader.info.keys():
             message = "Missing grammar version, corrupted file?"
             logging.error(message)
             raise XmlDecoderError(message)
-        version = self.tables.menu.menu[kGrammarVersion]
+        version = self.reader.info[kGrammarVersion]
         if not version:
             message = "Missing grammar version, corrupted file?"
             logging.error(message)
@@ -160,25 +205,21 @@ class XmlDecoderQueue(Queue):
             logging.error(message)
             raise XmlDecoderError(message)
 
+    @skipCached
     def run_process_info(self):
         logging.debug("adding menu info...")
         self.menu = Menu.Menu()
-        self.menu.menu.name = safe_str(self.tables.menu.menu[kName], "menu name")
-        self.menu.menu.comment = self.tables.menu.menu[kComment] if kComment in self.tables.menu.menu else ""
-        self.menu.menu.uuid_menu = self.tables.menu.menu[kUUIDMenu]
-        self.menu.menu.grammar_version = self.tables.menu.menu[kGrammarVersion]
+        self.menu.menu.name = safe_str(self.reader.info[kName], "menu name")
+        self.menu.menu.comment = self.reader.info[kComment] if kComment in self.reader.info else ""
+        self.menu.menu.uuid_menu = self.reader.info[kUUIDMenu]
+        self.menu.menu.grammar_version = self.reader.info[kGrammarVersion]
 
         logging.debug("loaded menu information: %s", self.menu.menu.__dict__)
 
+    @skipCached
     def run_process_algorithms(self):
         logging.debug("adding algorithms...")
-        for row in [dict(row) for row in self.tables.menu.algorithms]:
-            index = int(row[kIndex])
-            name = safe_str(row[kName], "algorithm name")
-            expression = row[kExpression]
-            comment = row.get(kComment, "")
-            labels = decode_labels(row.get(kLabels, ""))
-            algorithm = Algorithm.Algorithm(index, name, expression, comment, labels)
+        for algorithm in self.track(self.reader.algorithms()):
             # Patch outdated expressions
             result = mirgrate_mass_function(algorithm)
             if result:
@@ -186,92 +227,88 @@ class XmlDecoderQueue(Queue):
             logging.debug("adding algorithm: %s", algorithm.__dict__)
             self.menu.addAlgorithm(algorithm)
 
+    @skipCached
     def run_process_cuts(self):
         logging.debug("adding cuts...")
-        for cuts in self.tables.menu.cuts.values():
-            for row in [dict(row) for row in cuts]:
-                name = safe_str(row[kName], "cut name")
-                object = row[kObject]
-                type = row[kType]
-                minimum = float(row[kMinimum])
-                maximum = float(row[kMaximum])
-                data = row[kData]
-                comment = row.get(kComment, "")
-                cut = Algorithm.Cut(name, object, type, minimum, maximum, data, comment)
-                # Migrate old formats
-                result = mirgrate_cut_object(cut)
-                if result:
-                    self.applied_mirgrations.append(result)
-                result = mirgrate_chgcor_cut(cut)
-                if result:
-                    self.applied_mirgrations.append(result)
-                if cut.type not in types.CutTypes:
-                    message = "Unsupported cut type {0} (grammar version <= {1})".format(cut.type, Menu.GrammarVersion)
-                    logging.error(message)
-                    raise XmlDecoderError(message)
-                if not self.menu.cutByName(cut.name):
-                    logging.debug("adding cut: %s", cut.__dict__)
-                    self.menu.addCut(cut)
+        for cut in self.track(self.reader.cuts()):
+            # Migrate old formats
+            result = mirgrate_cut_object(cut)
+            if result:
+                self.applied_mirgrations.append(result)
+            result = mirgrate_chgcor_cut(cut)
+            if result:
+                self.applied_mirgrations.append(result)
+            if cut.type not in types.CutTypes:
+                message = "Unsupported cut type {0} (grammar version <= {1})".format(cut.type, Menu.GrammarVersion)
+                logging.error(message)
+                raise XmlDecoderError(message)
+            if not self.menu.cutByName(cut.name):
+                logging.debug("adding cut: %s", cut.__dict__)
+                self.menu.addCut(cut)
 
+    @skipCached
     def run_process_objects(self):
         logging.debug("adding object requirements...")
-        for objs in self.tables.menu.objects.values():
-            for row in [dict(row) for row in objs]:
-                name = safe_str(row[kName], "object name")
-                type = row[kType]
-                threshold = row[kThreshold]
-                comparison_operator = row[kComparisonOperator]
-                bx_offset = int(row[kBxOffset])
-                comment = row.get(kComment, "")
-                obj = Algorithm.Object(name, type, threshold, comparison_operator, bx_offset, comment)
-                all_types = types.ObjectTypes + types.SignalTypes
-                if obj.type not in all_types:
-                    message = "Unsupported object type {0} (grammar version <= {1})".format(obj.type, Menu.GrammarVersion)
+        for obj in self.track(self.reader.objects()):
+            all_types = types.ObjectTypes + types.SignalTypes
+            if obj.type not in all_types:
+                message = "Unsupported object type {0} (grammar version <= {1})".format(obj.type, Menu.GrammarVersion)
+                logging.error(message)
+                raise XmlDecoderError(message)
+            if obj.type in types.ObjectTypes:
+                if obj.type not in [scaleSet[kObject] for scaleSet in self.reader.scale.scales]:
+                    algorithm = self.menu.algorithmsByObject(obj)[0]
+                    message = "Object type `{0}' assigned to algorithm `{1} {2}' is missing in scales set `{3}'".format(obj.type, algorithm.index, algorithm.name, self.reader.scale.scaleSet[kName])
                     logging.error(message)
                     raise XmlDecoderError(message)
-                if obj.type in types.ObjectTypes:
-                    if obj.type not in [scaleSet[kObject] for scaleSet in self.tables.scale.scales]:
-                        algorithm = self.menu.algorithmsByObject(obj)[0]
-                        message = "Object type `{0}' assigned to algorithm `{1} {2}' is missing in scales set `{3}'".format(obj.type, algorithm.index, algorithm.name, self.tables.scale.scaleSet[kName])
-                        logging.error(message)
-                        raise XmlDecoderError(message)
-                if not obj in self.menu.objects:
-                    logging.debug("adding object requirement: %s", obj.__dict__)
-                    self.menu.addObject(obj)
+            if not self.menu.objectByName(obj.name):
+                logging.debug("adding object requirement: %s", obj.__dict__)
+                self.menu.addObject(obj)
 
+    @skipCached
     def run_process_externals(self):
         logging.debug("adding external signals...")
-        ext_signal_names = [item[kName] for item in self.tables.extSignal.extSignals]
-        ext_signal_set_name = self.tables.extSignal.extSignalSet[kName]
-        for externals in self.tables.menu.externals.values():
-            for row in [dict(row) for row in externals]:
-                name = safe_str(row[kName], "external signal name")
-                bx_offset = int(row[kBxOffset])
-                comment = row.get(kComment, "")
-                external = Algorithm.External(name, bx_offset, comment)
-                # Verify that all external signals are part of the external signal set.
-                if external.signal_name not in ext_signal_names:
-                    message = "External signal `{0}' is missing in external signal set `{1}'".format(external.basename, ext_signal_set_name)
-                    logging.error(message)
-                    raise XmlDecoderError(message)
-                if external not in self.menu.externals:
-                    logging.debug("adding external signal: %s", external.__dict__)
-                    self.menu.addExternal(external)
+        ext_signal_names = [item[kName] for item in self.reader.extSignal.extSignals]
+        ext_signal_set_name = self.reader.extSignal.extSignalSet[kName]
+        for external in self.track(self.reader.externals()):
+            # Verify that all external signals are part of the external signal set.
+            if external.signal_name not in ext_signal_names:
+                message = "External signal `{0}' is missing in external signal set `{1}'".format(external.basename, ext_signal_set_name)
+                logging.error(message)
+                raise XmlDecoderError(message)
+            if not self.menu.externalByName(external.name):
+                logging.debug("adding external signal: %s", external.__dict__)
+                self.menu.addExternal(external)
 
+    @skipCached
     def run_process_scales(self):
         logging.debug("adding scales...")
-        self.menu.scales = self.tables.scale
+        self.menu.scales = scaleRegistry.scale(self.reader.scale)
 
+    @skipCached
     def run_process_ext_signals(self):
         logging.debug("adding external signal sets...")
-        self.menu.extSignals = self.tables.extSignal
+        self.menu.extSignals = scaleRegistry.extSignal(self.reader.extSignal)
 
+    @skipCached
     def run_verify_menu(self):
         logging.debug("verify menu integrity...")
-        self.menu.validate()
+        self.menu.validate(progress=self.advance)
+
+    @skipCached
+    def run_store_cache(self):
+        if self.cache_key is None:
+            return
+        try:
+            self.cache.store(self.cache_key, self.menu, self.applied_mirgrations)
+        except Exception as e:
+            # Caching must never break loading a menu.
+            logging.warning("failed to write menu cache: %s", e)
 
-def load(filename):
-    """Read XML menu from *filename*. Returns menu object."""
-    queue = XmlDecoderQueue(filename)
+def load(filename, cache=None, backend=DefaultReader):
+    """Read XML menu from *filename*, optionally using MenuCache *cache*.
+    Returns menu object.
+    """
+    queue = XmlDecoderQueue(filename, cache, backend)
     queue.exec_()
     return queue.menu
@@ -17,15 +17,18 @@ from .AlgorithmFormatter import AlgorithmFormatter
 #  Keys
 # -----------------------------------------------------------------------------
 
+kAlgorithm = 'algorithm'
 kAncestorId = 'ancestor_id'
 kBxOffset = 'bx_offset'
 kCable = 'cable'
 kChannel = 'channel'
 kComment = 'comment'
 kComparisonOperator = 'comparison_operator'
+kCut = 'cut'
 kData = 'data'
 kDescription = 'description'
 kExpression = 'expression'
+kExternalRequirement = 'external_requirement'
 kGlobalTag = 'global_tag'
 kGrammarVersion = 'grammar_version'
 kIndex = 'index'
@@ -40,6 +43,7 @@ kNBits = 'n_bits'
 kNModules = 'n_modules'
 kName = 'name'
 kObject = 'object'
+kObjectRequirement = 'object_requirement'
 kStep = 'step'
 kSystem = 'system'
 kThreshold = 'threshold'
@@ -73,18 +77,54 @@ def chdir(directory):
             logging.debug("changing to directory '%s'", directory)
             os.chdir(directory)
             try:
-                result = func(*args, **kwargs)
-            except:
-                # Make sure to restore directory before raising an exception!
-                logging.debug("returning back to directory '%s'", directory)
+                return func(*args, **kwargs)
+            finally:
+                # Make sure to restore directory, also on exceptions!
+                logging.debug("returning back to directory '%s'", cwd)
                 os.chdir(cwd)
-                raise
-            logging.debug("returning back to directory '%s'", cwd)
-            os.chdir(cwd)
-            return result
         return chdir_
     return decorate
 
+# -----------------------------------------------------------------------------
+#  Row cache class
+# -----------------------------------------------------------------------------
+
+class RowCache:
+    """Encoded and validated table rows of menu items keyed on their content,
+    reused by subsequent saves of the same menu. Edited items have a different
+    key and are encoded again. Rows not used by the last successful save are
+    dropped.
+    """
+
+    def __init__(self):
+        self.__rows = {}
+        self.__used = {}
+
+    def begin(self):
+        """Start collecting rows used by a new save."""
+        self.__used = {}
+
+    def commit(self):
+        """Keep only rows used since the last call of `begin()`."""
+        self.__rows = self.__used
+        self.__used = {}
+
+    def row(self, table, key, create):
+        """Returns row of *table* for content *key*, calls *create* to encode
+        the row if not cached.
+        """
+        key = table, key
+        row = self.__used.get(key)
+        if row is None:
+            row = self.__rows.get(key)
+            if row is None:
+                row = create()
+            self.__used[key] = row
+        return row
+
+    def __len__(self):
+        return len(self.__rows)
+
 # -----------------------------------------------------------------------------
 #  Encoder classes
 # -----------------------------------------------------------------------------
@@ -96,16 +136,15 @@ class XmlEncoderError(Exception):
 
 class XmlEncoderQueue(Queue):
 
-    def __init__(self, menu, filename):
+    def __init__(self, menu, filename, cache=None):
         super().__init__()
         self.menu = menu
         self.filename = os.path.abspath(filename)
+        self.cache = RowCache() if cache is None else cache
         self.add_callback(self.run_prepare, "preparing writing to file")
         self.add_callback(self.run_process_info, "preparing menu info")
         self.add_callback(self.run_process_algorithms, "preparing algorithms")
-        self.add_callback(self.run_process_objects, "preparing objects")
-        self.add_callback(self.run_process_externals, "preparing external signals")
-        self.add_callback(self.run_process_cuts, "preparing cuts")
+        self.add_callback(self.run_process_requirements, "preparing requirements")
         self.add_callback(self.run_dump_xml, "writing XML file")
         self.add_callback(self.run_verify_dump, "verifying written file")
 
@@ -127,6 +166,7 @@ class XmlEncoderQueue(Queue):
         self.tables = TableHelper()
         self.tables.scale = self.menu.scales
         self.tables.extSignal = self.menu.extSignals
+        self.cache.begin()
 
     @chdir(toolbox.getXsdDir())
     def run_process_info(self):
@@ -154,113 +194,129 @@ class XmlEncoderQueue(Queue):
 
     @chdir(toolbox.getXsdDir())
     def run_process_algorithms(self):
-        for algorithm in self.menu.algorithms:
-            # Create algorithm row
-            row = tmTable.Row()
-            row[kIndex] = format(algorithm.index, FORMAT_INDEX)
-            row[kModuleId] = "0"
-            row[kModuleIndex] = format(algorithm.index, FORMAT_INDEX)
-            row[kName] = safe_str(algorithm.name, "algorithm name")
-            row[kExpression] = AlgorithmFormatter.compress(algorithm.expression)
-            row[kComment] = algorithm.comment
-            row[kLabels] = encode_labels(algorithm.labels)
-            # Validate algorithm row
-            if not tmTable.isAlgorithm(row):
-                message = "invalid algorithm ({algorithm.index}): {algorithm.name}".format(algorithm=algorithm)
-                logging.error(message)
-                raise XmlEncoderError(message)
-            # Append algorithm row
-            logging.debug("appending algorithm: %s", dict(row))
+        for algorithm in self.track(self.menu.algorithms):
+            key = algorithm.index, algorithm.name, algorithm.expression, algorithm.comment, tuple(algorithm.labels)
+            row = self.cache.row(kAlgorithm, key, functools.partial(self.algorithmRow, algorithm))
             self.tables.menu.algorithms.append(row)
 
-    @chdir(toolbox.getXsdDir())
-    def run_process_objects(self):
-        for algorithm in self.menu.algorithms:
-            # Objects
-            if algorithm.name not in self.tables.menu.objects.keys():
-                self.tables.menu.objects[algorithm.name] = []
-            for name in algorithm.objects():
-                object_ = self.menu.objectByName(name)
-                if not object_:
-                    message = "missing object requirement: {0}".format(name)
-                    logging.error(message)
-                    raise XmlEncoderError(message)
-                # Create object row
-                row = tmTable.Row()
-                row[kName] = safe_str(object_.name, "object name")
-                row[kType] = object_.type
-                row[kThreshold] = format(object_.decodeThreshold(), FORMAT_FLOAT)
-                row[kComparisonOperator] = object_.comparison_operator
-                row[kBxOffset] = format(object_.bx_offset, FORMAT_BX_OFFSET)
-                # Validate object row
-                if not tmTable.isObjectRequirement(row):
-                    message = "invalid object requirement: {0}".format(name)
-                    logging.error(message)
-                    raise XmlEncoderError(message)
-                # Append object trow
-                logging.debug("appending object requirement: %s", dict(row))
-                self.tables.menu.objects[algorithm.name] = self.tables.menu.objects[algorithm.name] + (row, )
+    def algorithmRow(self, algorithm):
+        """Returns validated row of *algorithm*."""
+        # Create algorithm row
+        row = tmTable.Row()
+        row[kIndex] = format(algorithm.index, FORMAT_INDEX)
+        row[kModuleId] = "0"
+        row[kModuleIndex] = format(algorithm.index, FORMAT_INDEX)
+        row[kName] = safe_str(algorithm.name, "algorithm name")
+        row[kExpression] = AlgorithmFormatter.compress(algorithm.expression)
+        row[kComment] = algorithm.comment
+        row[kLabels] = encode_labels(algorithm.labels)
+        # Validate algorithm row
+        if not tmTable.isAlgorithm(row):
+            message = "invalid algorithm ({algorithm.index}): {algorithm.name}".format(algorithm=algorithm)
+            logging.error(message)
+            raise XmlEncoderError(message)
+        logging.debug("appending algorithm: %s", dict(row))
+        return row
 
     @chdir(toolbox.getXsdDir())
-    def run_process_externals(self):
-        for algorithm in self.menu.algorithms:
-            # Externals
-            if algorithm.name not in self.tables.menu.externals.keys():
-                self.tables.menu.externals[algorithm.name] = []
-            for name in algorithm.externals():
-                external = self.menu.externalByName(name)
-                if not external:
-                    message = "missing external signal: {0}".format(name)
-                    logging.error(message)
-                    raise XmlEncoderError(message)
-                # Create external row
-                row = tmTable.Row()
-                row[kName] = safe_str(external.name, "external_name")
-                row[kBxOffset] = format(external.bx_offset, FORMAT_BX_OFFSET)
-                # Validate external row
-                if not tmTable.isExternalRequirement(row):
-                    message = "invalid external signal: {0}".format(name)
-                    logging.error(message)
-                    raise XmlEncoderError(message)
-                # Append external row
-                logging.debug("appending external signal: %s", dict(row))
-                self.tables.menu.externals[algorithm.name] = self.tables.menu.externals[algorithm.name] + (row, )
+    def run_process_requirements(self):
+        # Rows are validated once per requirement and shared by algorithms.
+        objects = {}
+        externals = {}
+        cuts = {}
+        for algorithm in self.track(self.menu.algorithms):
+            parsed = algorithm.parsed()
+            objects[algorithm.name] = [self.objectRow(name) for name in parsed.objects]
+            externals[algorithm.name] = [self.externalRow(name) for name in parsed.externals]
+            cuts[algorithm.name] = [self.cutRow(name) for name in parsed.cuts]
+        for name, rows in objects.items():
+            self.tables.menu.objects[name] = rows
+        for name, rows in externals.items():
+            self.tables.menu.externals[name] = rows
+        for name, rows in cuts.items():
+            self.tables.menu.cuts[name] = rows
 
-    @chdir(toolbox.getXsdDir())
-    def run_process_cuts(self):
-        for algorithm in self.menu.algorithms:
-            # Cuts
-            if algorithm.name not in self.tables.menu.cuts.keys():
-                self.tables.menu.cuts[algorithm.name] = []
-            for name in algorithm.cuts():
-                logging.debug("processing cut: %s", name)
-                cut = self.menu.cutByName(name)
-                if not cut:
-                    message = "missing cut: {0}".format(name)
-                    logging.error(message)
-                    raise XmlEncoderError(message)
-                # Create cut row
-                row = tmTable.Row()
-                row[kName] = safe_str(cut.name, "cut name")
-                row[kObject] = cut.object
-                row[kType] = cut.type
-                if cut.data:
-                    row[kMinimum] = format(0., FORMAT_FLOAT)
-                    row[kMaximum] = format(0., FORMAT_FLOAT)
-                    row[kData] = cut.data
-                else:
-                    row[kMinimum] = format(float(cut.minimum), FORMAT_FLOAT)
-                    row[kMaximum] = format(float(cut.maximum), FORMAT_FLOAT)
-                    row[kData] = ""
-                row[kComment] = cut.comment
-                #Validate cut row
-                if not tmTable.isCut(row):
-                    message = "invalid cut: {0}".format(name)
-                    logging.error(message)
-                    raise XmlEncoderError(message)
-                # Append cut row
-                logging.debug("appending cut: %s", dict(row))
-                self.tables.menu.cuts[algorithm.name] = self.tables.menu.cuts[algorithm.name] + (row, )
+    def objectRow(self, name):
+        """Returns validated object requirement row for *name*."""
+        object_ = self.menu.objectByName(name)
+        if not object_:
+            message = "missing object requirement: {0}".format(name)
+            logging.error(message)
+            raise XmlEncoderError(message)
+        key = object_.name, object_.type, object_.threshold, object_.comparison_operator, object_.bx_offset
+        return self.cache.row(kObjectRequirement, key, functools.partial(self.createObjectRow, object_))
+
+    def createObjectRow(self, object_):
+        # Create object row
+        row = tmTable.Row()
+        row[kName] = safe_str(object_.name, "object name")
+        row[kType] = object_.type
+        row[kThreshold] = format(object_.decodeThreshold(), FORMAT_FLOAT)
+        row[kComparisonOperator] = object_.comparison_operator
+        row[kBxOffset] = format(object_.bx_offset, FORMAT_BX_OFFSET)
+        # Validate object row
+        if not tmTable.isObjectRequirement(row):
+            message = "invalid object requirement: {0}".format(object_.name)
+            logging.error(message)
+            raise XmlEncoderError(message)
+        logging.debug("appending object requirement: %s", dict(row))
+        return row
+
+    def externalRow(self, name):
+        """Returns validated external signal row for *name*."""
+        external = self.menu.externalByName(name)
+        if not external:
+            message = "missing external signal: {0}".format(name)
+            logging.error(message)
+            raise XmlEncoderError(message)
+        key = external.name, external.bx_offset
+        return self.cache.row(kExternalRequirement, key, functools.partial(self.createExternalRow, external))
+
+    def createExternalRow(self, external):
+        # Create external row
+        row = tmTable.Row()
+        row[kName] = safe_str(external.name, "external_name")
+        row[kBxOffset] = format(external.bx_offset, FORMAT_BX_OFFSET)
+        # Validate external row
+        if not tmTable.isExternalRequirement(row):
+            message = "invalid external signal: {0}".format(external.name)
+            logging.error(message)
+            raise XmlEncoderError(message)
+        logging.debug("appending external signal: %s", dict(row))
+        return row
+
+    def cutRow(self, name):
+        """Returns validated cut row for *name*."""
+        cut = self.menu.cutByName(name)
+        if not cut:
+            message = "missing cut: {0}".format(name)
+            logging.error(message)
+            raise XmlEncoderError(message)
+        key = cut.name, cut.object, cut.type, cut.minimum, cut.maximum, cut.data, cut.comment
+        return self.cache.row(kCut, key, functools.partial(self.createCutRow, cut))
+
+    def createCutRow(self, cut):
+        # Create cut row
+        row = tmTable.Row()
+        row[kName] = safe_str(cut.name, "cut name")
+        row[kObject] = cut.object
+        row[kType] = cut.type
+        if cut.data:
+            row[kMinimum] = format(0., FORMAT_FLOAT)
+            row[kMaximum] = format(0., FORMAT_FLOAT)
+            row[kData] = cut.data
+        else:
+            row[kMinimum] = format(float(cut.minimum), FORMAT_FLOAT)
+            row[kMaximum] = format(float(cut.maximum), FORMAT_FLOAT)
+            row[kData] = ""
+        row[kComment] = cut.comment
+        #Validate cut row
+        if not tmTable.isCut(row):
+            message = "invalid cut: {0}".format(cut.name)
+            logging.error(message)
+            raise XmlEncoderError(message)
+        logging.debug("appending cut: %s", dict(row))
+        return row
 
     @chdir(toolbox.getXsdDir())
     def run_dump_xml(self):
@@ -274,6 +330,7 @@ class XmlEncoderQueue(Queue):
             message = "failed to write to file `{0}'".format(self.filename)
             logging.error(message)
             raise XmlEncoderError(message)
+        self.cache.commit()
 
 def dump(menu, filename):
     queue = XmlEncoderQueue(menu, filename)
@@ -0,0 +1,273 @@
+"""XML menu readers, backends of the XML decoder.
+
+Readers load a menu XML file and provide the menu information, the scale
+and external signal tables and the algorithms, cuts, object requirements
+and external signals as menu items (not yet migrated or verified).
+All readers return items in the same order: algorithms in document order
+(like the tmTable algorithms vector) and requirements grouped by algorithm
+name (like the tmTable maps), in document order within an algorithm.
+
+ * TableReader   reads using tmTable.xml2menu (default, XSD validated)
+ * StreamReader  streams using xml.etree.ElementTree.iterparse
+
+Usage example
+-------------
+
+>>> reader = StreamReader()
+>>> warnings = reader.load(filename)
+>>> reader.algorithms()
+
+"""
+
+import xml.etree.ElementTree as ElementTree
+
+from .Algorithm import Algorithm, Cut, Object, External
+from .TableHelper import TableHelper, PlainScale, PlainExtSignal, tableScale, tableExtSignal
+from .ScaleIndex import ScaleIndex
+from .toolbox import safe_str, decode_labels
+
+__all__ = ['TableReader', 'StreamReader', 'Readers', 'DefaultReader', ]
+
+# -----------------------------------------------------------------------------
+#  Keys
+# -----------------------------------------------------------------------------
+
+kAlgorithm = 'algorithm'
+kBin = 'bin'
+kBxOffset = 'bx_offset'
+kComment = 'comment'
+kComparisonOperator = 'comparison_operator'
+kCut = 'cut'
+kData = 'data'
+kExpression = 'expression'
+kExtSignal = 'ext_signal'
+kExtSignalSet = 'ext_signal_set'
+kExternalRequirement = 'external_requirement'
+kIndex = 'index'
+kLabels = 'labels'
+kMaximum = 'maximum'
+kMinimum = 'minimum'
+kName = 'name'
+kObject = 'object'
+kObjectRequirement = 'object_requirement'
+kScale = 'scale'
+kScaleSet = 'scale_set'
+kThreshold = 'threshold'
+kType = 'type'
+
+# -----------------------------------------------------------------------------
+#  Row decoders
+# -----------------------------------------------------------------------------
+
+def decode_algorithm(row):
+    """Returns algorithm from dictionary *row*."""
+    index = int(row[kIndex])
+    name = safe_str(row[kName], "algorithm name")
+    expression = row[kExpression]
+    comment = row.get(kComment, "")
+    labels = decode_labels(row.get(kLabels, ""))
+    return Algorithm(index, name, expression, comment, labels)
+
+def decode_cut(row):
+    """Returns cut from dictionary *row*."""
+    name = safe_str(row[kName], "cut name")
+    object = row[kObject]
+    type = row[kType]
+    minimum = float(row[kMinimum])
+    maximum = float(row[kMaximum])
+    data = row[kData]
+    comment = row.get(kComment, "")
+    return Cut(name, object, type, minimum, maximum, data, comment)
+
+def decode_object(row):
+    """Returns object requirement from dictionary *row*."""
+    name = safe_str(row[kName], "object name")
+    type = row[kType]
+    threshold = row[kThreshold]
+    comparison_operator = row[kComparisonOperator]
+    bx_offset = int(row[kBxOffset])
+    comment = row.get(kComment, "")
+    return Object(name, type, threshold, comparison_operator, bx_offset, comment)
+
+def decode_external(row):
+    """Returns external signal from dictionary *row*."""
+    name = safe_str(row[kName], "external signal name")
+    bx_offset = int(row[kBxOffset])
+    comment = row.get(kComment, "")
+    return External(name, bx_offset, comment)
+
+# -----------------------------------------------------------------------------
+#  Table reader class
+# -----------------------------------------------------------------------------
+
+class TableReader:
+    """Reads menu using tmTable.xml2menu, menu items are created from the
+    table rows on demand.
+    """
+
+    def __init__(self):
+        self.tables = TableHelper()
+
+    def load(self, filename):
+        """Load menu from *filename*, returns tmTable warnings."""
+        return self.tables.load(filename)
+
+    @property
+    def info(self):
+        return self.tables.menu.menu
+
+    @property
+    def scale(self):
+        return self.tables.scale
+
+    @property
+    def extSignal(self):
+        return self.tables.extSignal
+
+    def algorithms(self):
+        return [decode_algorithm(dict(row)) for row in self.tables.menu.algorithms]
+
+    def cuts(self):
+        return [decode_cut(dict(row)) for _, cuts in sorted(self.tables.menu.cuts.items()) for row in cuts]
+
+    def objects(self):
+        return [decode_object(dict(row)) for _, objects in sorted(self.tables.menu.objects.items()) for row in objects]
+
+    def externals(self):
+        return [decode_external(dict(row)) for _, externals in sorted(self.tables.menu.externals.items()) for row in externals]
+
+# -----------------------------------------------------------------------------
+#  Stream reader class
+# -----------------------------------------------------------------------------
+
+def localName(tag):
+    """Returns tag without XML namespace."""
+    return tag.rpartition('}')[2]
+
+def elementRow(element, exclude=()):
+    """Returns dictionary of child element names and texts, processed child
+    elements were already removed.
+    """
+    row = {}
+    for child in element:
+        tag = localName(child.tag)
+        if tag not in exclude:
+            row[tag] = child.text or ""
+    return row
+
+class StreamReader:
+    """Reads menu using ElementTree.iterparse, creating menu items while
+    parsing and releasing every processed element. Unlike tmTable.xml2menu
+    the XML file is not validated against the XSD schema.
+    """
+
+    def __init__(self):
+        self.info = {}
+        self.scale = None
+        self.extSignal = None
+        self.__algorithms = []
+        self.__cuts = {} # algorithm name -> cuts
+        self.__objects = {}
+        self.__externals = {}
+
+    def load(self, filename):
+        """Load menu from *filename*, returns parser error message or empty
+        string on success.
+        """
+        try:
+            self.__parse(filename)
+        except ElementTree.ParseError as e:
+            return format(e)
+        return ""
+
+    def __parse(self, filename):
+        scaleSet = {}
+        scales = []
+        bins = {}
+        scaleBins = []
+        extSignalSet = {}
+        extSignals = []
+        cuts = []
+        objects = []
+        externals = []
+        elements = []
+        tags = [] # local names of elements
+        for event, element in ElementTree.iterparse(filename, events=('start', 'end')):
+            if event == 'start':
+                elements.append(element)
+                tags.append(localName(element.tag))
+                continue
+            elements.pop()
+            tag = tags.pop()
+            depth = len(tags)
+            if not depth:
+                continue # root element
+            parentTag = tags[-1]
+            if depth == 1:
+                if tag == kAlgorithm:
+                    algorithm = decode_algorithm(elementRow(element))
+                    self.__algorithms.append(algorithm)
+                    self.__cuts.setdefault(algorithm.name, []).extend(cuts)
+                    self.__objects.setdefault(algorithm.name, []).extend(objects)
+                    self.__externals.setdefault(algorithm.name, []).extend(externals)
+                    cuts, objects, externals = [], [], []
+                elif tag not in (kScaleSet, kExtSignalSet):
+                    self.info[tag] = element.text or ""
+            elif parentTag == kAlgorithm:
+                if tag == kCut:
+                    cuts.append(decode_cut(elementRow(element)))
+                elif tag == kObjectRequirement:
+                    objects.append(decode_object(elementRow(element)))
+                elif tag == kExternalRequirement:
+                    externals.append(decode_external(elementRow(element)))
+                else:
+                    continue # attribute of algorithm
+            elif parentTag == kScale:
+                if tag == kBin:
+                    scaleBins.append(elementRow(element))
+                else:
+                    continue # attribute of scale
+            elif parentTag == kScaleSet:
+                if tag == kScale:
+                    row = elementRow(element, (kBin, ))
+                    scales.append(row)
+                    bins[ScaleIndex.binsName(row[kObject], row[kType])] = scaleBins
+                    scaleBins = []
+                else:
+                    scaleSet[tag] = element.text or ""
+            elif parentTag == kExtSignalSet:
+                if tag == kExtSignal:
+                    extSignals.append(elementRow(element))
+                else:
+                    extSignalSet[tag] = element.text or ""
+            else:
+                continue # attribute of parent element
+            # Release processed element.
+            elements[-1].remove(element)
+        self.scale = tableScale(PlainScale(scaleSet, scales, bins))
+        self.extSignal = tableExtSignal(PlainExtSignal(extSignalSet, extSignals))
+
+    @staticmethod
+    def __grouped(items):
+        return [item for name in sorted(items) for item in items[name]]
+
+    def algorithms(self):
+        return self.__algorithms
+
+    def cuts(self):
+        return self.__grouped(self.__cuts)
+
+    def objects(self):
+        return self.__grouped(self.__objects)
+
+    def externals(self):
+        return self.__grouped(self.__externals)
+
+Readers = {
+    'tmtable': TableReader,
+    'stream': StreamReader,
+}
+"""Available XML reader backends."""
+
+DefaultReader = 'tmtable'
+"""Default XML reader backend."""
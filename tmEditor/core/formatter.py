@@ -42,6 +42,22 @@ def fFileSize(size, suffix='B'):
         size /= factor
     return "{0:.1f}{1}{2}".format(size, 'Yi', suffix)
 
+def fItemProgress(report):
+    """Returns formatted per item progress (see Queue.ItemProgress) including
+    throughput and estimated remaining time.
+    >>> fItemProgress(report)
+    '120/400 (850/s, 0.3 s remaining)'
+    """
+    text = "{0}/{1}".format(report.count, report.total)
+    details = []
+    if report.rate:
+        details.append("{0:.0f}/s".format(report.rate))
+    if report.remaining is not None:
+        details.append("{0:.1f} s remaining".format(report.remaining))
+    if details:
+        text = "{0} ({1})".format(text, ", ".join(details))
+    return text
+
 # -----------------------------------------------------------------------------
 #  Formatters for cuts
 # -----------------------------------------------------------------------------
@@ -6,6 +6,7 @@ import platform
 import re
 import ssl
 
+from collections import OrderedDict
 from urllib.request import urlopen
 
 import tmTable
@@ -99,9 +100,33 @@ def encode_labels(labels, pretty=False):
 # -----------------------------------------------------------------------------
 
 class CutSpecificationPool:
-    """Cut specification pool."""
+    """Cut specification pool. Provides precomputed indexes for commonly
+    queried attribute combinations, results of other queries are kept in a
+    least recently used cache.
+    """
+
+    IndexedAttributes = (
+        ('object',),
+        ('type',),
+        ('object', 'type'),
+        ('enabled', 'object', 'type'),
+    )
+    """Attribute combinations to be indexed, names must be sorted."""
+
+    QueryCacheSize = 256
+    """Maximum number of cached results of not indexed queries."""
+
     def __init__(self, *args):
         self.specs = args
+        self.__index = {}
+        self.__cache = OrderedDict()
+        for names in self.IndexedAttributes:
+            groups = {}
+            for spec in self.specs:
+                values = tuple(getattr(spec, name) for name in names)
+                groups.setdefault(values, []).append(spec)
+            for values, specs in groups.items():
+                self.__index[tuple(zip(names, values))] = tuple(specs)
 
     def __len__(self):
         return len(self.specs)
@@ -110,14 +135,33 @@ class CutSpecificationPool:
         return iter(self.specs)
 
     def query(self, **kwargs):
-        """Query specifications by attributes and values.
-        >>> pool.filter(object='MU', type='ISO')
-        [CutSpecification instance at 0x...>]
+        """Query specifications by attributes and values. Returns immutable
+        tuple of specifications.
+        >>> pool.query(object='MU', type='ISO')
+        (<CutSpecification instance at 0x...>,)
         """
+        key = tuple(sorted(kwargs.items()))
+        try:
+            if tuple(name for name, value in key) in self.IndexedAttributes:
+                return self.__index.get(key, ()) # empty if no matching specification
+            results = self.__cache[key]
+        except KeyError:
+            pass
+        except TypeError: # unhashable values
+            return self.__query(kwargs)
+        else:
+            self.__cache.move_to_end(key)
+            return results
+        results = self.__cache[key] = self.__query(kwargs)
+        if len(self.__cache) > self.QueryCacheSize:
+            self.__cache.popitem(last=False)
+        return results
+
+    def __query(self, kwargs):
         results = self.specs
         for key, value in kwargs.items():
             results = list(filter(lambda spec: hasattr(spec, key) and getattr(spec, key) == value, results))
-        return results
+        return tuple(results)
 
 class CutSpecification:
     """Cut specific settings.
@@ -691,25 +691,22 @@ class AlgorithmEditorDialog(QtWidgets.QDialog):
             # Validate algorithm expression.
             validator = AlgorithmSyntaxValidator(self.editor.menu)
             validator.validate(self.expression()) # mechanized expression
-            for algorithm in self.editor.menu.algorithms:
-                if algorithm is self.loadedAlgorithm:
-                    continue
-                if int(algorithm.index) == int(self.index()):
-                    QtWidgets.QMessageBox.warning(
-                        self,
-                        self.tr("Index used"),
-                        self.tr("Algorithm index {} already used. Please select a different index.").format(algorithm.index)
-                    )
-                    return False
-                if algorithm.name == self.name():
-                    QtWidgets.QMessageBox.warning(
-                        self,
-                        self.tr("Name used"),
-                        self.tr("Algorithm name {} already used (by index {})").format(algorithm.name, algorithm.index)
-                    )
-                    return False
-                # Check existance of cuts and external signals.
-                #
+            algorithm = self.editor.menu.algorithmByIndex(self.index())
+            if algorithm and algorithm is not self.loadedAlgorithm:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    self.tr("Index used"),
+                    self.tr("Algorithm index {} already used. Please select a different index.").format(algorithm.index)
+                )
+                return False
+            algorithm = self.editor.menu.algorithmByName(self.name())
+            if algorithm and algorithm is not self.loadedAlgorithm:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    self.tr("Name used"),
+                    self.tr("Algorithm name {} already used (by index {})").format(algorithm.name, algorithm.index)
+                )
+                return False
             # TODO
             # Temporary limited conistency check.
             algorithm = Algorithm(self.index(), self.name(), self.expression(), self.comment(), self.labels())
@@ -718,7 +715,7 @@ class AlgorithmEditorDialog(QtWidgets.QDialog):
                 pass
             algorithm.cuts()
             for name in algorithm.cuts():
-                if not list(filter(lambda item: item.name == name, self.editor.menu.cuts)):
+                if not self.editor.menu.cutByName(name):
                     raise AlgorithmSyntaxError(f"Undefined cut `{name}`.", name)
             for name in algorithm.externals():
                 def signal_name(name): return External(name, 0).signal_name
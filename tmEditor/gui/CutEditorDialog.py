@@ -66,30 +66,26 @@ def createVerticalSpacerItem(width=0, height=0):
     verticalPolicy = QtWidgets.QSizePolicy.MinimumExpanding
     return QtWidgets.QSpacerItem(width, height, horizontalPolicy, verticalPolicy)
 
-def calculateRange(specification, scales):
+def calculateRange(specification, scaleIndex):
     """Returns calcualted range for linear cut."""
     # Unconstrained pt
     if specification.type == tmGrammar.UPT:
-        def isMuUpt(scale): # filter
-            return scale[kObject] == tmGrammar.MU and scale[kType] == tmGrammar.UPT
-        for scale in filter(isMuUpt, scales.scales):
+        scale = scaleIndex.meta(tmGrammar.MU, tmGrammar.UPT)
+        if scale:
             minimum = float(scale[kMinimum])
             maximum = float(scale[kMaximum])
             return minimum, maximum
         return 0, 0
     # Delta eta
     if specification.type in (tmGrammar.DETA, tmGrammar.ORMDETA):
-        def isMuEta(scale): # filter
-            return scale[kObject] == tmGrammar.MU and scale[kType] == tmGrammar.ETA
-        def isJetEta(scale): # filter
-            return scale[kObject] == tmGrammar.JET and scale[kType] == tmGrammar.ETA
-        for scaleMu in filter(isMuEta, scales.scales):
-            for scaleCalo in filter(isJetEta, scales.scales):
-                scale = scaleMu if scaleMu[kMaximum] > scaleCalo[kMaximum] else scaleCalo
-                minimum = 0.
-                maximum = float(scale[kMaximum]) * 2.
-                return minimum, maximum
-            return 0, 0
+        scaleMu = scaleIndex.meta(tmGrammar.MU, tmGrammar.ETA)
+        scaleCalo = scaleIndex.meta(tmGrammar.JET, tmGrammar.ETA)
+        if scaleMu and scaleCalo:
+            scale = scaleMu if scaleMu[kMaximum] > scaleCalo[kMaximum] else scaleCalo
+            minimum = 0.
+            maximum = float(scale[kMaximum]) * 2.
+            return minimum, maximum
+        return 0, 0
     # Delta phi
     if specification.type in (tmGrammar.DPHI, tmGrammar.ORMDPHI):
         minimum = 0.
@@ -231,10 +227,10 @@ class InputWidget(QtWidgets.QWidget):
     >>> widget.updateCut(cut)
     """
 
-    def __init__(self, specification, scales, parent=None):
+    def __init__(self, specification, scaleIndex, parent=None):
         super().__init__(parent)
         self.specification = specification
-        self.scales = scales
+        self.scaleIndex = scaleIndex
 
     def loadCut(self, cut):
         """Initialize widget from cut item."""
@@ -247,8 +243,8 @@ class InputWidget(QtWidgets.QWidget):
 class ScaleWidget(InputWidget):
     """Provides scales range entries."""
 
-    def __init__(self, specification, scales, parent=None):
-        super().__init__(specification, scales, parent)
+    def __init__(self, specification, scaleIndex, parent=None):
+        super().__init__(specification, scaleIndex, parent)
         self.setupUi()
         self.initRange()
 
@@ -298,7 +294,7 @@ class ScaleWidget(InputWidget):
         self.maximumSpinBox.valueChanged.connect(self.updateCharts)
 
     def initRange(self):
-        scale = self.scales.bins[self.specification.name]
+        scale = self.scaleIndex.binsByName(self.specification.name)
         self.minimumSpinBox.setScale(scale)
         self.maximumSpinBox.setScale(scale)
         minimum = self.minimumSpinBox.minimum()
@@ -331,8 +327,8 @@ class ScaleWidget(InputWidget):
 class RangeWidget(InputWidget):
     """Provides range entries."""
 
-    def __init__(self, specification, scales, parent=None):
-        super().__init__(specification, scales, parent)
+    def __init__(self, specification, scaleIndex, parent=None):
+        super().__init__(specification, scaleIndex, parent)
         self.setupUi()
         self.initRange()
 
@@ -378,7 +374,7 @@ class RangeWidget(InputWidget):
 
     def initRange(self):
         """Set range for inputs."""
-        minimum, maximum = calculateRange(self.specification, self.scales)
+        minimum, maximum = calculateRange(self.specification, self.scaleIndex)
         self.minimumSpinBox.setRange(minimum, maximum)
         self.maximumSpinBox.setRange(minimum, maximum)
         minimum = self.minimumSpinBox.minimum()
@@ -400,8 +396,8 @@ class RangeWidget(InputWidget):
 class InfiniteRangeWidget(InputWidget):
     """Provides range entries with infinity option."""
 
-    def __init__(self, specification, scales, parent=None):
-        super().__init__(specification, scales, parent)
+    def __init__(self, specification, scaleIndex, parent=None):
+        super().__init__(specification, scaleIndex, parent)
         self.setupUi()
         self.initRange()
 
@@ -457,7 +453,7 @@ class InfiniteRangeWidget(InputWidget):
 
     def initRange(self):
         """Set range for inputs."""
-        minimum, maximum = calculateRange(self.specification, self.scales)
+        minimum, maximum = calculateRange(self.specification, self.scaleIndex)
         self.minimumSpinBox.setRange(minimum, maximum)
         self.maximumSpinBox.setRange(minimum, maximum)
         minimum = self.minimumSpinBox.minimum()
@@ -489,8 +485,8 @@ class InfiniteRangeWidget(InputWidget):
 class SliceWidget(InputWidget):
     """Provides slice selection entries, using cut minimum/maximum."""
 
-    def __init__(self, specification, scales, parent=None):
-        super().__init__(specification, scales, parent)
+    def __init__(self, specification, scaleIndex, parent=None):
+        super().__init__(specification, scaleIndex, parent)
         self.setupUi()
         self.initRange()
 
@@ -526,7 +522,7 @@ class SliceWidget(InputWidget):
 
     def initRange(self):
         """Set range for inputs."""
-        minimum, maximum = calculateRange(self.specification, self.scales)
+        minimum, maximum = calculateRange(self.specification, self.scaleIndex)
         self.beginSpinBox.setRange(minimum, maximum)
         self.endSpinBox.setRange(minimum, maximum)
         minimum = self.beginSpinBox.minimum()
@@ -552,8 +548,8 @@ class SliceWidget(InputWidget):
 class ThresholdWidget(InputWidget):
     """Provides a single threshold entry, using only cut minimum."""
 
-    def __init__(self, specification, scales, parent=None):
-        super().__init__(specification, scales, parent)
+    def __init__(self, specification, scaleIndex, parent=None):
+        super().__init__(specification, scaleIndex, parent)
         self.setupUi()
         self.initRange()
 
@@ -582,7 +578,7 @@ class ThresholdWidget(InputWidget):
 
     def initRange(self):
         """Set range for inputs."""
-        minimum, maximum = calculateRange(self.specification, self.scales)
+        minimum, maximum = calculateRange(self.specification, self.scaleIndex)
         self.thresholdSpinBox.setRange(minimum, maximum)
         minimum = self.thresholdSpinBox.minimum()
         self.thresholdSpinBox.setValue(minimum)
@@ -600,8 +596,8 @@ class ThresholdWidget(InputWidget):
 class MaximumWidget(InputWidget):
     """Provides a maximum only entriy."""
 
-    def __init__(self, specification, scales, parent=None):
-        super().__init__(specification, scales, parent)
+    def __init__(self, specification, scaleIndex, parent=None):
+        super().__init__(specification, scaleIndex, parent)
         self.setupUi()
         self.initRange()
 
@@ -630,7 +626,7 @@ class MaximumWidget(InputWidget):
 
     def initRange(self):
         """Set range for inputs."""
-        minimum, maximum = calculateRange(self.specification, self.scales)
+        minimum, maximum = calculateRange(self.specification, self.scaleIndex)
         self.maximumSpinBox.setRange(minimum, maximum)
         minimum = self.maximumSpinBox.minimum()
         self.maximumSpinBox.setValue(minimum)
@@ -648,8 +644,8 @@ class MaximumWidget(InputWidget):
 class MultipleJoiceWidget(InputWidget):
     """Provides a multiple joice entry."""
 
-    def __init__(self, specification, scales, parent=None):
-        super().__init__(specification, scales, parent)
+    def __init__(self, specification, scaleIndex, parent=None):
+        super().__init__(specification, scaleIndex, parent)
         self.setupUi()
 
     def setupUi(self):
@@ -714,8 +710,8 @@ class MultipleJoiceWidget(InputWidget):
 class MultipleJoiceIsoWidget(MultipleJoiceWidget):
     """Provides a multiple joice entry for isolation."""
 
-    def __init__(self, specification, scales, parent=None):
-        super().__init__(specification, scales, parent)
+    def __init__(self, specification, scaleIndex, parent=None):
+        super().__init__(specification, scaleIndex, parent)
 
     def format_label(self, key, value):
         """Check box label formatter provided for overlaoding."""
@@ -725,8 +721,8 @@ class MultipleJoiceIsoWidget(MultipleJoiceWidget):
 class SingleJoiceWidget(InputWidget):
     """Provides a single joice entry."""
 
-    def __init__(self, specification, scales, parent=None):
-        super().__init__(specification, scales, parent)
+    def __init__(self, specification, scaleIndex, parent=None):
+        super().__init__(specification, scaleIndex, parent)
         self.setupUi()
 
     def setupUi(self):
@@ -920,7 +916,7 @@ class CutEditorDialog(QtWidgets.QDialog):
         # TODO
         rootItems = {}
         self._items = []
-        scales = self.menu.scales
+        scaleIndex = self.menu.scaleIndex
         for spec in specifictions:
             # Check if item is disabled: { enabled: false } [optional]
             if not spec.enabled:
@@ -936,13 +932,13 @@ class CutEditorDialog(QtWidgets.QDialog):
             root = rootItems[key]
             # On missing scale (editing outdated XML?)
             if spec.type in (tmGrammar.ETA, tmGrammar.PHI, tmGrammar.UPT):
-                if spec.name not in scales.bins:
+                if scaleIndex.binsByName(spec.name) is None:
                     widget = self.stackWidget.widget(0)
                     item = self.treeWidget.addCutItem(root, spec, widget) # TODO
                     item.setDisabled(True)
                     continue
             # Create entry widget
-            widget = self.InputWidgetFactory[spec.type](spec, scales, self)
+            widget = self.InputWidgetFactory[spec.type](spec, scaleIndex, self)
             item = self.treeWidget.addCutItem(root, spec, widget)
             # Add input form to stack
             self.stackWidget.addWidget(item.widget)
@@ -952,7 +948,7 @@ class CutEditorDialog(QtWidgets.QDialog):
         """Initialize dialog from existing cut."""
         self.loadedCut = cut
         self.suffixLineEdit.setText(cut.suffix)
-        self.suffixLineEdit.setEnabled(not list(filter(lambda algorithm: cut.name in algorithm.cuts(), self.menu.algorithms)))
+        self.suffixLineEdit.setEnabled(not self.menu.algorithmsByCut(cut))
         if self.copyMode:
             self.suffixLineEdit.setEnabled(True) # HACK overrule on copy
         if cut.isFunctionCut: # TODO not efficient
@@ -998,9 +994,9 @@ class CutEditorDialog(QtWidgets.QDialog):
                 self.tr("No suffix is given. It must be at least one character in length.")
             )
         # Name already used?
-        if cut.name in [cut_.name for cut_ in self.menu.cuts]:
-            duplicates = list(filter(lambda cut_: cut_.name == cut.name, self.menu.cuts))
-            isConflict = (self.loadedCut and self.loadedCut in duplicates)
+        duplicate = self.menu.cutByName(cut.name)
+        if duplicate:
+            isConflict = (self.loadedCut and self.loadedCut == duplicate)
             if (self.copyMode and isConflict) or (not isConflict): # wired...
                 raise CutEditorError(
                     self.tr("Suffix \"{0}\" is already used with a cut of type \"{1}\".").format(cut.suffix, cut.type)
@@ -2,8 +2,11 @@
 
 import logging
 import copy
+import functools
 import os
 
+from distutils.version import StrictVersion
+
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 
@@ -12,8 +15,10 @@ from tmEditor.core.Settings import MaxAlgorithms
 from tmEditor.core import Menu
 from tmEditor.core.Algorithm import Algorithm, Cut, toObject
 from tmEditor.core import XmlDecoder, XmlEncoder
-from tmEditor.core.XmlEncoder import XmlEncoderError
-from tmEditor.core.XmlDecoder import XmlDecoderError
+from tmEditor.core.Queue import QueueCancelledError
+from tmEditor.core.MenuCache import MenuCache
+from tmEditor.core.MenuDigest import fileStamp
+from tmEditor.core.ScaleRegistry import scaleRegistry
 
 # Models and proxies for table views
 from tmEditor.gui.models import *
@@ -24,6 +29,7 @@ from tmEditor.gui.CutEditorDialog import CutEditorDialog
 from tmEditor.gui.AlgorithmEditorDialog import AlgorithmEditorDialog
 from tmEditor.gui.AlgorithmSelectIndexDialog import AlgorithmSelectIndexDialog
 from tmEditor.gui.BottomWidget import BottomWidget
+from tmEditor.gui.QueueProgressDialog import QueueProgressDialog
 
 # Common widgets
 from tmEditor.gui.CommonWidgets import TextFilterWidget
@@ -60,14 +66,6 @@ def fScale(scale):
         return "MU-PT"
     return scale
 
-# HACK
-def updateModel(model, context):
-    """Workaround while fixing table models..."""
-    source = model.sourceModel()
-    model.setSourceModel(source.__class__(context.menu(), context))
-    source.setParent(None)
-    source.deleteLater()
-
 def handleException(method):
     """Method decorator, show message box on exception."""
     def handleException(self, *args, **kwargs):
@@ -81,6 +79,12 @@ def handleException(method):
             )
     return handleException
 
+def menuCache():
+    """Returns default menu cache, or None if disabled in preferences."""
+    if QtCore.QSettings().value("cache/enabled", True, type=bool):
+        return MenuCache.default()
+    return None
+
 # ------------------------------------------------------------------------------
 #  Document widget
 # ------------------------------------------------------------------------------
@@ -140,7 +144,11 @@ class Document(BaseDocument):
     def __init__(self, filename, parent=None):
         super().__init__(filename, parent)
         # Attributes
-        self.loadMenu(filename)
+        try:
+            self.loadMenu(filename)
+        except Exception:
+            self.deleteLater()
+            raise
         # Layout
         self.setContentsMargins(0, 0, 0, 0)
         #
@@ -233,11 +241,15 @@ class Document(BaseDocument):
         self.extSignalsPage = self.addPage(self.tr("External Signals"), tableView)
 
     def createScaleBinsPages(self):
+        # Bins pages are rarely visited, views are created on first selection.
         self.scalesTypePages = {}
         for scale in self.menu().scales.bins.keys():
-            model = BinsModel(self.menu(), scale, self)
-            tableView = self.newProxyTableView(f"{scale}TableView", model)
-            self.scalesTypePages[scale] = self.addPage(fScale(scale), tableView, self.scalesPage)
+            factory = functools.partial(self.createScaleBinsView, scale)
+            self.scalesTypePages[scale] = self.addPage(fScale(scale), parent=self.scalesPage, factory=factory)
+
+    def createScaleBinsView(self, scale):
+        model = BinsModel(self.menu(), scale, self)
+        return self.newProxyTableView(f"{scale}TableView", model)
 
     def newProxyTableView(self, name, model, proxyclass=QtCore.QSortFilterProxyModel):
         """Factory to create new QTableView view using a QSortFilterProxyModel."""
@@ -253,14 +265,24 @@ class Document(BaseDocument):
         tableView.selectionModel().selectionChanged.connect(self.updateBottom)
         return tableView
 
-    def addPage(self, name, top=None, parent=None):
-        """Add page consisting of navigation tree entry, top and bottom widget."""
-        page = PageItem(name, top, self.bottomWidget, parent or self.navigationTreeWidget)
-        if 0 > self.topStack.indexOf(top):
+    def addPage(self, name, top=None, parent=None, factory=None):
+        """Add page consisting of navigation tree entry, top and bottom widget.
+        Optional *factory* creates the top widget on first selection of the
+        page.
+        """
+        page = PageItem(name, top, self.bottomWidget, parent or self.navigationTreeWidget, factory)
+        if top is not None and 0 > self.topStack.indexOf(top):
             self.topStack.addWidget(top)
         self._pages.append(page)
         return page
 
+    def loadPage(self, page):
+        """Create top widget of lazy *page* if not yet created."""
+        if page.top is None and page.factory is not None:
+            page.top = page.factory()
+            page.factory = None
+            self.topStack.addWidget(page.top)
+
     def setFilterText(self, text):
         index, item = self.getSelection()
         excludedPages = [self.menuPage, ]
@@ -274,34 +296,35 @@ class Document(BaseDocument):
     def menu(self):
         return self._menu
 
-    @handleException
+    def release(self):
+        """Release scale and external signal sets shared with other menus,
+        called on closing the document.
+        """
+        scaleRegistry.release(self._menu)
+
     def loadMenu(self, filename):
-        """Load menu from filename, setup new document."""
+        """Load menu from filename, setup new document. Raises an exception
+        if loading fails or was canceled.
+        """
         self.setFilename(filename)
         self.setName(os.path.basename(self.filename()))
-        dialog = QtWidgets.QProgressDialog(self)
+        # Create XML decoder and run it in a worker thread, attach the menu
+        # only on success.
+        queue = XmlDecoder.XmlDecoderQueue(self.filename(), menuCache())
+        dialog = QueueProgressDialog(self)
         dialog.setWindowTitle(self.tr("Loading..."))
-        dialog.setCancelButton(None)
-        dialog.setWindowModality(QtCore.Qt.WindowModal)
-        dialog.resize(260, dialog.height())
-        dialog.show()
-        QtWidgets.QApplication.processEvents()
-        # Create XML decoder and run
-        queue = XmlDecoder.XmlDecoderQueue(self.filename())
-        try:
-            for callback in queue:
-                dialog.setLabelText(self.tr("{0}...").format(queue.message().capitalize()))
-                logging.debug("processing: %s...", queue.message())
-                QtWidgets.QApplication.sendPostedEvents(dialog, 0)
-                QtWidgets.QApplication.processEvents()
-                callback()
-                dialog.setValue(queue.progress())
-                QtWidgets.QApplication.processEvents()
-        except XmlDecoderError as e:
-            dialog.close()
-            raise
+        dialog.run(queue)
         self._menu = queue.menu
-        dialog.close()
+        # Encoded rows reused by subsequent saves of the menu.
+        self._rowCache = XmlEncoder.RowCache()
+        # Menu digest shown on the menu page, updated on save and on
+        # selecting the menu page.
+        self._digest = self._menu.digest()
+        # Digest and file stamp of the menu file on disk, unknown if migrated
+        # or of an older grammar version (updated on save).
+        self._savedState = None
+        if not queue.applied_mirgrations and StrictVersion(self._menu.menu.grammar_version) == Menu.GrammarVersion:
+            self._savedState = self._digest, fileStamp(self.filename())
         if queue.applied_mirgrations:
             msgBox = QtWidgets.QMessageBox(self)
             msgBox.setIcon(QtWidgets.QMessageBox.Information)
@@ -351,30 +374,23 @@ class Document(BaseDocument):
         # Update meta information
         self._menu.menu.name = self.menuPage.top.nameLineEdit.text()
         self._menu.menu.comment = self.menuPage.top.commentTextEdit.toPlainText()
-        # Process dialog
-        dialog = QtWidgets.QProgressDialog(self)
+        self._digest = self._menu.digest()
+        # Skip saving if the file on disk already contains the menu.
+        if os.path.abspath(filename) == self.filename() and self._savedState == (self._digest, fileStamp(filename)):
+            logging.info("menu unchanged, skip saving: %s", filename)
+            self.setModified(False)
+            return
+        # Create XML encoder queue and run it in a worker thread
+        queue = XmlEncoder.XmlEncoderQueue(self._menu, filename, self._rowCache)
+        dialog = QueueProgressDialog(self)
         dialog.setWindowTitle(self.tr("Saving..."))
-        dialog.setCancelButton(None)
-        dialog.setWindowModality(QtCore.Qt.WindowModal)
-        dialog.resize(260, dialog.height())
-        dialog.show()
-        QtWidgets.QApplication.processEvents()
-        # Create XML encoder queue and run queue
-        queue = XmlEncoder.XmlEncoderQueue(self._menu, filename)
         try:
-            for callback in queue:
-                dialog.setLabelText(self.tr("{0}...").format(queue.message().capitalize()))
-                logging.debug("processing: %s...", queue.message())
-                QtWidgets.QApplication.sendPostedEvents(dialog, 0)
-                QtWidgets.QApplication.processEvents()
-                callback()
-                dialog.setValue(queue.progress())
-                QtWidgets.QApplication.processEvents()
-        except XmlEncoderError:
-            dialog.close()
-            raise
-        dialog.close()
+            dialog.run(queue)
+        except QueueCancelledError:
+            logging.info("saving canceled: %s", filename)
+            return
         # Update document
+        self._savedState = self._digest, fileStamp(filename)
         self.setFilename(filename)
         self.setName(os.path.basename(filename))
         self.menuPage.top.loadMenu(self.menu())
@@ -417,10 +433,17 @@ class Document(BaseDocument):
         return basename # no clue...
 
     def updateTop(self):
+        for page in self.navigationTreeWidget.selectedItems():
+            self.loadPage(page)
         index, item = self.getSelection()
         if item and hasattr(item.top, 'sortByColumn'):
-            item.top.sortByColumn(0, QtCore.Qt.AscendingOrder)
+            # Proxies keep sorted on changes, do not sort again if unchanged.
+            proxy = item.top.model()
+            if proxy.sortColumn() != 0 or proxy.sortOrder() != QtCore.Qt.AscendingOrder:
+                item.top.sortByColumn(0, QtCore.Qt.AscendingOrder)
         self.topStack.setCurrentWidget(item.top)
+        if item is self.menuPage and self.isModified():
+            self._digest = self._menu.digest()
         excludedPages = [self.menuPage, ]
         self.filterWidget.setEnabled(item not in excludedPages)
         self.filterWidget.setVisible(item not in excludedPages)
@@ -445,6 +468,7 @@ class Document(BaseDocument):
             lines.append(self.tr("<p><strong>External Signal Set:</strong> {}</p>").format(self.menu().extSignals.extSignalSet[kName]))
             lines.append(self.tr("<p><strong>Menu UUID:</strong> {}</p>").format(self.menu().menu.uuid_menu))
             lines.append(self.tr("<p><strong>Grammar Version:</strong> {}</p>").format(self.menu().menu.grammar_version))
+            lines.append(self.tr("<p><strong>Menu Digest:</strong> {}</p>").format(self._digest))
             item.bottom.setText("".join(lines))
             item.bottom.toolbar.setButtonsEnabled(False)
         elif index and item and isinstance(item.top, TableView): # ignores menu view
@@ -502,30 +526,32 @@ class Document(BaseDocument):
                 item.bottom.toolbar.removeButton.setEnabled(True)
                 cut = self.menu().cuts[index.row()]
                 # Disable edit and remove button for cuts already used in algorithms
-                for algorithm in self.menu().algorithms:
-                    if cut.name in algorithm.cuts():
-                        item.bottom.toolbar.removeButton.setEnabled(False)
+                if self.menu().algorithmsByCut(cut):
+                    item.bottom.toolbar.removeButton.setEnabled(False)
         else:
             item.bottom.toolbar.hide()
 
     def importCuts(self, cuts):
         """Import cuts from another menu, ignores if cut already present."""
+        imported = {}
         for cut in cuts:
-            if not self.menu().cutByName(cut.name):
+            if not self.menu().cutByName(cut.name) and cut.name not in imported:
                 cut.modified = True
-                self.menu().addCut(cut)
-        # HACK
-        updateModel(self.cutsPage.top.model(), self)
+                imported[cut.name] = cut
+        self.menu().addCuts(imported.values())
 
     def importAlgorithms(self, algorithms):
         """Import algorithms from another menu."""
+        imported = []
+        names = set()
+        indices = set()
         for algorithm in algorithms:
             for cut in algorithm.cuts():
                 if not self.menu().cutByName(cut):
                     raise RuntimeError(self.tr(f"Missing cut {cut}, unable to to import algorithm {algorithm.name}"))
             import_index = 0
             original_name = algorithm.name
-            while self.menu().algorithmByName(algorithm.name):
+            while self.menu().algorithmByName(algorithm.name) or algorithm.name in names:
                 name = f"{original_name}_import{import_index}"
                 algorithm.name = name
                 import_index += 1
@@ -535,8 +561,8 @@ class Document(BaseDocument):
                     self.tr("Renamed algorithm"),
                     self.tr("Renamed algorithm <em>{}</em> to <em>{}</em> as the name is already used.").format(original_name, algorithm.name)
                 )
-            if self.menu().algorithmByIndex(algorithm.index):
-                index = self.getUnusedAlgorithmIndices()[0]
+            if self.menu().algorithmByIndex(algorithm.index) or int(algorithm.index) in indices:
+                index = [i for i in self.getUnusedAlgorithmIndices() if i not in indices][0]
                 QtWidgets.QMessageBox.information(
                     self,
                     self.tr("Relocating algorithm"),
@@ -544,11 +570,13 @@ class Document(BaseDocument):
                 )
                 algorithm.index = int(index)
             algorithm.modified = True
-            self.menu().addAlgorithm(algorithm)
+            imported.append(algorithm)
+            names.add(algorithm.name)
+            indices.add(int(algorithm.index))
+        # Insert all rows at once.
+        self.menu().addAlgorithms(imported)
+        for algorithm in imported:
             self.menu().extendReferenced(algorithm)
-        # HACK
-        updateModel(self.algorithmsPage.top.model(), self)
-        self.algorithmsPage.top.resizeColumnsToContents()
 
     def addItem(self):
         try:
@@ -559,7 +587,6 @@ class Document(BaseDocument):
                 self.addCut(index, item)
         except RuntimeError as e:
             QtWidgets.QMessageBox.warning(self, self.tr("Error"), format(e))
-        item.top.sortByColumn(0, QtCore.Qt.AscendingOrder)
         selectedeRows = item.top.selectionModel().selectedRows()
         if selectedeRows:
             item.top.scrollTo(selectedeRows[0])
@@ -571,8 +598,6 @@ class Document(BaseDocument):
         dialog.setName(self.getUniqueAlgorithmName(self.tr("L1_Unnamed")))
         dialog.editor.setModified(False)
         dialog.exec_()
-        # HACK
-        updateModel(self.cutsPage.top.model(), self)
         if dialog.result() != QtWidgets.QDialog.Accepted:
             return
         self.setModified(True)
@@ -584,17 +609,14 @@ class Document(BaseDocument):
         )
         algorithm.modified = True
         for name in algorithm.cuts():
-            if not list(filter(lambda item: item.name == name, self.menu().cuts)):
+            if not self.menu().cutByName(name):
                 raise RuntimeError("NO SUCH CUT AVAILABLE")
         self.menu().addAlgorithm(algorithm)
         self.menu().extendReferenced(self.menu().algorithmByName(algorithm.name)) # IMPORTANT: add/update new objects!
-        # HACK
-        updateModel(item.top.model(), self)
-        self.algorithmsPage.top.resizeColumnsToContents()
         # REBUILD INDEX
         self.updateBottom()
         self.modified.emit()
-        # Select new entry TODO: better to implement insertRow in model!
+        # Select new entry
         proxy = item.top.model()
         for row in range(proxy.rowCount()):
             index = proxy.index(row, 1)
@@ -611,12 +633,10 @@ class Document(BaseDocument):
             return
         cut = dialog.newCut()
         self.menu().addCut(cut)
-        # HACK
-        updateModel(self.cutsPage.top.model(), self)
         self.updateBottom()
         self.setModified(True)
         self.modified.emit()
-        # Select new entry TODO: better to implement insertRow in model!
+        # Select new entry
         proxy = item.top.model()
         for row in range(proxy.rowCount()):
             index = proxy.index(row, 0)
@@ -634,7 +654,6 @@ class Document(BaseDocument):
             self.updateBottom()
         except RuntimeError as e:
             QtWidgets.QMessageBox.warning(self, self.tr("Error"), format(e))
-        item.top.sortByColumn(0, QtCore.Qt.AscendingOrder)
         selectedeRows = item.top.selectionModel().selectedRows()
         if selectedeRows:
             item.top.scrollTo(selectedeRows[0])
@@ -646,15 +665,14 @@ class Document(BaseDocument):
         dialog.loadAlgorithm(algorithm)
         dialog.editor.setModified(False)
         dialog.exec_()
-        # HACK
-        updateModel(self.cutsPage.top.model(), self)
         if dialog.result() != QtWidgets.QDialog.Accepted:
             return
         self.setModified(True)
         algorithm.modified = True
         dialog.updateAlgorithm(algorithm)
+        self.menu().updateAlgorithm(algorithm)
         for name in algorithm.cuts():
-            if not list(filter(lambda item: item.name == name, self.menu().cuts)):
+            if not self.menu().cutByName(name):
                 raise RuntimeError("NO SUCH CUT AVAILABLE") # TODO
         # REBUILD INDEX
         self.updateBottom()
@@ -673,6 +691,7 @@ class Document(BaseDocument):
             return
         self.setModified(True)
         dialog.updateCut(cut)
+        self.menu().updateCut(cut)
         self.updateBottom()
         self.modified.emit()
 
@@ -683,7 +702,6 @@ class Document(BaseDocument):
             self.copyAlgorithm(index, item)
         if item is self.cutsPage:
             self.copyCut(index, item)
-        item.top.sortByColumn(0, QtCore.Qt.AscendingOrder)
         selectedeRows = item.top.selectionModel().selectedRows()
         if selectedeRows:
             item.top.scrollTo(selectedeRows[0])
@@ -698,8 +716,6 @@ class Document(BaseDocument):
         dialog.setExpression(algorithm.expression)
         dialog.editor.setModified(False)
         dialog.exec_()
-        # HACK
-        updateModel(self.cutsPage.top.model(), self)
         if dialog.result() != QtWidgets.QDialog.Accepted:
             return
         algorithm.expression = dialog.expression()
@@ -707,22 +723,20 @@ class Document(BaseDocument):
         algorithm.name = dialog.name()
         algorithm.modified = True
         for name in algorithm.cuts():
-            if not list(filter(lambda item: item.name == name, self.menu().cuts)):
+            if not self.menu().cutByName(name):
                 raise RuntimeError("NO SUCH CUT AVAILABLE") # TODO
         for name in algorithm.externals():
-            if not list(filter(lambda item: item.name == name, self.menu().externals)):
+            if not self.menu().externalByName(name):
                 raise RuntimeError("NO SUCH EXTERNAL AVAILABLE") # TODO
-        self.menu().algorithms.append(algorithm)
-        # HACK
-        updateModel(item.top.model(), self)
+        self.menu().addAlgorithm(algorithm)
         # REBUILD INDEX
         self.updateBottom()
         self.modified.emit()
         self.setModified(True)
         for name in algorithm.objects():
-            if not list(filter(lambda item: item.name == name, self.menu().objects)):
+            if not self.menu().objectByName(name):
                 self.menu().addObject(toObject(name))
-        # Select new entry TODO: better to implement insertRow in model!
+        # Select new entry
         proxy = item.top.model()
         for row in range(proxy.rowCount()):
             index = proxy.index(row, 1)
@@ -744,12 +758,10 @@ class Document(BaseDocument):
             return
         cut = dialog.newCut()
         self.menu().addCut(cut)
-        # HACK
-        updateModel(self.cutsPage.top.model(), self)
         self.updateBottom()
         self.setModified(True)
         self.modified.emit()
-        # Select new entry TODO: better to implement insertRow in model!
+        # Select new entry
         proxy = item.top.model()
         for row in range(proxy.rowCount()):
             index = proxy.index(row, 0)
@@ -760,69 +772,69 @@ class Document(BaseDocument):
     @handleException
     def removeItem(self):
         index, item = self.getSelection()
+        if item not in (self.algorithmsPage, self.cutsPage):
+            return
+        proxy = item.top.model()
+        rows = item.top.selectionModel().selectedRows()
+        values = [proxy.sourceModel().values[proxy.mapToSource(row).row()] for row in rows]
+        buttons = QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.YesToAll | QtWidgets.QMessageBox.Abort if len(rows) > 1 else QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.Abort
         # Removing algorithm item
         if item is self.algorithmsPage:
             confirm = True
-            while item.top.selectionModel().hasSelection():
-                rows = item.top.selectionModel().selectedRows()
-                row = rows[0]
-                algorithm = item.top.model().sourceModel().values[item.top.model().mapToSource(row).row()]
+            algorithms = []
+            for algorithm in values:
                 if confirm:
                     result = QtWidgets.QMessageBox.question(
                         self,
                         self.tr("Remove algorithm"),
                         self.tr("Do you want to remove algorithm <strong>{0}, {1}</strong> from the menu?").format(algorithm.name, algorithm.index),
-                        QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.YesToAll | QtWidgets.QMessageBox.Abort if len(rows) > 1 else QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.Abort
+                        buttons
                     )
                     if result == QtWidgets.QMessageBox.Abort:
                         break
                     elif result == QtWidgets.QMessageBox.YesToAll:
                         confirm = False
-                item.top.model().removeRows(row.row(), 1)
-            selection = item.top.selectionModel()
-            selection.setCurrentIndex(selection.currentIndex(), QtCore.QItemSelectionModel.Select | QtCore.QItemSelectionModel.Rows)
+                algorithms.append(algorithm)
+            if not algorithms:
+                return
+            proxy.sourceModel().removeItems(algorithms)
             # Removing orphaned objects.
-            for name in self.menu().orphanedObjects():
-                object = self.menu().objectByName(name)
-                self.menu().objects.remove(object)
-            # REBUILD INDEX
-            self.updateBottom()
-            self.modified.emit()
-            self.setModified(True)
+            self.menu().removeOrphanedObjects()
 
         # Removing cut item
         elif item is self.cutsPage:
             confirm = True
-            while item.top.selectionModel().hasSelection():
-                rows = item.top.selectionModel().selectedRows()
-                row = rows[0]
-                cut = item.top.model().sourceModel().values[item.top.model().mapToSource(row).row()]
-                for algorithm in self.menu().algorithms:
-                    if cut.name in algorithm.cuts():
-                        QtWidgets.QMessageBox.warning(
-                            self,
-                            self.tr("Cut is used"),
-                            self.tr("Cut {0} is used by algorithm {1} an can not be removed. Remove the corresponding algorithm first.").format(cut.name, algorithm.name)
-                        )
-                        return
+            cuts = []
+            for cut in values:
+                algorithms = self.menu().algorithmsByCut(cut)
+                if algorithms:
+                    QtWidgets.QMessageBox.warning(
+                        self,
+                        self.tr("Cut is used"),
+                        self.tr("Cut {0} is used by algorithm {1} an can not be removed. Remove the corresponding algorithm first.").format(cut.name, algorithms[0].name)
+                    )
+                    return
                 if confirm:
                     result = QtWidgets.QMessageBox.question(
                         self,
                         self.tr("Remove cut"),
                         self.tr("Do you want to remove cut <strong>{0}</strong> from the menu?").format(cut.name),
-                        QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.YesToAll | QtWidgets.QMessageBox.Abort if len(rows) > 1 else QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.Abort
+                        buttons
                     )
                     if result == QtWidgets.QMessageBox.Abort:
                         break
                     elif result == QtWidgets.QMessageBox.YesToAll:
                         confirm = False
-                item.top.model().removeRows(row.row(), 1)
-            selection = item.top.selectionModel()
-            selection.setCurrentIndex(selection.currentIndex(), QtCore.QItemSelectionModel.Select | QtCore.QItemSelectionModel.Rows)
-            # REBUILD INDEX
-            self.updateBottom()
-            self.modified.emit()
-            self.setModified(True)
+                cuts.append(cut)
+            if not cuts:
+                return
+            proxy.sourceModel().removeItems(cuts)
+        selection = item.top.selectionModel()
+        selection.setCurrentIndex(selection.currentIndex(), QtCore.QItemSelectionModel.Select | QtCore.QItemSelectionModel.Rows)
+        # REBUILD INDEX
+        self.updateBottom()
+        self.modified.emit()
+        self.setModified(True)
 
     @handleException
     def moveItems(self):
@@ -838,20 +850,14 @@ class Document(BaseDocument):
         dialog.setup(reserved, indices)
         dialog.setModal(True)
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
-            logging.debug("moving algorithms:")
-            for k, v in dialog.mapping.items():
-                algorithm = self.menu().algorithmByIndex(k)
-                logging.debug("%s => %s", algorithm.index, v)
-                assert algorithm.index == k
-                algorithm.index = v
+            logging.debug("moving algorithms: %s", dialog.mapping)
+            for algorithm in self.menu().moveAlgorithms(dialog.mapping):
                 algorithm.modified = True
             self.setModified(True)
             self.modified.emit()
-            item.top.sortByColumn(0, QtCore.Qt.AscendingOrder)
             selectedeRows = item.top.selectionModel().selectedRows()
             if selectedeRows:
                 item.top.scrollTo(selectedeRows[0])
-        self.update()
 
 # ------------------------------------------------------------------------------
 #  Splitter and custom handle
@@ -882,13 +888,16 @@ class SlimSplitterHandle(QtWidgets.QSplitterHandle):
 # ------------------------------------------------------------------------------
 
 class PageItem(QtWidgets.QTreeWidgetItem):
-    """Custom QTreeWidgetItem holding references to top and bottom widgets."""
+    """Custom QTreeWidgetItem holding references to top and bottom widgets.
+    Optional *factory* creates the top widget of a lazy page.
+    """
 
-    def __init__(self, name, top=None, bottom=None, parent=None):
+    def __init__(self, name, top=None, bottom=None, parent=None, factory=None):
         super().__init__(parent, [name])
         self.name = name
         self.top = top
         self.bottom = bottom
+        self.factory = factory
         if not isinstance(parent, PageItem):
             # Hilight root items in bold text.
             font = self.font(0)
@@ -17,7 +17,8 @@ from PyQt5 import QtWidgets
 from tmEditor.core import XmlDecoder
 
 from tmEditor.gui.models import AlgorithmsModel
-from tmEditor.gui.Document import TableView
+from tmEditor.gui.Document import TableView, menuCache
+from tmEditor.gui.QueueProgressDialog import QueueProgressDialog
 
 # Common widgets
 from tmEditor.gui.CommonWidgets import IconLabel, createIcon
@@ -52,8 +53,7 @@ class ImportDialog(QtWidgets.QDialog):
         for algorithm in self.menu.algorithms:
             if self.baseMenu.algorithmByName(algorithm.name):
                 queue.append(algorithm)
-        for algorithm in queue:
-            self.menu.algorithms.remove(algorithm)
+        self.menu.removeAlgorithms(queue)
 
         self.setupUi()
 
@@ -91,30 +91,10 @@ class ImportDialog(QtWidgets.QDialog):
 
     def loadMenu(self, filename):
         """Load XML menu from file."""
-        dialog = QtWidgets.QProgressDialog(self)
+        queue = XmlDecoder.XmlDecoderQueue(filename, menuCache())
+        dialog = QueueProgressDialog(self)
         dialog.setWindowTitle(self.tr("Loading..."))
-        dialog.setCancelButton(None)
-        dialog.setWindowModality(QtCore.Qt.WindowModal)
-        dialog.resize(260, dialog.height())
-        dialog.show()
-        QtWidgets.QApplication.processEvents()
-        try:
-            queue = XmlDecoder.XmlDecoderQueue(filename)
-            for callback in queue:
-                dialog.setLabelText(self.tr("{}...").format(queue.message().capitalize()))
-                logging.debug("processing: %s...", queue.message())
-                QtWidgets.QApplication.sendPostedEvents(dialog, 0)
-                QtWidgets.QApplication.processEvents()
-                callback()
-                dialog.setValue(queue.progress())
-                QtWidgets.QApplication.processEvents()
-        except XmlDecoder.XmlDecoderError as e:
-            dialog.close() # make sure to close the progress dialog
-            raise
-        except Exception:
-            dialog.close()
-            raise
-        dialog.close()
+        dialog.run(queue)
         self.menu = queue.menu
 
     def validateMenu(self):
@@ -18,6 +18,7 @@ from ..core.toolbox import DownloadHelper
 from ..core.Settings import ContentsURL
 from ..core.XmlEncoder import XmlEncoderError
 from ..core.XmlDecoder import XmlDecoderError
+from ..core.Queue import QueueCancelledError
 
 from .AboutDialog import AboutDialog
 from .PreferencesDialog import PreferencesDialog
@@ -320,6 +321,8 @@ class MainWindow(QtWidgets.QMainWindow):
                     self.mdiArea.setCurrentWidget(duplicate)
                     return
                 document = Document(filename, self)
+        except QueueCancelledError:
+            logging.info("loading canceled: %s", filename)
         except Exception as e:
             logging.error("Failed to open XML menu: %s", e)
             QtWidgets.QMessageBox.critical(
@@ -379,6 +382,9 @@ class MainWindow(QtWidgets.QMainWindow):
             if filename:
                 try:
                     dialog = ImportDialog(filename, self.mdiArea.currentDocument().menu(), self)
+                except QueueCancelledError:
+                    logging.info("import canceled: %s", filename)
+                    return
                 except AlgorithmSyntaxError as e:
                     QtWidgets.QMessageBox.critical(
                         self,
@@ -72,6 +72,8 @@ class MdiArea(QtWidgets.QTabWidget):
             if reply == QtWidgets.QMessageBox.Save:
                 document.saveMenu()
         self.removeTab(index)
+        document.release()
+        document.deleteLater()
         return True
 
     @QtCore.pyqtSlot()
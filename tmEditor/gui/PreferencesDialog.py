@@ -4,6 +4,8 @@ from PyQt5 import QtCore
 from PyQt5 import QtGui
 from PyQt5 import QtWidgets
 
+from tmEditor.core.MenuCache import MenuCache
+
 __all__ = ['PreferencesDialog', ]
 
 # -----------------------------------------------------------------------------
@@ -57,9 +59,24 @@ class PreferencesDialog(QtWidgets.QDialog):
         hbox.addItem(QtWidgets.QSpacerItem(0, 0, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum))
         hbox.addWidget(self.clearHistoryButton)
         self.historyGroupBox.setLayout(hbox)
+        # Menu cache group box
+        self.cacheGroupBox = QtWidgets.QGroupBox(self.tr("&Menu cache"), self)
+        self.cacheGroupBox.setCheckable(True)
+        self.cacheGroupBox.setChecked(QtCore.QSettings().value("cache/enabled", True, type=bool))
+        self.cacheGroupBox.toggled.connect(self.onCacheEnabled)
+        # Clear button
+        self.clearCacheButton = QtWidgets.QPushButton(self.tr("Cle&ar"), self)
+        self.clearCacheButton.setAutoDefault(False)
+        self.clearCacheButton.clicked.connect(self.onClearCache)
+        hbox = QtWidgets.QHBoxLayout()
+        hbox.addWidget(QtWidgets.QLabel(self.tr("Clear cache of previously opened menus"), self))
+        hbox.addItem(QtWidgets.QSpacerItem(0, 0, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum))
+        hbox.addWidget(self.clearCacheButton)
+        self.cacheGroupBox.setLayout(hbox)
         vbox = QtWidgets.QVBoxLayout()
         vbox.addWidget(self.recentGroupBox)
         vbox.addWidget(self.historyGroupBox)
+        vbox.addWidget(self.cacheGroupBox)
         vbox.addItem(QtWidgets.QSpacerItem(0, 0, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding))
         self.filesTab.setLayout(vbox)
         self.tabWidget.addTab(self.filesTab, self.tr("&Files"))
@@ -71,3 +88,11 @@ class PreferencesDialog(QtWidgets.QDialog):
     def onClearHistory(self):
         """Clears history of downloaded URLs."""
         QtCore.QSettings().setValue("recent/urls", [])
+
+    def onCacheEnabled(self, enabled):
+        """Enables or disables caching of opened menus."""
+        QtCore.QSettings().setValue("cache/enabled", enabled)
+
+    def onClearCache(self):
+        """Clears cache of previously opened menus."""
+        MenuCache(MenuCache.defaultDirectory()).clear()
@@ -0,0 +1,113 @@
+"""Queue progress dialog.
+
+Executes a callback queue in a worker thread, keeping the GUI responsive
+and showing the progress of the queue. Per item progress reported by the
+queue stages is shown including throughput and estimated remaining time. The
+queue can be canceled by the user, execution aborts at the next stage
+boundary.
+
+Example usage:
+>>> queue = XmlDecoder.XmlDecoderQueue(filename)
+>>> dialog = QueueProgressDialog(parent)
+>>> dialog.setWindowTitle("Loading...")
+>>> dialog.run(queue)
+
+"""
+
+import logging
+
+from PyQt5 import QtCore
+from PyQt5 import QtWidgets
+
+from tmEditor.core.formatter import fItemProgress
+
+__all__ = ['QueueWorker', 'QueueProgressDialog', ]
+
+# -----------------------------------------------------------------------------
+#  Queue worker class
+# -----------------------------------------------------------------------------
+
+class QueueWorker(QtCore.QThread):
+    """Worker thread executing a callback queue. Any exception raised by the
+    queue is stored in attribute `exception`.
+    """
+
+    messageChanged = QtCore.pyqtSignal(str)
+    """This signal is emitted before executing a queue callback."""
+
+    progressChanged = QtCore.pyqtSignal(int)
+    """This signal is emitted after executing a queue callback."""
+
+    itemProgressChanged = QtCore.pyqtSignal(object)
+    """This signal is emitted on per item progress (ItemProgress) of a queue
+    callback.
+    """
+
+    def __init__(self, queue, parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        self.queue.add_progress_handler(self.itemProgressChanged.emit)
+        self.exception = None
+
+    def run(self):
+        try:
+            for callback in self.queue:
+                logging.debug("processing: %s...", self.queue.message())
+                self.messageChanged.emit(self.queue.message())
+                callback()
+                self.progressChanged.emit(int(self.queue.progress()))
+        except Exception as e:
+            self.exception = e
+
+# -----------------------------------------------------------------------------
+#  Queue progress dialog class
+# -----------------------------------------------------------------------------
+
+class QueueProgressDialog(QtWidgets.QProgressDialog):
+    """Progress dialog executing a callback queue in a worker thread."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowModality(QtCore.Qt.WindowModal)
+        self.setCancelButtonText(self.tr("&Cancel"))
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.resize(260, self.height())
+
+    def setMessage(self, message):
+        if not self.wasCanceled():
+            self.setLabelText(self.tr("{0}...").format(message.capitalize()))
+
+    def setItemProgress(self, report):
+        if not self.wasCanceled():
+            self.setLabelText(self.tr("{0}... {1}").format(report.message.capitalize(), fItemProgress(report)))
+            self.setValue(int(report.progress))
+
+    def run(self, queue):
+        """Execute *queue* in a worker thread, returns after the queue has
+        finished. Raises the exception raised by the queue, or a
+        QueueCancelledError if canceled by the user.
+        """
+        worker = QueueWorker(queue, self)
+        worker.messageChanged.connect(self.setMessage)
+        worker.progressChanged.connect(self.setValue)
+        worker.itemProgressChanged.connect(self.setItemProgress)
+        loop = QtCore.QEventLoop(self)
+        worker.finished.connect(loop.quit)
+
+        def cancel():
+            queue.cancel()
+            # Keep the (hidden on cancel) dialog open until the running
+            # stage has finished.
+            self.show()
+            self.setLabelText(self.tr("Canceling..."))
+
+        self.canceled.connect(cancel)
+        self.show()
+        worker.start()
+        loop.exec_()
+        worker.wait()
+        self.canceled.disconnect(cancel)
+        self.close()
+        if worker.exception is not None:
+            raise worker.exception
@@ -4,14 +4,40 @@ from collections import namedtuple
 
 from PyQt5 import QtCore
 
-__all__ = ['AbstractTableModel', ]
+from tmEditor.core.toolbox import natural_sort_key
+from tmEditor.core.MenuObserver import MenuObserver
+
+__all__ = ['AbstractTableModel', 'SortKeyRole', 'sortKey', ]
+
+SortKeyRole = QtCore.Qt.UserRole + 1
+"""Item data role returning the sort key of a cell."""
+
+def sortKey(value):
+    """Returns sort key of raw cell *value*, numbers (including infinity)
+    sort before strings, strings are sorted naturally.
+    """
+    try:
+        return 0, float(value), []
+    except (TypeError, ValueError):
+        return 1, 0., natural_sort_key(value)
 
 # ------------------------------------------------------------------------------
 #  Abstract table model class
 # ------------------------------------------------------------------------------
 
-class AbstractTableModel(QtCore.QAbstractTableModel):
-    """Abstract table model class to be inherited to display table data."""
+class AbstractTableModel(QtCore.QAbstractTableModel, MenuObserver):
+    """Abstract table model class to be inherited to display table data.
+
+    Formatted display strings and sort keys (role `SortKeyRole`) are cached
+    per row item. A cached row is formatted again when its stamp (see
+    `rowStamp()`) changes, its data changed or it was inserted or removed.
+    Values other than lists (eg. tmTable vectors returning a new proxy object
+    on every access) are copied to a list once, so row items keep their
+    identity.
+
+    Models displaying a list of menu items can observe the menu (see
+    `observe()`), emitting row signals for exactly the affected rows.
+    """
 
     AlignLeft = QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter
     AlignRight = QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter
@@ -23,8 +49,15 @@ class AbstractTableModel(QtCore.QAbstractTableModel):
 
     def __init__(self, values, parent=None):
         super().__init__(parent)
-        self.values = values
+        self.values = values if isinstance(values, list) else list(values)
         self.columnSpecs = []
+        self.__display = {} # item id -> (item, stamp, {column: display}, {column: sort key})
+        self.observedKind = None
+        self.dataChanged.connect(self.__invalidateRows)
+        self.rowsInserted.connect(self.__invalidateRange)
+        self.rowsAboutToBeRemoved.connect(self.__invalidateRange)
+        self.modelReset.connect(self.clearDisplayCache)
+        self.layoutChanged.connect(self.clearDisplayCache)
 
     def addColumnSpec(self, title, callback,
                       format=str,
@@ -43,6 +76,85 @@ class AbstractTableModel(QtCore.QAbstractTableModel):
         tables with view columns to prevent last column to get stretched."""
         self.columnSpecs.append(None)
 
+    def rowStamp(self, item):
+        """Returns stamp of row *item*, cached display strings of the row are
+        dropped when the stamp changes. Default is the item's modified flag,
+        reimplement to add other cheap to compare attributes.
+        """
+        return getattr(item, 'modified', None)
+
+    def __cachedRow(self, row):
+        item = self.values[row]
+        stamp = self.rowStamp(item)
+        cached = self.__display.get(id(item))
+        if cached is None or cached[0] is not item or cached[1] != stamp:
+            cached = self.__display[id(item)] = item, stamp, {}, {}
+        return cached
+
+    def displayData(self, row, column):
+        """Returns cached display string of cell."""
+        item, stamp, columns, sortKeys = self.__cachedRow(row)
+        if column not in columns:
+            spec = self.columnSpecs[column]
+            columns[column] = spec.format(spec.callback(item))
+        return columns[column]
+
+    def sortKeyData(self, row, column):
+        """Returns cached sort key of cell, calculated from the raw
+        (unformatted) value.
+        """
+        spec = self.columnSpecs[column]
+        if not spec:
+            return ()
+        item, stamp, columns, sortKeys = self.__cachedRow(row)
+        if column not in sortKeys:
+            sortKeys[column] = sortKey(spec.callback(item))
+        return sortKeys[column]
+
+    def clearDisplayCache(self, *args):
+        """Drop all cached display strings."""
+        self.__display.clear()
+
+    def __invalidate(self, first, last):
+        for row in range(first, min(last + 1, len(self.values))):
+            self.__display.pop(id(self.values[row]), None)
+
+    def __invalidateRows(self, topLeft, bottomRight, roles=()):
+        if not topLeft.isValid() or not bottomRight.isValid():
+            self.clearDisplayCache()
+            return
+        self.__invalidate(topLeft.row(), bottomRight.row())
+
+    def __invalidateRange(self, parent, first, last):
+        self.__invalidate(first, last)
+
+    def observe(self, menu, kind):
+        """Keep rows in sync with item list *kind* (eg. 'algorithms') of
+        *menu*, the model values must be that list.
+        """
+        self.observedKind = kind
+        menu.addObserver(self)
+
+    def itemsAboutToBeInserted(self, kind, first, last):
+        if kind == self.observedKind:
+            self.beginInsertRows(QtCore.QModelIndex(), first, last)
+
+    def itemsInserted(self, kind, first, last):
+        if kind == self.observedKind:
+            self.endInsertRows()
+
+    def itemsAboutToBeRemoved(self, kind, first, last):
+        if kind == self.observedKind:
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+
+    def itemsRemoved(self, kind, first, last):
+        if kind == self.observedKind:
+            self.endRemoveRows()
+
+    def itemsChanged(self, kind, first, last):
+        if kind == self.observedKind:
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(self.columnSpecs) - 1))
+
     def toolTip(self, row, column):
         """Reimplement this to provide data specific tool tip informations."""
         return QtCore.QVariant()
@@ -60,11 +172,13 @@ class AbstractTableModel(QtCore.QAbstractTableModel):
         if not index.isValid():
             return QtCore.QVariant()
         row, column = index.row(), index.column()
+        if role == SortKeyRole:
+            return self.sortKeyData(row, column)
         spec = self.columnSpecs[column]
         if not spec:
             return QtCore.QVariant()
         if role == QtCore.Qt.DisplayRole:
-            return spec.format(spec.callback(self.values[row])) # TODO
+            return self.displayData(row, column)
         if role == QtCore.Qt.TextAlignmentRole:
             return spec.textAlignment
         if role == QtCore.Qt.DecorationRole:
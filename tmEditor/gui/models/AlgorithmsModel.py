@@ -18,11 +18,17 @@ class AlgorithmsModel(AbstractTableModel):
 
     def __init__(self, menu, parent=None):
         super().__init__(menu.algorithms, parent)
+        self.menu = menu
+        self.observe(menu, 'algorithms')
         self.addColumnSpec("Index", lambda item: item.index, int, self.AlignRight)
         self.addColumnSpec("Name", lambda item: item.name)
         self.addColumnSpec("Expression", lambda item: item.expression, AlgorithmFormatter.normalize)
         self.addColumnSpec("Labels", lambda item: encode_labels(item.labels, pretty=True))
 
+    def rowStamp(self, item):
+        """Algorithms are modified in place, detect changes of displayed attributes."""
+        return item.modified, item.index, item.name, item.expression, tuple(item.labels)
+
     def data(self, index, role):
         """Overloaded for experimental decoration."""
         if index.isValid():
@@ -34,17 +40,11 @@ class AlgorithmsModel(AbstractTableModel):
                     return font
         return super().data(index, role)
 
-    def insertRows(self, position, rows, parent=QtCore.QModelIndex()):
-        self.beginInsertRows(parent, position, position + rows - 1)
-        for i in range(rows):
-            self.values.append(None)
-        self.endInsertRows()
-        return True
-
     def removeRows(self, position, rows, parent=QtCore.QModelIndex()):
-        self.beginRemoveRows(parent, position, position + rows - 1)
-        for i in range(rows):
-            algorithm = self.values[position + i]
-            self.values.remove(algorithm)
-        self.endRemoveRows()
+        """Remove items from menu, rows are removed on menu notification."""
+        self.removeItems(self.values[position:position + rows])
         return True
+
+    def removeItems(self, items):
+        """Remove list of *items* from menu in a single pass."""
+        self.menu.removeAlgorithms(items)
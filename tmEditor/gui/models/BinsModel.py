@@ -25,10 +25,14 @@ class BinsModel(AbstractTableModel):
         self.addColumnSpec("Minimum", lambda item: item[kMinimum], fCutValue, self.AlignRight)
         self.addColumnSpec("Maximum", self.maximumCallback, fCutValue, self.AlignRight)
         self.addEmptyColumn()
-        # Calculate first and last bin sortd by maximum
-        sortedBins = sorted(self.values, key=lambda item: float(item[kMaximum]))
-        self.firstBin = sortedBins[0] if sortedBins else None
-        self.lastBin = sortedBins[-1] if sortedBins else None
+        self.__lastBin = None
+
+    @property
+    def lastBin(self):
+        """Returns last bin sorted by maximum, calculated on first use."""
+        if self.__lastBin is None:
+            self.__lastBin = max(reversed(self.values), key=lambda item: float(item[kMaximum]), default=None)
+        return self.__lastBin
 
     def maximumCallback(self, item):
         """Custom infinite value for all ET/PT scales (visual adaption)."""
@@ -45,12 +45,17 @@ class CutsModel(AbstractTableModel):
     def __init__(self, menu, parent=None):
         super().__init__(menu.cuts, parent)
         self.menu = menu
+        self.observe(menu, 'cuts')
         self.addColumnSpec("Name", lambda item: item.name)
         self.addColumnSpec("Type", lambda item: item.type)
         self.addColumnSpec("Minimum", lambda item: item.minimum, fCutValue, self.AlignRight)
         self.addColumnSpec("Maximum", maximumCallback, fCutValue, self.AlignRight)
         self.addColumnSpec("Data", lambda item: fCutData(item))
 
+    def rowStamp(self, item):
+        """Cuts are modified in place, detect changes of displayed attributes."""
+        return item.modified, item.name, item.type, item.minimum, item.maximum, item.data
+
     def data(self, index, role):
         """Overloaded for experimental icon decoration."""
         if index.isValid():
@@ -62,17 +67,11 @@ class CutsModel(AbstractTableModel):
                     return font
         return super().data(index, role)
 
-    def insertRows(self, position, rows, parent=QtCore.QModelIndex()):
-        self.beginInsertRows(parent, position, position + rows - 1)
-        for i in range(rows):
-            self.values.append(None)
-        self.endInsertRows()
-        return True
-
     def removeRows(self, position, rows, parent=QtCore.QModelIndex()):
-        self.beginRemoveRows(parent, position, position + rows - 1)
-        for i in range(rows):
-            value = self.values[position + i]
-            self.values.remove(value)
-        self.endRemoveRows()
+        """Remove items from menu, rows are removed on menu notification."""
+        self.removeItems(self.values[position:position + rows])
         return True
+
+    def removeItems(self, items):
+        """Remove list of *items* from menu in a single pass."""
+        self.menu.removeCuts(items)
@@ -1,6 +1,6 @@
 """Cuts proxy model."""
 
-from PyQt5 import QtCore
+from .SortKeyProxyModel import SortKeyProxyModel
 
 __all__ = ['CutsModelProxy', ]
 
@@ -8,23 +8,7 @@ __all__ = ['CutsModelProxy', ]
 #  Cuts model proxy
 # -----------------------------------------------------------------------------
 
-class CutsModelProxy(QtCore.QSortFilterProxyModel):
-    """Custom cuts sort/filter proxy."""
-
-    MinimumColumn = 3
-    MaximumColumn = 4
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-
-    def lessThan(self, left, right):
-        """Custom cut sorting."""
-        if left.column() in (self.MinimumColumn, self.MaximumColumn):
-            try:
-                return self.__toFloat(left) < self.__toFloat(right)
-            except ValueError:
-                pass
-        return super().lessThan(left, right)
-
-    def __toFloat(self, index):
-        return float(self.sourceModel().data(index, QtCore.Qt.DisplayRole))
+class CutsModelProxy(SortKeyProxyModel):
+    """Custom cuts sort/filter proxy, sorting cut ranges numerically and
+    names naturally.
+    """
@@ -0,0 +1,24 @@
+"""Sort key proxy model."""
+
+from PyQt5 import QtCore
+
+from tmEditor.gui.models.AbstractTableModel import SortKeyRole
+
+__all__ = ['SortKeyProxyModel', ]
+
+# -----------------------------------------------------------------------------
+#  Sort key proxy model
+# -----------------------------------------------------------------------------
+
+class SortKeyProxyModel(QtCore.QSortFilterProxyModel):
+    """Sort/filter proxy comparing the cached sort keys (role SortKeyRole)
+    provided by the source model.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+    def lessThan(self, left, right):
+        """Compare sort keys of source indices."""
+        model = self.sourceModel()
+        return model.data(left, SortKeyRole) < model.data(right, SortKeyRole)
@@ -1,2 +1,3 @@
+from .SortKeyProxyModel import SortKeyProxyModel
 from .CutsModelProxy import CutsModelProxy
 from .ScalesModelProxy import ScalesModelProxy